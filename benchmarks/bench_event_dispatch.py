@@ -0,0 +1,70 @@
+"""
+Micro-benchmark — despacho semântico de eventos
+
+Compara, por evento, o custo de decidir que efeitos aplicar:
+- antes : CASE_EVENTS[event_type.name] + `semantic in spec.semantics`
+- agora : CASE_EVENTS_BY_TYPE[event_type.value].mask & bit
+
+Correr a partir da raiz do projecto:
+
+    python -m benchmarks.bench_event_dispatch
+"""
+
+import timeit
+
+from model.enums import CaseEventType
+from model.events import CASE_EVENTS, CASE_EVENTS_BY_TYPE, EventSemantic
+
+EVENTS = list(CaseEventType) * 200
+
+RESOLVE_OVERDUE = EventSemantic.RESOLVE_OVERDUE.bit
+FOLLOW_UP = EventSemantic.FOLLOW_UP.bit
+BILLING_DECISION = EventSemantic.BILLING_DECISION.bit
+
+
+def by_name_and_set():
+    hits = 0
+    for event_type in EVENTS:
+        spec = CASE_EVENTS[event_type.name]
+        if EventSemantic.RESOLVE_OVERDUE in spec.semantics:
+            hits += 1
+        if EventSemantic.FOLLOW_UP in spec.semantics:
+            hits += 1
+        if EventSemantic.BILLING_DECISION in spec.semantics:
+            hits += 1
+        # _phase_billing repetia a procura
+        if EventSemantic.BILLING_DECISION in CASE_EVENTS[event_type.name].semantics:
+            hits += 1
+    return hits
+
+
+def by_value_and_mask():
+    hits = 0
+    for event_type in EVENTS:
+        mask = CASE_EVENTS_BY_TYPE[event_type.value].mask
+        if mask & RESOLVE_OVERDUE:
+            hits += 1
+        if mask & FOLLOW_UP:
+            hits += 1
+        if mask & BILLING_DECISION:
+            hits += 1
+        if CASE_EVENTS_BY_TYPE[event_type.value].mask & BILLING_DECISION:
+            hits += 1
+    return hits
+
+
+def main(repeat: int = 5, number: int = 200) -> None:
+    assert by_name_and_set() == by_value_and_mask()
+
+    per_event = len(EVENTS) * number
+
+    for label, fn in (
+        ("nome + set", by_name_and_set),
+        ("valor + máscara", by_value_and_mask),
+    ):
+        best = min(timeit.repeat(fn, repeat=repeat, number=number))
+        print(f"{label:<16}: {1e9 * best / per_event:7.1f} ns/evento")
+
+
+if __name__ == "__main__":
+    main()
@@ -80,6 +80,7 @@ class ActivitySummary:
     inbound_emails: int = 0
     outbound_emails: int = 0
     notes: int = 0
+    tasks_completed: int = 0
 
     def is_significant(self) -> bool:
         """
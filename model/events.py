@@ -12,10 +12,12 @@ NÃO contém:
 - efeitos colaterais
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Set
 
+from model.enums import CaseEventType
+
 
 class EventSemantic(Enum):
     """
@@ -59,6 +61,13 @@ class EventSemantic(Enum):
     Decisão humana de faturação.
     """
 
+    @property
+    def bit(self) -> int:
+        """
+        Bit desta semântica na máscara de um CaseEventSpec.
+        """
+        return 1 << (self.value - 1)
+
 
 
 @dataclass(frozen=True)
@@ -71,6 +80,15 @@ class CaseEventSpec:
     semantics: Set[EventSemantic]
     description: str
 
+    # Semânticas como bits (pré-calculado: testes com & em vez de `in`)
+    mask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        mask = 0
+        for semantic in self.semantics:
+            mask |= semantic.bit
+        object.__setattr__(self, "mask", mask)
+
 
 # ------------------------------------------------------------------
 # CATÁLOGO DE EVENTOS DO SISTEMA
@@ -153,3 +171,9 @@ CASE_EVENTS: dict[str, CaseEventSpec] = {
         ),
     ),
 }
+
+
+# Mesmo catálogo, indexado por CaseEventType.value (sem passar pelo nome)
+CASE_EVENTS_BY_TYPE: dict[int, CaseEventSpec] = {
+    CaseEventType[name].value: spec for name, spec in CASE_EVENTS.items()
+}
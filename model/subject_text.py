@@ -0,0 +1,73 @@
+"""
+Subject Text
+
+Normalização de assuntos de e-mail e títulos de Casos.
+
+Usado para:
+- indexar títulos de Casos por palavra (selecção de candidatos)
+- comparar assuntos sem ruído de "Re:", "Fwd:", maiúsculas, espaços
+
+Este módulo é puro: não lê nem escreve no store.
+"""
+
+import re
+from typing import FrozenSet, Optional
+
+# "Re:", "RE:", "Fwd:", "FW:", "Enc:", "Res:", "Re[2]:" repetidos no início
+_REPLY_PREFIX = re.compile(
+    r"^(?:\s*(?:re|fwd?|enc|res|tr)\s*(?:\[\d+\])?\s*:)+",
+    re.IGNORECASE,
+)
+
+_WORD = re.compile(r"\w+")
+
+MIN_TOKEN_LENGTH = 3
+
+STOPWORDS = frozenset({
+    # pt
+    "com", "dos", "das", "para", "por", "que", "uma", "num", "numa", "sobre",
+    # en
+    "the", "and", "for", "with", "from", "about",
+})
+
+
+def normalize_subject(subject: Optional[str]) -> str:
+    """
+    Assunto sem prefixos de resposta/reencaminhamento,
+    em minúsculas e com espaços colapsados.
+    """
+
+    text = _REPLY_PREFIX.sub("", subject or "")
+    return " ".join(text.lower().split())
+
+
+def subject_tokens(subject: Optional[str]) -> FrozenSet[str]:
+    """
+    Palavras relevantes de um assunto (sem prefixos nem palavras vazias).
+    """
+
+    return frozenset(
+        word
+        for word in _WORD.findall(normalize_subject(subject))
+        if len(word) >= MIN_TOKEN_LENGTH and word not in STOPWORDS
+    )
+
+
+def client_token(client_id: Optional[str]) -> Optional[str]:
+    """
+    Token que identifica o cliente no índice de Casos.
+    """
+
+    return f"@{client_id.strip().lower()}" if client_id else None
+
+
+def case_tokens(title: Optional[str], client_id: Optional[str]) -> FrozenSet[str]:
+    """
+    Tokens indexados para um Caso: palavras do título + cliente.
+    """
+
+    tokens = set(subject_tokens(title))
+    client = client_token(client_id)
+    if client:
+        tokens.add(client)
+    return frozenset(tokens)
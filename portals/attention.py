@@ -10,14 +10,22 @@ Pergunta:
 """
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from model.enums import AttentionFlag, WorkStatus
 from model.entities import Case
-from .base import DecisionPortal, DecisionItem
+from .base import CaseDecisionPortal, DecisionItem
 
 
-class AttentionPortal(DecisionPortal):
+# Flags que justificam atenção activa (ver _relevant_flags)
+ATTENTION_FLAGS = (
+    AttentionFlag.OVERDUE,
+    AttentionFlag.STALE,
+    AttentionFlag.UNREAD_MESSAGES,
+)
+
+
+class AttentionPortal(CaseDecisionPortal):
     """
     Portal de atenção diária.
 
@@ -29,22 +37,28 @@ class AttentionPortal(DecisionPortal):
 
     name = "attention"
 
-    def collect(self, store, now: datetime) -> List[DecisionItem]:
-        decisions: List[DecisionItem] = []
+    def candidate_cases(self, store, now: datetime) -> List[Case]:
+        # Só os Casos marcados (índice de flags do store)
+        return store.list_flagged_cases(ATTENTION_FLAGS)
+
+    def make_card(self, store, case: Case, now: datetime) -> Optional[DecisionItem]:
+        if not self.needs_attention(case):
+            return None
 
-        for case in store.list_cases():
-            # 1️⃣ Casos arquivados não interessam
-            if case.status == WorkStatus.ARCHIVED:
-                continue
+        return self._make_decision(case, self._relevant_flags(case), now)
 
-            # 2️⃣ Ver se há sinais de atenção relevantes
-            flags = self._relevant_flags(case)
-            if not flags:
-                continue
+    def needs_attention(self, case: Case) -> bool:
+        """
+        O Caso tem carta de atenção? (mesmo critério de make_card,
+        sem construir a carta — ex.: marcador ⚠️ na lista de Casos)
+        """
 
-            decisions.append(self._make_decision(case, flags, now))
+        # 1️⃣ Casos arquivados não interessam
+        if case.status == WorkStatus.ARCHIVED:
+            return False
 
-        return decisions
+        # 2️⃣ Ver se há sinais de atenção relevantes
+        return bool(self._relevant_flags(case))
 
     # ------------------------------------------------------------------
     # Internos
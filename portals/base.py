@@ -11,8 +11,11 @@ Regra de ouro:
 - Portais NÃO escrevem no store
 """
 
+from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from .pagination import CardPage, DEFAULT_LIMIT, paginate
 
 
 @dataclass
@@ -37,12 +40,68 @@ class DecisionItem:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-class DecisionPortal:
+class DecisionPortal(ABC):
     """
     Interface base de um Portal.
     """
 
     name: str = "base"
 
+    @abstractmethod
+    def collect(self, store, now) -> List[DecisionItem]: ...
+
+
+class CaseDecisionPortal(DecisionPortal):
+    """
+    Portal sobre Casos do store. Separa:
+    - candidate_cases(store, now) → que Casos podem ter carta
+    - make_card(store, case, now) → a carta de um Caso (ou None)
+
+    make_card devolve None para qualquer Caso fora de candidate_cases:
+    quem já tem o Caso (ex.: portals.deltas) não precisa dos candidatos.
+
+    Assim as cartas podem ser guardadas por Caso (ver portals.cache)
+    e paginadas sem construir cartas fora da página (ver portals.pagination).
+    """
+
     def collect(self, store, now) -> List[DecisionItem]:
-        raise NotImplementedError
+        decisions: List[DecisionItem] = []
+
+        for case in self.candidate_cases(store, now):
+            card = self.make_card(store, case, now)
+            if card is not None:
+                decisions.append(card)
+
+        return decisions
+
+    def collect_page(
+        self,
+        store,
+        now,
+        limit: int = DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        client_id: Optional[str] = None,
+        status=None,
+        flag=None,
+    ) -> CardPage:
+        """
+        Cartas ordenadas (prioridade → atraso → última actividade),
+        filtradas e paginadas por cursor.
+        """
+        return paginate(
+            store,
+            now,
+            self.candidate_cases(store, now),
+            lambda case: self.make_card(store, case, now),
+            limit=limit,
+            cursor=cursor,
+            client_id=client_id,
+            status=status,
+            flag=flag,
+        )
+
+    @abstractmethod
+    def candidate_cases(self, store, now) -> list: ...
+
+    @abstractmethod
+    def make_card(self, store, case, now) -> Optional[DecisionItem]: ...
@@ -8,14 +8,14 @@ O portal não decide. Só detecta oportunidades de faturação.
 """
 
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
 from model.enums import AttentionFlag
 from model.entities import Case
-from .base import DecisionPortal, DecisionItem
+from .base import CaseDecisionPortal, DecisionItem
 
 
-class BillingPortal(DecisionPortal):
+class BillingPortal(CaseDecisionPortal):
     name = "billing"
 
     def __init__(self, window_days: int = 7):
@@ -26,25 +26,26 @@ class BillingPortal(DecisionPortal):
         """
         self.window_days = window_days
 
-    def collect(self, store, now: datetime) -> List[DecisionItem]:
-        decisions: List[DecisionItem] = []
-        since = now - timedelta(days=self.window_days)
+    def candidate_cases(self, store, now: datetime) -> List[Case]:
+        # 1) Só faz sentido sugerir billing se o cérebro o marcou
+        #    (índice de flags do store: só os Casos marcados)
+        return store.list_flagged_cases([AttentionFlag.BILLING_PENDING])
 
-        for case in store.list_cases():
-            # 1) Só faz sentido sugerir billing se o cérebro o marcou
-            if AttentionFlag.BILLING_PENDING not in case.attention_flags:
-                continue
+    def make_card(self, store, case: Case, now: datetime) -> Optional[DecisionItem]:
+        # 1) Igual a candidate_cases: sem marca do cérebro, sem carta
+        if AttentionFlag.BILLING_PENDING not in case.attention_flags:
+            return None
 
-            # 2) Criar um sumário claro do "porquê"
-            activity = store.get_activity_summary(case.id, since)
+        since = now - timedelta(days=self.window_days)
 
-            # Segurança: se por algum motivo não for significativo, não sugere
-            if not activity.is_significant():
-                continue
+        # 2) Criar um sumário claro do "porquê"
+        activity = store.get_activity_summary(case.id, since)
 
-            decisions.append(self._make_decision(case, activity, since, now))
+        # Segurança: se por algum motivo não for significativo, não sugere
+        if not activity.is_significant():
+            return None
 
-        return decisions
+        return self._make_decision(case, activity, since, now)
 
     def _make_decision(self, case: Case, activity, since: datetime, now: datetime) -> DecisionItem:
         """
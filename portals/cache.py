@@ -0,0 +1,143 @@
+"""
+Decision Card Cache
+
+Cartas de decisão já construídas, por (portal, case_id).
+
+Uma carta é reconstruída quando:
+- o Caso muda: o RulesEngine avisa (add_listener) sempre que reavalia
+  Casos — eventos, sweep_time, tick — e só as cartas desses Casos
+  são descartadas
+- o store mudou sem aviso (add_case, update_case directo, ...):
+  a versão do store já não é a última vista → tudo é descartado
+- o `now` é outro: as cartas dependem dele (janela de billing,
+  generated_at), cada carta guarda o `now` com que foi feita
+Cartas inalteradas são servidas sem recalcular sumários nem textos.
+
+Regra de ouro (igual aos portais):
+- NÃO executa decisões
+- NÃO altera estado
+- NÃO escreve no store
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from model.entities import Case
+from .base import CaseDecisionPortal, DecisionItem
+from .pagination import CardPage, DEFAULT_LIMIT, paginate
+
+
+class DecisionCardCache:
+    """
+    Uso:
+        cards = DecisionCardCache(store)
+        rules.add_listener(cards.invalidate_cases)
+        attention = cards.collect(attention_portal, now)
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+        # (portal, case_id) → (now, carta) (carta None: Caso candidato sem carta)
+        self._cards: Dict[Tuple[str, str], Tuple[datetime, Optional[DecisionItem]]] = {}
+
+        # case_id → portais com entrada guardada
+        self._portals_by_case: Dict[str, Set[str]] = {}
+
+        # Versão do store que as cartas guardadas reflectem
+        self._version = store.get_version()
+
+        self.hits = 0
+        self.misses = 0
+
+    def collect(self, portal: CaseDecisionPortal, now: datetime) -> List[DecisionItem]:
+        """
+        Mesmo resultado que portal.collect(store, now),
+        construindo só as cartas que não estão guardadas.
+        """
+
+        self._check_version()
+        decisions: List[DecisionItem] = []
+
+        for case in portal.candidate_cases(self.store, now):
+            card = self._card(portal, case, now)
+            if card is not None:
+                decisions.append(card)
+
+        return decisions
+
+    def collect_page(
+        self,
+        portal: CaseDecisionPortal,
+        now: datetime,
+        limit: int = DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        client_id: Optional[str] = None,
+        status=None,
+        flag=None,
+    ) -> CardPage:
+        """
+        Mesmo resultado que portal.collect_page(store, now, ...),
+        com as cartas da página servidas da cache.
+        """
+        self._check_version()
+        return paginate(
+            self.store,
+            now,
+            portal.candidate_cases(self.store, now),
+            lambda case: self._card(portal, case, now),
+            limit=limit,
+            cursor=cursor,
+            client_id=client_id,
+            status=status,
+            flag=flag,
+        )
+
+    def card(
+        self, portal: CaseDecisionPortal, case: Case, now: datetime
+    ) -> Optional[DecisionItem]:
+        """
+        A carta de um Caso, construída só se não estiver guardada.
+        """
+        self._check_version()
+        return self._card(portal, case, now)
+
+    def _card(
+        self, portal: CaseDecisionPortal, case: Case, now: datetime
+    ) -> Optional[DecisionItem]:
+        key = (portal.name, case.id)
+        entry = self._cards.get(key)
+
+        if entry is not None and entry[0] == now:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        card = portal.make_card(self.store, case, now)
+        self._cards[key] = (now, card)
+        self._portals_by_case.setdefault(case.id, set()).add(portal.name)
+
+        return card
+
+    def invalidate(self, case_ids: Iterable[str]) -> None:
+        for case_id in case_ids:
+            for portal_name in self._portals_by_case.pop(case_id, ()):
+                self._cards.pop((portal_name, case_id), None)
+
+    def invalidate_cases(self, cases: Iterable[Case]) -> None:
+        """
+        Listener do RulesEngine (depois do commit).
+        As escritas até aqui ficam explicadas por estes Casos.
+        """
+        self.invalidate(case.id for case in cases)
+        self._version = self.store.get_version()
+
+    def clear(self) -> None:
+        self._cards.clear()
+        self._portals_by_case.clear()
+        self._version = self.store.get_version()
+
+    def _check_version(self) -> None:
+        # Escritas que o RulesEngine não avisou: não se sabe que Casos mudaram
+        if self.store.get_version() != self._version:
+            self.clear()
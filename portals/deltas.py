@@ -0,0 +1,147 @@
+"""
+Card Deltas
+
+Traduz Casos reavaliados pelo RulesEngine em mudanças de cartas
+publicadas no ChangeFeed:
+
+- "card.add"    → o Caso passou a ter carta no portal
+- "card.update" → a carta mudou (título, descrição, metadata)
+                  (card.add/update levam também estado e flags do Caso,
+                  para o browser aplicar os filtros da página)
+- "card.remove" → o Caso deixou de ter carta no portal
+- "case.update" → linha do Caso na lista (estado, prioridade, ⚠️),
+                  só se mudou desde a última publicada
+
+Só os Casos que mudaram são reavaliados; as cartas vêm da
+DecisionCardCache (reconstruídas só para esses Casos).
+
+Regra de ouro (igual aos portais):
+- NÃO executa decisões
+- NÃO altera estado
+- NÃO escreve no store
+"""
+
+import threading
+from dataclasses import asdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from model.entities import Case
+from services.change_feed import ChangeFeed
+from .base import CaseDecisionPortal, DecisionItem
+from .cache import DecisionCardCache
+
+
+class CardDeltaTracker:
+    """
+    Uso:
+        deltas = CardDeltaTracker(feed, cards, [attention, billing], clock.now)
+        rules.add_listener(deltas.track)
+    """
+
+    def __init__(
+        self,
+        feed: ChangeFeed,
+        cards: DecisionCardCache,
+        portals: Iterable[CaseDecisionPortal],
+        now: Callable,
+        attention_portal: Optional[str] = "attention",
+    ):
+        self.feed = feed
+        self.cards = cards
+        self.portals = list(portals)
+        self.now = now
+
+        # Portal cujas cartas marcam o Caso com ⚠️ na lista
+        self.attention_portal = attention_portal
+
+        # (portal, case_id) → última carta publicada
+        # (começa com as cartas que o dashboard já mostra)
+        self._published: Dict[Tuple[str, str], DecisionItem] = {
+            (portal.name, card.case_id): card
+            for portal in self.portals
+            for card in cards.collect(portal, now())
+        }
+
+        # case_id → última linha publicada (idem: a lista já mostrada)
+        self._rows: Dict[str, dict] = {
+            case.id: self._case_payload(case) for case in cards.store.list_cases()
+        }
+
+        # Listener pode ser chamado por vários workers (ShardedEventDispatcher)
+        self._lock = threading.Lock()
+
+    def track(self, cases: List[Case]) -> None:
+        """
+        Listener do RulesEngine (chamado depois do commit, fora dos
+        locks do store: o store só é usado dentro de _lock, nunca o
+        contrário).
+        """
+        with self._lock:
+            self._track(cases)
+
+    # ------------------------------------------------------------------
+
+    def _track(self, cases: List[Case]) -> None:
+        now = self.now()
+
+        # As cartas destes Casos deixaram de ser válidas
+        self.cards.invalidate_cases(cases)
+
+        # make_card decide pelo próprio Caso (flags, estado):
+        # sem reler os candidatos de cada portal
+        for portal in self.portals:
+            for case in cases:
+                card = self.cards.card(portal, case, now)
+                self._publish_card(portal.name, case, card)
+
+        # Só linhas que mudaram: um sweep_time sobre milhares de Casos
+        # quase iguais não pode esgotar o feed (ChangeFeedGap → recarregar)
+        for case in cases:
+            row = self._case_payload(case)
+            if self._rows.get(case.id) != row:
+                self._rows[case.id] = row
+                self.feed.publish("case.update", row)
+
+    def _publish_card(
+        self, portal_name: str, case: Case, card: Optional[DecisionItem]
+    ) -> None:
+        case_id = case.id
+        key = (portal_name, case_id)
+        previous = self._published.get(key)
+
+        if card is None:
+            if previous is not None:
+                del self._published[key]
+                self.feed.publish(
+                    "card.remove", {"portal": portal_name, "case_id": case_id}
+                )
+            return
+
+        if card == previous:
+            return
+
+        self._published[key] = card
+        self.feed.publish(
+            "card.add" if previous is None else "card.update",
+            self._card_payload(card, case),
+        )
+
+    @staticmethod
+    def _card_payload(card: DecisionItem, case: Case) -> dict:
+        # Estado e flags do Caso: o browser aplica os mesmos filtros
+        # da página (?client=&status=&flag=) sem perguntar ao servidor
+        payload = asdict(card)
+        payload["case"] = {
+            "status": case.status.value,
+            "flags": sorted(f.value for f in case.attention_flags),
+        }
+        return payload
+
+    def _case_payload(self, case: Case) -> dict:
+        return {
+            "id": case.id,
+            "title": case.title,
+            "status": case.status.value,
+            "priority": case.priority.value,
+            "attention": (self.attention_portal, case.id) in self._published,
+        }
@@ -0,0 +1,199 @@
+"""
+Card Pagination
+
+Recolha ordenada, filtrada e paginada por cursor das cartas de um portal.
+
+Ordem (total, estável entre páginas):
+1. prioridade — URGENT primeiro
+2. atraso — atrasados primeiro, o prazo mais antigo (due_at) primeiro
+3. última actividade — a mais antiga primeiro (há mais tempo à espera)
+4. case_id — desempate
+
+O cursor é opaco: o `now` da primeira página + a chave da última
+carta devolvida. A página seguinte começa na primeira chave
+estritamente maior.
+
+A chave não depende do relógio, só a fronteira atrasado / em dia.
+Essa fronteira é sempre avaliada no `now` da primeira página (que
+viaja no cursor): pedir a página seguinte mais tarde não salta
+nem repete Casos.
+
+Só os Casos candidatos são ordenados (chaves baratas, sem cartas);
+as cartas são construídas pela ordem do heap e apenas até encher a página.
+Cartas para lá da página nunca são materializadas.
+
+Regra de ouro (igual aos portais):
+- NÃO executa decisões
+- NÃO altera estado
+- NÃO escreve no store
+"""
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from model.entities import Case
+from model.enums import AttentionFlag, Priority, WorkStatus
+
+
+PRIORITY_RANK = {
+    Priority.LOW: 0,
+    Priority.NORMAL: 1,
+    Priority.HIGH: 2,
+    Priority.URGENT: 3,
+}
+
+DEFAULT_LIMIT = 20
+
+SortKey = Tuple[int, int, float, float, str]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class CardPage:
+    """
+    Uma página de cartas.
+    next_cursor é None na última página.
+    """
+
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+# ----------------------------------------------------------------------
+# Ordem
+# ----------------------------------------------------------------------
+
+def sort_key(case: Case, now: datetime, last_activity_at: Optional[datetime]) -> SortKey:
+    """
+    Chave ascendente: a menor chave aparece primeiro.
+    `now` só decide se o Caso está atrasado.
+    """
+
+    overdue = case.due_at is not None and case.due_at < now
+
+    # Sem timeline, conta a criação do Caso
+    last = last_activity_at or case.created_at
+
+    return (
+        -PRIORITY_RANK[case.priority],
+        0 if overdue else 1,
+        case.due_at.timestamp() if overdue else 0.0,
+        last.timestamp(),
+        case.id,
+    )
+
+
+def encode_cursor(now: datetime, key: SortKey) -> str:
+    raw = json.dumps([now.isoformat(), *key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, SortKey]:
+    """
+    Devolve (now da primeira página, chave da última carta).
+    """
+    try:
+        now, rank, overdue, due, last, case_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        return (
+            datetime.fromisoformat(now),
+            (int(rank), int(overdue), float(due), float(last), str(case_id)),
+        )
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise InvalidCursor(f"Cursor inválido: {cursor!r}") from exc
+
+
+# ----------------------------------------------------------------------
+# Filtros
+# ----------------------------------------------------------------------
+
+def _matches(
+    case: Case,
+    client_id: Optional[str],
+    status: Optional[WorkStatus],
+    flag: Optional[AttentionFlag],
+) -> bool:
+    if client_id is not None and case.client_id != client_id:
+        return False
+
+    if status is not None and case.status != status:
+        return False
+
+    if flag is not None and flag not in case.attention_flags:
+        return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+# Paginação
+# ----------------------------------------------------------------------
+
+def paginate(
+    store,
+    now: datetime,
+    candidates: Iterable[Case],
+    make_card: Callable[[Case], Optional[Any]],
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    client_id: Optional[str] = None,
+    status: Optional[WorkStatus | str] = None,
+    flag: Optional[AttentionFlag | str] = None,
+) -> CardPage:
+    """
+    Uma página de cartas a partir dos Casos candidatos de um portal.
+
+    status e flag aceitam o Enum ou o seu valor (ex.: query string);
+    um valor desconhecido lança ValueError, um cursor inválido
+    InvalidCursor (também ValueError).
+    """
+
+    if limit <= 0:
+        raise ValueError("limit tem de ser > 0")
+
+    # 1️⃣ Normalizar filtros
+    status = WorkStatus(status) if status is not None else None
+    flag = AttentionFlag(flag) if flag is not None else None
+    # A ordem é sempre a da primeira página (ver cursor)
+    order_now, after = decode_cursor(cursor) if cursor else (now, None)
+
+    # 2️⃣ Chaves dos candidatos (sem construir cartas);
+    #    última actividade só destes Casos, não de todo o store
+    cases = [c for c in candidates if _matches(c, client_id, status, flag)]
+    last_activity = store.list_last_activity_at([c.id for c in cases])
+
+    heap = []
+    for case in cases:
+        key = sort_key(case, order_now, last_activity.get(case.id))
+        if after is not None and key <= after:
+            continue
+
+        heap.append((key, case))
+
+    heapq.heapify(heap)
+
+    # 3️⃣ Cartas pela ordem, só até encher a página
+    page = CardPage()
+    last_key = None
+
+    while heap and len(page.items) < limit:
+        key, case = heapq.heappop(heap)
+        last_key = key
+
+        card = make_card(case)
+        if card is not None:
+            page.items.append(card)
+
+    # 4️⃣ Ainda há candidatos → há página seguinte
+    if heap:
+        page.next_cursor = encode_cursor(order_now, last_key)
+
+    return page
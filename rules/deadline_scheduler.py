@@ -0,0 +1,122 @@
+"""
+Deadline Scheduler
+
+Fila de prazos dos Casos, ordenada no tempo (heap).
+
+Cada Caso pode ter um prazo por flag de atenção:
+- OVERDUE → case.due_at
+- STALE   → última actividade + janela de estagnação
+
+Quando o relógio avança, só os Casos cujo prazo foi ultrapassado
+desde o último tick precisam de ser reavaliados.
+
+Este módulo:
+- NÃO aplica regras
+- NÃO altera Casos
+- NÃO escreve no store
+"""
+
+import heapq
+import threading
+from datetime import datetime
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from model.enums import AttentionFlag
+
+
+class DeadlineScheduler:
+    """
+    Heap de prazos com remoção preguiçosa.
+
+    Reagendar um prazo não remove a entrada antiga do heap;
+    ela é descartada quando chega ao topo e já não corresponde
+    ao prazo actual do Caso.
+    """
+
+    def __init__(self):
+        # (deadline, seq, case_id, flag)
+        self._heap: List[Tuple[datetime, int, str, AttentionFlag]] = []
+
+        # Prazo actual por (case_id, flag)
+        self._deadlines: Dict[Tuple[str, AttentionFlag], datetime] = {}
+
+        self._seq = count()
+
+        # Partilhado pelos workers do dispatcher
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(
+        self,
+        case_id: str,
+        flag: AttentionFlag,
+        deadline: Optional[datetime],
+    ) -> None:
+        """
+        Define (ou limpa, com None) o prazo de um Caso para um flag.
+        """
+
+        key = (case_id, flag)
+
+        with self._lock:
+            if deadline is None:
+                self._deadlines.pop(key, None)
+                return
+
+            if self._deadlines.get(key) == deadline:
+                return
+
+            self._deadlines[key] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._seq), case_id, flag))
+            self._compact()
+
+    def pop_expired(self, now: datetime) -> List[str]:
+        """
+        Remove e devolve os Casos com prazos ultrapassados (deadline < now).
+        Cada Caso aparece uma vez, pela ordem do primeiro prazo expirado.
+        """
+
+        expired: Dict[str, None] = {}
+
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                deadline, _, case_id, flag = heapq.heappop(self._heap)
+
+                key = (case_id, flag)
+                if self._deadlines.get(key) != deadline:
+                    continue  # entrada obsoleta
+
+                del self._deadlines[key]
+                expired[case_id] = None
+
+        return list(expired)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """
+        Próximo prazo activo (útil para agendar o próximo tick).
+        """
+
+        with self._lock:
+            while self._heap:
+                deadline, _, case_id, flag = self._heap[0]
+                if self._deadlines.get((case_id, flag)) == deadline:
+                    return deadline
+                heapq.heappop(self._heap)
+
+        return None
+
+    # ------------------------------------------------------------------
+
+    def _compact(self) -> None:
+        # Evita que entradas obsoletas dominem o heap
+        if len(self._heap) <= 2 * len(self._deadlines) + 64:
+            return
+
+        self._heap = [
+            entry for entry in self._heap
+            if self._deadlines.get((entry[2], entry[3])) == entry[0]
+        ]
+        heapq.heapify(self._heap)
@@ -0,0 +1,160 @@
+"""
+Sharded Event Dispatcher
+
+Distribui eventos de Casos pelo RulesEngine em N workers (threads),
+escolhidos por hash do case.id:
+
+- todos os eventos de um Caso vão para o mesmo worker
+  → ordem por Caso preservada, o objecto Case nunca é mutado
+    por duas threads ao mesmo tempo
+- Casos diferentes avançam em paralelo
+
+Os workers são threads: o trabalho do RulesEngine em Python não corre
+em paralelo (GIL). O que avança em paralelo é o que espera fora do
+interpretador — I/O do store e listeners (ex.: rede). Cada store deixa
+as transacções de workers diferentes intercalar:
+- SQLiteStore em ficheiro: uma ligação por thread (WAL); as escritas
+  continuam serializadas pelo SQLite, as leituras não esperam
+- InMemoryStore: lock por operação, nunca durante a transacção toda
+
+Modo determinístico (workers=0): cada evento é aplicado de imediato,
+na thread de quem o envia — exactamente como chamar handle_event.
+
+Este módulo:
+- NÃO tem regras próprias (delega no RulesEngine)
+- NÃO escreve no store directamente
+"""
+
+import queue
+import threading
+import zlib
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Iterable, List
+
+from model.entities import Case
+from model.enums import CaseEventType
+from rules.rules_engine import RulesEngine
+
+_STOP = object()
+
+
+def shard_for(case_id: str, workers: int) -> int:
+    """
+    Worker de um Caso: estável entre execuções (não usa hash()).
+    """
+    return zlib.crc32(case_id.encode("utf-8")) % workers
+
+
+class ShardedEventDispatcher:
+    """
+    Uso:
+        with ShardedEventDispatcher(rules, workers=4) as dispatcher:
+            dispatcher.dispatch(case, CaseEventType.EMAIL_INBOUND, ctx, now)
+    """
+
+    def __init__(self, rules_engine: RulesEngine, workers: int = 4):
+        if workers < 0:
+            raise ValueError("workers tem de ser >= 0")
+
+        self.rules_engine = rules_engine
+        self.workers = workers
+
+        self._queues: List[queue.Queue] = [queue.Queue() for _ in range(workers)]
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(q,),
+                name=f"rules-shard-{i}",
+                daemon=True,
+            )
+            for i, q in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def deterministic(self) -> bool:
+        return self.workers == 0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def dispatch(
+        self,
+        case: Case,
+        event_type: CaseEventType,
+        event_context: dict | None = None,
+        now: datetime | None = None,
+    ) -> Future:
+        return self.dispatch_many(case, [(event_type, event_context, now)])
+
+    def dispatch_many(
+        self,
+        case: Case,
+        events: Iterable[tuple[CaseEventType, dict | None, datetime | None]],
+    ) -> Future:
+        """
+        Envia eventos de um Caso para o seu worker.
+        O Future termina quando o RulesEngine os tiver aplicado.
+        """
+
+        future: Future = Future()
+        events = list(events)
+
+        if self.deterministic:
+            self._apply(case, events, future)
+        elif not self._queues:
+            raise RuntimeError("Dispatcher fechado")
+        else:
+            self._queues[shard_for(case.id, self.workers)].put((case, events, future))
+
+        return future
+
+    def join(self) -> None:
+        """
+        Espera que todos os eventos enviados estejam aplicados.
+        """
+        for q in self._queues:
+            q.join()
+
+    def close(self) -> None:
+        self.join()
+
+        for q in self._queues:
+            q.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+        self._queues = []
+        self._threads = []
+
+    def __enter__(self) -> "ShardedEventDispatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+
+    def _run(self, q: queue.Queue) -> None:
+        while True:
+            job = q.get()
+            try:
+                if job is _STOP:
+                    return
+                self._apply(*job)
+            finally:
+                q.task_done()
+
+    def _apply(self, case: Case, events: list, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            self.rules_engine.handle_events(case, events)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(case)
@@ -13,7 +13,9 @@ NUNCA:
 - executam decisões humanas
 """
 
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
 
 from model.enums import (
     CaseEventType,
@@ -22,14 +24,21 @@ from model.enums import (
     Priority,
     BillingDecision
 )
-from model.entities import Case, BillingRecord
-from model.events import CASE_EVENTS, EventSemantic
+from model.entities import Case, BillingRecord, ActivitySummary
+from model.events import CASE_EVENTS_BY_TYPE, EventSemantic
 from state_machine.case_state_machine import CaseStateMachine
 from store.protocol import StoreProtocol
+from rules.deadline_scheduler import DeadlineScheduler
 from services.clock import Clock
 from uuid import uuid4
 
 FOLLOW_UP_DAYS = 7
+STALE_DAYS = 7
+
+# Bits das semânticas usadas no pipeline (ver CaseEventSpec.mask)
+_RESOLVE_OVERDUE = EventSemantic.RESOLVE_OVERDUE.bit
+_FOLLOW_UP = EventSemantic.FOLLOW_UP.bit
+_BILLING_DECISION = EventSemantic.BILLING_DECISION.bit
 
 
 class RulesEngine:
@@ -47,6 +56,27 @@ class RulesEngine:
         self.store = store
         self.state_machine = state_machine
 
+        # Prazos OVERDUE / STALE por Caso (ver tick())
+        self.deadlines = DeadlineScheduler()
+        self._seed_deadlines()
+
+        # Interessados em Casos alterados (caches de cartas, UI, ...)
+        self._listeners: list[Callable[[list[Case]], None]] = []
+
+        # Casos reavaliados à espera do commit, por thread (ver _notify)
+        self._pending = threading.local()
+
+    def add_listener(self, listener: Callable[[list[Case]], None]) -> None:
+        """
+        Regista quem quer saber que Casos foram reavaliados.
+
+        Chamado depois do commit: uma vez por handle_event(s), sweep_time
+        e tick, ou uma vez no fim de uma transacção exterior
+        (ex.: ingest_many) com todos os Casos reavaliados nela.
+        Se a transacção for revertida, não é chamado.
+        """
+        self._listeners.append(listener)
+
     # ------------------------------------------------------------------
     # API PÚBLICA
     # ------------------------------------------------------------------
@@ -63,33 +93,177 @@ class RulesEngine:
         Aplica o pipeline completo e explícito.
         """
 
+        self.handle_events(case, [(event_type, event_context, now)])
+
+    def handle_events(
+        self,
+        case: Case,
+        events: Iterable[tuple[CaseEventType, dict | None, datetime | None]],
+    ) -> None:
+        """
+        Aplica uma sequência de eventos do mesmo Caso, por ordem.
+        O resultado é o mesmo que chamar handle_event para cada um.
+
+        Factos, transições e semântica são aplicados evento a evento.
+        Atenção e billing são derivados (recalculados do zero), por isso
+        correm uma única vez no fim, com o tempo do último evento —
+        excepto se o lote tiver decisões de billing (BILLING_DECISION):
+        a regra de billing não corre nesses eventos e as decisões fecham
+        sugestões de eventos anteriores, por isso aí correm evento a
+        evento, como em handle_event.
+        """
+
+        events = list(events)
+        if not events:
+            return
+
+        # Decisões de billing no lote → derivados evento a evento
+        per_event = any(
+            CASE_EVENTS_BY_TYPE[event_type.value].mask & _BILLING_DECISION
+            for event_type, _, _ in events
+        )
+
+        last_event_type = None
+        last_now = None
+
+        # Todas as escritas dos eventos num único commit
+        with self.store.transaction():
+            for event_type, event_context, now in events:
+                now = now or Clock().now()
+                event_context = event_context or {}
+
+                # 1️⃣ Registo factual (factos, não decisões)
+                self._phase_record_facts(case, event_type, event_context, now)
+
+                # 2️⃣ Transição de estado (State Machine)
+                self._phase_state_transition(case, event_type)
+
+                # 3️⃣ Semântica do evento (efeitos imediatos)
+                self._phase_event_semantics(case, event_type, event_context, now)
+
+                # 4️⃣ Actualização temporal do Caso
+                if event_type != CaseEventType.TIME_PASSED:
+                    case.updated_at = now
+
+                if per_event:
+                    self._phase_attention(case, now)
+                    self._phase_billing(case, event_type, now)
+
+                last_event_type, last_now = event_type, now
+
+            if not per_event:
+                # 5️⃣ Regras de atenção (derivadas, nunca decisivas)
+                self._phase_attention(case, last_now)
+
+                # 6️⃣ Regras de billing (sugestão, não decisão)
+                self._phase_billing(case, last_event_type, last_now)
+
+            # 7️⃣ Persistir as mutações do Caso
+            self.store.update_case(case)
+
+        # 8️⃣ Reagendar prazos de atenção
+        self._schedule_deadlines(case, last_now, self._last_activity_at(case))
+
+        # 9️⃣ Avisar interessados
+        self._notify([case])
+
+
+    def sweep_time(self, now: datetime | None = None) -> list[Case]:
+        """
+        Aplica TIME_PASSED a todos os Casos de uma só vez.
+
+        Equivalente a chamar handle_event(TIME_PASSED) Caso a Caso,
+        mas a última actividade, o histórico de billing e a actividade
+        recente são lidos com queries agregadas, não por Caso.
+        """
+
         now = now or Clock().now()
-        event_context = event_context or {}
+        since = now - timedelta(days=7)
+
+        with self.store.transaction():
+            cases = self.store.list_cases()
+            last_activity = self.store.list_last_activity_at()
+            billed_case_ids = self.store.list_billed_case_ids()
+            activity = self.store.get_activity_summaries(since)
+
+            # TIME_PASSED não cria factos nem tem semântica imediata:
+            # transições de todos os Casos de uma vez (tabela da State Machine)
+            self.state_machine.apply_many(cases, CaseEventType.TIME_PASSED)
 
-        # 1️⃣ Registo factual (factos, não decisões)
-        self._phase_record_facts(case, event_type, event_context, now)
+            for case in cases:
+                self._apply_overdue_rule(case, now)
+                self._apply_stale_rule(case, now, last_activity.get(case.id))
 
-        # 2️⃣ Transição de estado (State Machine)
-        self._phase_state_transition(case, event_type)
+                if self._is_billable(case, case.id in billed_case_ids):
+                    self._apply_billing_activity(
+                        case,
+                        activity.get(case.id)
+                        or ActivitySummary(case_id=case.id, since=since),
+                    )
+                else:
+                    case.attention_flags.discard(AttentionFlag.BILLING_PENDING)
 
-        # 3️⃣ Semântica do evento (efeitos imediatos)
-        self._phase_event_semantics(case, event_type, event_context, now)
+                self.store.update_case(case)
+                self._schedule_deadlines(case, now, last_activity.get(case.id))
 
-        # 4️⃣ Regras de atenção (derivadas, nunca decisivas)
-        self._phase_attention(case, now)
+        # O tempo avançou para todos: janelas de actividade incluídas
+        self._notify(cases)
 
-        # 5️⃣ Regras de billing (sugestão, não decisão)
-        self._phase_billing(case, event_type, now)
+        return cases
 
-        # 6️⃣ Actualização temporal do Caso
-        if event_type != CaseEventType.TIME_PASSED:
-            case.updated_at = now
+    def tick(self, now: datetime | None = None) -> list[Case]:
+        """
+        Avanço de relógio: TIME_PASSED só para os Casos cujo prazo
+        (due_at ou janela de estagnação) foi ultrapassado desde o último tick.
+
+        Custa O(expirados), não O(todos os Casos).
+        Os Casos reavaliados são notificados juntos, depois do commit.
+        Casos que já estavam no store (ex.: SQLite persistente depois de
+        reiniciar) entram na fila na construção (ver _seed_deadlines).
+        """
+
+        now = now or Clock().now()
+        touched: list[Case] = []
+
+        with self.store.transaction():
+            for case_id in self.deadlines.pop_expired(now):
+                case = self.store.get_case(case_id)
+                if case is None:
+                    continue
+
+                self.handle_event(case, CaseEventType.TIME_PASSED, now=now)
+                touched.append(case)
 
+        return touched
 
     # ------------------------------------------------------------------
     # MÉTODOS PRIVADOS
     # ------------------------------------------------------------------
 
+    def _notify(self, cases: list[Case]) -> None:
+        # Dentro de uma transacção exterior: acumula até ao commit
+        pending = getattr(self._pending, "cases", None)
+        first = pending is None
+        if first:
+            pending = self._pending.cases = {}
+
+        for case in cases:
+            pending[case.id] = case
+
+        if first:
+            self.store.after_transaction(self._flush_notifications)
+
+    def _flush_notifications(self, committed: bool) -> None:
+        pending = self._pending.cases
+        self._pending.cases = None
+
+        if not committed:
+            return
+
+        cases = list(pending.values())
+        for listener in self._listeners:
+            listener(cases)
+
     def _phase_record_facts(
         self,
         case: Case,
@@ -132,8 +306,7 @@ class RulesEngine:
         event_type: CaseEventType,
         now: datetime,
     ) -> None:
-        spec = CASE_EVENTS[event_type.name]
-        if EventSemantic.BILLING_DECISION in spec.semantics:
+        if CASE_EVENTS_BY_TYPE[event_type.value].mask & _BILLING_DECISION:
             return
 
         self._apply_billing_rules(case, now)
@@ -167,15 +340,15 @@ class RulesEngine:
         Aplica efeitos semânticos do evento.
         """
 
-        spec = CASE_EVENTS[event_type.name]
+        mask = CASE_EVENTS_BY_TYPE[event_type.value].mask
 
-        if EventSemantic.RESOLVE_OVERDUE in spec.semantics:
+        if mask & _RESOLVE_OVERDUE:
             self._resolve_overdue(case, now)
 
-        if EventSemantic.FOLLOW_UP in spec.semantics:
+        if mask & _FOLLOW_UP:
             self._schedule_follow_up(case, now)
 
-        if EventSemantic.BILLING_DECISION in spec.semantics:
+        if mask & _BILLING_DECISION:
             self._apply_billing_decision(case, event_context, now)
 
 
@@ -247,22 +420,97 @@ class RulesEngine:
         """
 
         # --- Atraso ---
+        self._apply_overdue_rule(case, now)
+
+        # --- Estagnação ---
+        self._apply_stale_rule(case, now, self._last_activity_at(case))
+
+    def _apply_overdue_rule(self, case: Case, now: datetime) -> None:
+        """
+        OVERDUE: prazo (due_at) ultrapassado.
+        """
+
         if case.due_at and now > case.due_at:
             case.attention_flags.add(AttentionFlag.OVERDUE)
         else:
             case.attention_flags.discard(AttentionFlag.OVERDUE)
 
-        # --- Estagnação ---
-        last_activity = self._last_activity_at(case)
+    def _apply_stale_rule(
+        self,
+        case: Case,
+        now: datetime,
+        last_activity: datetime | None,
+    ) -> None:
+        """
+        STALE: sem actividade há mais de 7 dias.
+        """
+
         if last_activity:
             if last_activity.tzinfo is None:
                 last_activity = last_activity.replace(tzinfo=now.tzinfo)
 
-            if (now - last_activity) > timedelta(days=7):
+            if (now - last_activity) > timedelta(days=STALE_DAYS):
                 case.attention_flags.add(AttentionFlag.STALE)
             else:
                 case.attention_flags.discard(AttentionFlag.STALE)
 
+    def _seed_deadlines(self) -> None:
+        """
+        Prazos dos Casos que já estão no store.
+
+        Sem "now" na construção: prazos já ultrapassados também entram,
+        e o primeiro tick() reavalia-os. Excepto se o flag já estiver
+        posto — esse prazo já foi avaliado antes de reiniciar.
+        """
+
+        last_activity = self.store.list_last_activity_at()
+
+        for case in self.store.list_cases():
+            if AttentionFlag.OVERDUE not in case.attention_flags:
+                self.deadlines.schedule(case.id, AttentionFlag.OVERDUE, case.due_at)
+
+            if AttentionFlag.STALE not in case.attention_flags:
+                self.deadlines.schedule(
+                    case.id,
+                    AttentionFlag.STALE,
+                    self._stale_at(last_activity.get(case.id), timezone.utc),
+                )
+
+    def _schedule_deadlines(
+        self,
+        case: Case,
+        now: datetime,
+        last_activity: datetime | None,
+    ) -> None:
+        """
+        Regista os próximos prazos do Caso no scheduler.
+        Prazos já ultrapassados não voltam a ser agendados:
+        o flag correspondente já foi avaliado agora.
+        """
+
+        due = case.due_at
+        self.deadlines.schedule(
+            case.id,
+            AttentionFlag.OVERDUE,
+            due if due and due >= now else None,
+        )
+
+        stale_at = self._stale_at(last_activity, now.tzinfo)
+        self.deadlines.schedule(
+            case.id,
+            AttentionFlag.STALE,
+            stale_at if stale_at and stale_at >= now else None,
+        )
+
+    @staticmethod
+    def _stale_at(last_activity: datetime | None, tzinfo) -> datetime | None:
+        if not last_activity:
+            return None
+
+        if last_activity.tzinfo is None:
+            last_activity = last_activity.replace(tzinfo=tzinfo)
+        return last_activity + timedelta(days=STALE_DAYS)
+
     # ------------------------------------------------------------------
     # REGRAS DE BILLING
     # ------------------------------------------------------------------
@@ -308,6 +556,17 @@ class RulesEngine:
         since = now - timedelta(days=7)
         activity = self.store.get_activity_summary(case.id, since)
 
+        self._apply_billing_activity(case, activity)
+
+    def _apply_billing_activity(
+        self,
+        case: Case,
+        activity: ActivitySummary,
+    ) -> None:
+        """
+        BILLING_PENDING: actividade significativa na janela de billing.
+        """
+
         if activity.is_significant():
             case.attention_flags.add(AttentionFlag.BILLING_PENDING)
         else:
@@ -326,7 +585,17 @@ class RulesEngine:
             return False
 
         billing_records = self.store.list_billing_records(case.id)
-        if billing_records:
+        return self._is_billable(case, bool(billing_records))
+
+    def _is_billable(self, case: Case, has_billing_records: bool) -> bool:
+        """
+        Elegibilidade para faturação, dado o histórico de billing.
+        """
+
+        if case.priority == Priority.LOW:
+            return False
+
+        if has_billing_records:
             return True
 
         return case.priority in {
@@ -340,8 +609,4 @@ class RulesEngine:
         Última actividade registada num Caso.
         """
 
-        items = self.store.list_case_items(case.id)
-        if not items:
-            return None
-
-        return max(item.created_at for item in items)
+        return self.store.get_last_activity_at(case.id)
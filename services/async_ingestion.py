@@ -0,0 +1,416 @@
+"""
+Async Ingestion Pipeline
+
+Ingestão de e-mails em três etapas assíncronas, ligadas por filas
+limitadas (backpressure: quem submete espera quando a fila enche):
+
+    submit → [normalize] → [classify] → [apply]
+
+- normalize : descarta duplicados e normaliza
+- classify  : continuidade + classificação + criação de Casos,
+              por janelas (o que estiver na fila, até batch_size)
+- apply     : eventos no RulesEngine, agrupados por Caso
+
+Escritas no mesmo Caso são serializadas (um lock por Caso, por ordem
+de chegada); Casos diferentes avançam em paralelo entre os
+trabalhadores de apply.
+
+A classificação é uma única etapa sequencial: a continuidade
+depende da ordem de chegada. Threads e message_ids já encaminhados
+mas ainda não aplicados ficam num índice "em voo" partilhado
+entre janelas.
+
+O trabalho no store e no RulesEngine é síncrono: corre em threads
+(asyncio.to_thread), nunca no event loop. O índice "em voo" é
+protegido por um lock próprio, tomado sempre antes do store.
+Os Futures de quem submeteu só são resolvidos no event loop.
+
+As regras de encaminhamento são as do EmailIngestionService;
+este módulo só orquestra.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from services.email_ingestion_service import (
+    EmailIngestionService,
+    IngestionBatch,
+    IngestionResult,
+)
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("normalize", "classify", "apply")
+
+
+@dataclass
+class StageMetrics:
+    """
+    Latência acumulada de uma etapa.
+    """
+
+    processed: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float, items: int = 1) -> None:
+        self.processed += items
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "avg_ms": 1000 * self.total_seconds / self.processed if self.processed else 0.0,
+            "max_ms": 1000 * self.max_seconds,
+        }
+
+
+@dataclass
+class _ApplyJob:
+    """
+    Eventos de um Caso vindos de uma janela de classificação.
+    """
+
+    case_id: str
+    events: List[tuple]
+    results: List[Tuple[asyncio.Future, IngestionResult]]
+    message_ids: List[str] = field(default_factory=list)
+    thread_ids: List[str] = field(default_factory=list)
+
+
+class AsyncIngestionPipeline:
+    """
+    Pipeline assíncrono sobre um EmailIngestionService.
+
+    Uso:
+        async with AsyncIngestionPipeline(ingestion) as pipeline:
+            result = await pipeline.ingest(raw_email)
+    """
+
+    def __init__(
+        self,
+        ingestion: EmailIngestionService,
+        queue_size: int = 100,
+        batch_size: int = 50,
+        apply_workers: int = 4,
+    ):
+        self.ingestion = ingestion
+        self.store = ingestion.store
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.apply_workers = apply_workers
+
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+
+        # Encaminhados mas ainda não aplicados (partilhado entre janelas)
+        self._messages: Dict[str, Optional[str]] = {}
+        self._threads: Dict[str, str] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Um lock por Caso, removido quando ninguém o usa
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = defaultdict(int)
+
+        self.stage_metrics: Dict[str, StageMetrics] = {
+            stage: StageMetrics() for stage in STAGES
+        }
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._queues = {
+            stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES
+        }
+
+        self._tasks = [
+            asyncio.create_task(self._normalize_stage()),
+            asyncio.create_task(self._classify_stage()),
+            *(
+                asyncio.create_task(self._apply_stage())
+                for _ in range(self.apply_workers)
+            ),
+        ]
+
+    async def join(self) -> None:
+        """
+        Espera que tudo o que foi submetido esteja aplicado.
+        """
+
+        for stage in STAGES:
+            await self._queues[stage].join()
+
+    async def stop(self) -> None:
+        await self.join()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self) -> "AsyncIngestionPipeline":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    async def submit(self, raw_email: dict) -> asyncio.Future:
+        """
+        Entrega um e-mail ao pipeline (espera se a fila estiver cheia).
+        Devolve um Future com o IngestionResult, resolvido depois de aplicado.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queues["normalize"].put((raw_email, future))
+        return future
+
+    async def ingest(self, raw_email: dict) -> IngestionResult:
+        return await (await self.submit(raw_email))
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": {
+                stage: queue.qsize() for stage, queue in self._queues.items()
+            },
+            "stages": {
+                stage: m.as_dict() for stage, m in self.stage_metrics.items()
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Etapas
+    # ------------------------------------------------------------------
+
+    async def _normalize_stage(self) -> None:
+        queue = self._queues["normalize"]
+
+        while True:
+            raw, future = await queue.get()
+
+            try:
+                started = time.perf_counter()
+                try:
+                    email, duplicate = await asyncio.to_thread(self._normalize, raw)
+                except Exception as exc:
+                    _fail(future, exc)
+                    continue
+                finally:
+                    self.stage_metrics["normalize"].record(
+                        time.perf_counter() - started
+                    )
+
+                if duplicate:
+                    _resolve(future, duplicate)
+                else:
+                    await self._queues["classify"].put((email, future))
+
+            finally:
+                # Só depois de passar à etapa seguinte (join fiável)
+                queue.task_done()
+
+    def _normalize(self, raw: dict):
+        """
+        Corre numa thread. Devolve (email, None) ou (None, duplicado).
+        """
+        with self._inflight_lock:
+            # 1️⃣ Duplicados saem antes de qualquer trabalho
+            duplicate = self.ingestion.find_duplicate(
+                raw.get("message_id"), self._messages
+            )
+            if duplicate:
+                return None, duplicate
+
+            # 2️⃣ Normalizar
+            email = self.ingestion.normalizer.normalize(raw)
+
+            # Reservar já: cópias seguintes são duplicados
+            self._messages[email.message_id] = None
+            return email, None
+
+    async def _classify_stage(self) -> None:
+        queue = self._queues["classify"]
+
+        while True:
+            # Janela: o primeiro e-mail + o que já estiver à espera
+            window = [await queue.get()]
+            while len(window) < self.batch_size and not queue.empty():
+                window.append(queue.get_nowait())
+
+            try:
+                started = time.perf_counter()
+                try:
+                    jobs, ready = await asyncio.to_thread(self._classify, window)
+                except Exception as exc:
+                    for _, future in window:
+                        _fail(future, exc)
+                    continue
+                finally:
+                    self.stage_metrics["classify"].record(
+                        time.perf_counter() - started, len(window)
+                    )
+
+                for future, result in ready:
+                    _resolve(future, result)
+
+                for job in jobs:
+                    await self._queues["apply"].put(job)
+
+            finally:
+                for _ in window:
+                    queue.task_done()
+
+    def _classify(self, window):
+        """
+        Corre numa thread. Devolve (jobs de apply, resultados já prontos).
+        """
+        with self._inflight_lock:
+            # Threads que esta janela pode acrescentar (route só faz
+            # setdefault): as que já estavam em voo são de outras janelas
+            new_threads = {
+                email.thread_id
+                for email, _ in window
+                if email.thread_id and email.thread_id not in self._threads
+            }
+
+            try:
+                return self._classify_window(window)
+
+            except Exception:
+                # Nada desta janela chegou ao apply: sai todo do índice
+                for email, _ in window:
+                    self._messages.pop(email.message_id, None)
+                for thread_id in new_threads:
+                    self._threads.pop(thread_id, None)
+                raise
+
+    def _classify_window(self, window):
+        batch = IngestionBatch(
+            now=self.ingestion.clock.now(),
+            threads=self._threads,
+            messages=self._messages,
+        )
+
+        jobs: Dict[str, _ApplyJob] = {}
+        ready: List[Tuple[asyncio.Future, IngestionResult]] = []
+
+        with self.store.transaction():
+            for email, future in window:
+                result = self.ingestion.route(email, batch)
+
+                if result.case_id not in batch.events:
+                    # Sem eventos (pessoal, pendente, ignorado): pronto
+                    self._messages.pop(email.message_id, None)
+                    ready.append((future, result))
+                    continue
+
+                job = jobs.get(result.case_id)
+                if job is None:
+                    job = jobs[result.case_id] = _ApplyJob(
+                        case_id=result.case_id,
+                        events=batch.events[result.case_id],
+                        results=[],
+                    )
+
+                job.results.append((future, result))
+                job.message_ids.append(email.message_id)
+                if email.thread_id:
+                    job.thread_ids.append(email.thread_id)
+
+        # Só depois do commit da janela
+        self.ingestion.publish_pending(batch.pending)
+
+        return list(jobs.values()), ready
+
+    async def _apply_stage(self) -> None:
+        queue = self._queues["apply"]
+
+        while True:
+            job = await queue.get()
+
+            try:
+                await self._apply(job)
+            finally:
+                queue.task_done()
+
+    async def _apply(self, job: _ApplyJob) -> None:
+        # O primeiro job retirado da fila é o primeiro a obter o lock
+        lock = self._locks.setdefault(job.case_id, asyncio.Lock())
+        self._lock_users[job.case_id] += 1
+
+        try:
+            async with lock:
+                started = time.perf_counter()
+
+                try:
+                    await asyncio.to_thread(self._apply_events, job)
+
+                except Exception as exc:
+                    logger.exception("Falha a aplicar eventos do Caso %s", job.case_id)
+                    for future, _ in job.results:
+                        _fail(future, exc)
+
+                else:
+                    for future, result in job.results:
+                        _resolve(future, result)
+
+                finally:
+                    self.stage_metrics["apply"].record(
+                        time.perf_counter() - started, len(job.results)
+                    )
+
+        finally:
+            self._lock_users[job.case_id] -= 1
+            if not self._lock_users[job.case_id]:
+                del self._lock_users[job.case_id]
+                self._locks.pop(job.case_id, None)
+
+    def _apply_events(self, job: _ApplyJob) -> None:
+        """
+        Corre numa thread, com o lock do Caso obtido no event loop.
+        """
+        try:
+            # Reler dentro do lock: outro job pode ter mudado o Caso
+            case = self.store.get_case(job.case_id)
+            self.ingestion.rules_engine.handle_events(case, job.events)
+
+        finally:
+            # Já estão no store (ou falharam): deixam de estar "em voo"
+            with self._inflight_lock:
+                self._release_inflight(job)
+
+    def _release_inflight(self, job: _ApplyJob) -> None:
+        for message_id in job.message_ids:
+            self._messages.pop(message_id, None)
+
+        for thread_id in job.thread_ids:
+            if self._threads.get(thread_id) == job.case_id:
+                del self._threads[thread_id]
+
+
+# ----------------------------------------------------------------------
+
+def _resolve(future: asyncio.Future, result: IngestionResult) -> None:
+    # Quem submeteu pode ter desistido (cancelado) entretanto
+    if not future.done():
+        future.set_result(result)
+
+
+def _fail(future: asyncio.Future, exc: Exception) -> None:
+    if not future.done():
+        future.set_exception(exc)
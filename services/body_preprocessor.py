@@ -0,0 +1,76 @@
+"""
+Body Preprocessor
+
+Reduz o corpo de um e-mail ao texto novo, antes da pontuação
+de contexto no EmailNormalizer:
+- remove linhas citadas ("> ...")
+- corta no cabeçalho de resposta ("On ... wrote:", "Em ... escreveu:",
+  "-----Original Message-----")
+- corta na assinatura ("-- ") e em avisos legais
+- limita o nº de caracteres lidos e guardados
+
+O custo por mensagem fica limitado por `max_raw_chars`,
+seja qual for o tamanho do histórico citado.
+
+Este módulo é puro: não lê nem escreve no store.
+"""
+
+import re
+
+# Linhas a partir das quais o resto do corpo não é texto novo
+_CUT = re.compile(
+    r"""^\s*(?:
+        on\s.+\swrote:\s*$                          # Gmail / Apple (en)
+      | em\s.+\sescreveu:\s*$                       # Gmail (pt)
+      | -{2,}\s*(?:original\s+message|mensagem\s+original)\s*-{2,}
+      | --\s*$                                      # separador de assinatura
+      | (?:confidentiality\s+notice|disclaimer
+         |aviso\s+de\s+confidencialidade
+         |this\s+e-?mail\s+and\s+any\s+attachments
+         |esta\s+mensagem\s+(?:e\s+quaisquer\s+anexos\s+)?(?:é|e)\s+confidencial)
+    )""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+class BodyPreprocessor:
+    """
+    Limpeza configurável do corpo para pontuação.
+    """
+
+    def __init__(
+        self,
+        max_raw_chars: int = 100_000,
+        max_scan_chars: int = 20_000,
+        strip_quotes: bool = True,
+        cut_replies: bool = True,
+    ):
+        self.max_raw_chars = max_raw_chars
+        self.max_scan_chars = max_scan_chars
+        self.strip_quotes = strip_quotes
+        self.cut_replies = cut_replies
+
+    def clean(self, body: str) -> str:
+        """
+        Texto novo do corpo, no máximo `max_scan_chars` caracteres.
+        """
+
+        if not body:
+            return ""
+
+        kept = []
+        size = 0
+
+        for line in body[:self.max_raw_chars].splitlines():
+            if self.strip_quotes and line.lstrip().startswith(">"):
+                continue
+
+            if self.cut_replies and _CUT.match(line):
+                break
+
+            kept.append(line)
+            size += len(line) + 1
+            if size >= self.max_scan_chars:
+                break
+
+        return "\n".join(kept)[:self.max_scan_chars]
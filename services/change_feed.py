@@ -0,0 +1,104 @@
+"""
+Change Feed
+
+Registo em memória, ordenado, das mudanças visíveis no sistema
+(cartas, Casos, classificações pendentes).
+
+Cada mudança tem um número de sequência crescente:
+- quem consome guarda o último número visto e pede só o que veio depois
+- o navegador (EventSource) reenvia-o em Last-Event-ID ao religar
+
+Só as últimas `maxlen` mudanças são guardadas. Um consumidor que
+ficou para trás recebe ChangeFeedGap e deve recarregar tudo.
+
+Este módulo:
+- NÃO decide nada
+- NÃO lê nem escreve no store
+"""
+
+import json
+import threading
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+class ChangeFeedGap(LookupError):
+    pass
+
+
+@dataclass(frozen=True)
+class Change:
+    seq: int
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_sse(self) -> str:
+        """
+        Formato text/event-stream (id / event / data).
+        """
+        payload = json.dumps(self.data, default=str, ensure_ascii=False)
+        return f"id: {self.seq}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class ChangeFeed:
+    """
+    Uso:
+        feed = ChangeFeed()
+        feed.publish("card.add", {...})
+
+        changes = feed.wait(last_seq, timeout=15)
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self._changes: deque[Change] = deque(maxlen=maxlen)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def publish(self, type: str, data: Optional[Dict[str, Any]] = None) -> Change:
+        with self._cond:
+            self._seq += 1
+            change = Change(seq=self._seq, type=type, data=data or {})
+            self._changes.append(change)
+            self._cond.notify_all()
+
+        return change
+
+    def since(self, seq: int) -> List[Change]:
+        """
+        Mudanças com número > seq (sem esperar).
+        """
+        with self._cond:
+            return self._since(seq)
+
+    def wait(self, seq: int, timeout: Optional[float] = None) -> List[Change]:
+        """
+        Como since(), mas espera até haver alguma mudança nova.
+        Devolve [] se o timeout passar sem mudanças.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq, timeout)
+            return self._since(seq)
+
+    # ------------------------------------------------------------------
+
+    def _since(self, seq: int) -> List[Change]:
+        if seq > self._seq:
+            # Número de outro feed (ex.: processo reiniciado)
+            raise ChangeFeedGap(f"Mudança {seq} ainda não existe")
+
+        if seq == self._seq:
+            return []
+
+        first = self._changes[0].seq
+        if seq < first - 1:
+            raise ChangeFeedGap(f"Mudanças {seq + 1}..{first - 1} já descartadas")
+
+        # Números contíguos: a posição sai do número
+        return list(islice(self._changes, seq - first + 1, None))
@@ -13,12 +13,13 @@ Ele apenas classifica e devolve confiança.
 """
 
 from dataclasses import dataclass
-from typing import Optional, List
-from difflib import SequenceMatcher
+from typing import Any, Dict, Optional, List, Tuple
 
 from model.entities import Case
 from model.enums import WorkStatus
 from services.email_normalizer import NormalizedEmail
+from model.subject_text import subject_tokens, client_token
+from services.similarity import SimilarityEngine, TokenSetSimilarity
 from store.inmemory import InMemoryStore
 
 
@@ -38,8 +39,28 @@ class ClassificationService:
     Serviço de classificação de e-mails.
     """
 
-    def __init__(self, store: InMemoryStore):
+    def __init__(
+        self,
+        store: InMemoryStore,
+        shortlist_size: int = 20,
+        similarity: Optional[SimilarityEngine] = None,
+    ):
+        """
+        shortlist_size:
+            Máximo de Casos candidatos avaliados por e-mail.
+            Escolhidos pelo índice de palavras do título (e cliente)
+            antes de qualquer comparação cara.
+
+        similarity:
+            Motor de similaridade de assuntos (ver services.similarity).
+            Por omissão, Jaccard sobre palavras.
+        """
         self.store = store
+        self.shortlist_size = shortlist_size
+        self.similarity = similarity or TokenSetSimilarity()
+
+        # Títulos já preparados pelo motor: case_id → (título, preparado)
+        self._prepared_titles: Dict[str, Tuple[str, Any]] = {}
 
     # ------------------------------------------------------------------
     # API pública
@@ -59,8 +80,15 @@ class ClassificationService:
                 rationale="Nenhum caso existente relevante encontrado.",
             )
 
+        subject = self.similarity.prepare(email.subject)
+        thread_case_id = (
+            self.store.find_case_id_by_thread(email.thread_id)
+            if email.thread_id
+            else None
+        )
+
         scored = [
-            (case, self._score_case(case, email))
+            (case, self._score_case(case, email, subject, thread_case_id))
             for case in candidates
         ]
 
@@ -82,35 +110,65 @@ class ClassificationService:
     def _candidate_cases(self, email: NormalizedEmail) -> List[Case]:
         """
         Selecciona casos que podem ser relevantes para este e-mail.
-        """
-
-        cases = self.store.list_cases()
 
-        # Ignorar casos arquivados
-        cases = [c for c in cases if c.status != WorkStatus.ARCHIVED]
+        Só chegam aqui Casos que partilham palavras do assunto ou o
+        cliente (índice invertido), ordenados por nº de palavras em comum
+        e limitados a `shortlist_size`.
+        """
 
         # Contexto pessoal → não tenta colar a casos profissionais
         if email.context == "personal":
             return []
 
+        tokens = set(subject_tokens(email.subject))
+        client = client_token(email.from_address)
+        if client:
+            tokens.add(client)
+
+        hits = self.store.match_case_tokens(tokens)
+
+        # O Caso do mesmo thread entra sempre na lista
+        if email.thread_id:
+            thread_case_id = self.store.find_case_id_by_thread(email.thread_id)
+            if thread_case_id:
+                hits[thread_case_id] = len(tokens) + 1
+
+        ranked = sorted(hits, key=hits.get, reverse=True)
+
+        cases: List[Case] = []
+        for case_id in ranked:
+            case = self.store.get_case(case_id)
+
+            # Ignorar casos arquivados
+            if case is None or case.status == WorkStatus.ARCHIVED:
+                continue
+
+            cases.append(case)
+            if len(cases) >= self.shortlist_size:
+                break
+
         return cases
 
-    def _score_case(self, case: Case, email: NormalizedEmail) -> float:
+    def _score_case(
+        self,
+        case: Case,
+        email: NormalizedEmail,
+        subject: Any,
+        thread_case_id: Optional[str],
+    ) -> float:
         """
         Calcula um score [0.0 - 1.0] de correspondência entre email e caso.
+        `subject` vem já preparado pelo motor de similaridade.
         """
 
         score = 0.0
 
         # 1️⃣ Thread match (fortíssimo)
-        if email.thread_id:
-            for item in self.store.list_case_items(case.id):
-                if item.metadata.get("thread_id") == email.thread_id:
-                    score += 0.6
-                    break
+        if thread_case_id == case.id:
+            score += 0.6
 
         # 2️⃣ Similaridade de assunto
-        score += 0.2 * self._similarity(case.title.lower(), email.subject.lower())
+        score += 0.2 * self.similarity.compare(self._prepared_title(case), subject)
 
         # 3️⃣ Contexto profissional
         if email.context == "professional":
@@ -119,9 +177,14 @@ class ClassificationService:
         # Clamp
         return min(score, 1.0)
 
-    @staticmethod
-    def _similarity(a: str, b: str) -> float:
+    def _prepared_title(self, case: Case) -> Any:
         """
-        Similaridade simples entre strings.
+        Título do Caso preparado pelo motor, calculado uma vez por Caso.
         """
-        return SequenceMatcher(None, a, b).ratio()
+
+        cached = self._prepared_titles.get(case.id)
+        if cached is None or cached[0] != case.title:
+            cached = (case.title, self.similarity.prepare(case.title))
+            self._prepared_titles[case.id] = cached
+
+        return cached[1]
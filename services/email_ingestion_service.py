@@ -12,8 +12,10 @@ Responsabilidades:
 - guardar classificações pendentes quando há ambiguidade
 """
 
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 from uuid import uuid4
 from store.protocol import StoreProtocol
 
@@ -24,6 +26,7 @@ from portals.classification_decision import (
     ClassificationDecision,
 )
 from rules.rules_engine import RulesEngine
+from services.change_feed import ChangeFeed
 from model.entities import Case
 from model.enums import (
     WorkStatus,
@@ -31,6 +34,59 @@ from model.enums import (
     CaseEventType,
 )
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionResult:
+    """
+    O que aconteceu a um e-mail na entrada.
+
+    action:
+    - "continued" → continuidade (thread_id ou heurística)
+    - "attached"  → associado a Caso existente pela classificação
+    - "created"   → novo Caso
+    - "personal"  → Caso pessoal (fora do fluxo)
+    - "pending"   → ambíguo, aguarda o utilizador
+    - "ignored"   → Caso sugerido já não existe
+    - "duplicate" → message_id já registado (re-sync, retry)
+    """
+
+    message_id: Optional[str]
+    action: str
+    case_id: Optional[str] = None
+
+
+@dataclass
+class IngestionBatch:
+    """
+    Estado de um lote de ingestão.
+
+    Criado por quem encaminha (ingest_many, AsyncIngestionPipeline) e
+    passado a route() e-mail a e-mail. `threads` / `messages` podem
+    ser partilhados entre lotes (ex.: o índice "em voo" do pipeline).
+    """
+
+    now: datetime
+
+    # Um único objecto Case por id durante o lote
+    cases: Dict[str, Case] = field(default_factory=dict)
+
+    # Eventos a aplicar no fim, por Caso (ordem de chegada)
+    events: Dict[str, List[tuple]] = field(default_factory=dict)
+
+    # thread_id → case_id vistos no lote (ainda por registar no store)
+    threads: Dict[str, str] = field(default_factory=dict)
+
+    # message_id → case_id já encaminhados no lote
+    messages: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    # (remetente, título) → Casos; construído uma vez por lote
+    by_sender_subject: Optional[Dict[Tuple[str, str], List[Case]]] = None
+
+    # Classificações pendentes criadas no lote (ver ChangeFeed)
+    pending: List[Dict] = field(default_factory=list)
+
 
 class EmailIngestionService:
     """
@@ -42,11 +98,15 @@ class EmailIngestionService:
         store: StoreProtocol,
         rules_engine: RulesEngine,
         clock,
+        change_feed: Optional[ChangeFeed] = None,
     ):
         self.store = store
         self.rules_engine = rules_engine
         self.clock = clock
 
+        # Mudanças para o dashboard ao vivo (opcional)
+        self.change_feed = change_feed
+
         self.normalizer = EmailNormalizer()
         self.classifier = ClassificationService(store)
         self.classification_decider = ClassificationDecisionEngine()
@@ -59,43 +119,129 @@ class EmailIngestionService:
     # ------------------------------------------------------------------
 
     def ingest(self, raw_email: dict) -> None:
-        now = self.clock.now()
+        self.ingest_many([raw_email])
 
-        # 1️⃣ Normalizar
-        email = self.normalizer.normalize(raw_email)
+    def ingest_many(self, raw_emails: Iterable[dict]) -> List[IngestionResult]:
+        """
+        Entrada de um lote de e-mails, num único commit.
 
-        # 2️⃣ CONTINUIDADE TEM PRIORIDADE ABSOLUTA
-        continuation = self._find_continuation_case(email, now)
+        Cada e-mail é encaminhado pela ordem de chegada (continuidade
+        e classificação vêem os Casos criados antes no mesmo lote);
+        os eventos são agrupados e o RulesEngine corre uma vez por Caso.
+        """
+
+        batch = IngestionBatch(now=self.clock.now())
+        results: List[IngestionResult] = []
+
+        with self.store.transaction():
+            for raw in raw_emails:
+                # 1️⃣ Duplicados saem antes de qualquer trabalho
+                duplicate = self.find_duplicate(raw.get("message_id"), batch.messages)
+                if duplicate:
+                    results.append(duplicate)
+                    continue
+
+                # 2️⃣ Normalizar
+                email = self.normalizer.normalize(raw)
+
+                # 3️⃣ Encaminhar
+                results.append(self.route(email, batch))
+
+            # 4️⃣ Aplicar regras uma vez por Caso
+            for case_id, events in batch.events.items():
+                self.rules_engine.handle_events(batch.cases[case_id], events)
+
+        # 5️⃣ Pendências novas, só depois do commit
+        self.publish_pending(batch.pending)
+
+        return results
+
+    def find_duplicate(
+        self,
+        message_id: Optional[str],
+        seen: Dict[str, Optional[str]],
+    ) -> Optional[IngestionResult]:
+        """
+        E-mail já visto: em `seen` (lote) ou registado num Caso (índice do store).
+        Pendências ainda não estão no store e não contam.
+        """
+
+        if not message_id:
+            return None
+
+        if message_id in seen:
+            case_id = seen[message_id]
+        else:
+            case_id = self.store.find_case_id_by_message(message_id)
+            if case_id is None:
+                return None
+
+        logger.info("🧠 DUPLICADO IGNORADO — message_id: %s", message_id)
+
+        return IngestionResult(message_id, "duplicate", case_id)
+
+    def route(
+        self,
+        email: NormalizedEmail,
+        batch: IngestionBatch,
+    ) -> IngestionResult:
+        """
+        Encaminha um e-mail normalizado dentro de um lote.
+
+        Escreve no store (Casos novos, pessoais) e acumula em
+        batch.events os eventos a aplicar; NÃO corre o RulesEngine.
+        Quem chama abre a transacção e, depois do commit, aplica
+        os eventos e chama publish_pending(batch.pending).
+        """
+        result = self._route(email, batch)
+        batch.messages[email.message_id] = result.case_id
+        return result
+
+    def _route(
+        self,
+        email: NormalizedEmail,
+        batch: IngestionBatch,
+    ) -> IngestionResult:
+        # 1️⃣ CONTINUIDADE TEM PRIORIDADE ABSOLUTA
+        continuation = self._find_continuation_case(email, batch)
         if continuation:
-            print("🧠 CONTINUIDADE APLICADA")
-            print(f"   • case_id: {continuation.id}")
-            print(f"   • motivo: thread_id ou heurística")
+            logger.info(
+                "🧠 CONTINUIDADE APLICADA — case_id: %s (thread_id ou heurística)",
+                continuation.id,
+            )
 
-            self._attach_to_case_by_id(email, continuation.id, now)
-            return
+            self._queue_inbound(email, continuation, batch)
+            return IngestionResult(email.message_id, "continued", continuation.id)
 
-        print("🧠 SEM CONTINUIDADE — A CLASSIFICAR")
+        logger.info("🧠 SEM CONTINUIDADE — A CLASSIFICAR")
 
-        # 3️⃣ Casos pessoais não entram no fluxo
+        # 2️⃣ Casos pessoais não entram no fluxo
         if email.context == "personal":
-            self._create_personal_case(email)
-            return
+            case = self._create_personal_case(email, batch)
+            return IngestionResult(email.message_id, "personal", case.id)
 
-        # 4️⃣ Avaliar (factos)
+        # 3️⃣ Avaliar (factos)
         result = self.classifier.classify(email)
 
-        # 5️⃣ Decidir (política)
+        # 4️⃣ Decidir (política)
         decision = self.classification_decider.decide(result)
 
-        # 6️⃣ Executar decisão
+        # 5️⃣ Executar decisão
         if decision.action == "attach_existing":
-            self._attach_to_case_by_id(email, decision.case_id, now)
+            case = self._load_case(decision.case_id, batch)
+            if not case:
+                return IngestionResult(email.message_id, "ignored", decision.case_id)
+
+            self._queue_inbound(email, case, batch)
+            return IngestionResult(email.message_id, "attached", case.id)
 
         elif decision.action == "create_new":
-            self._create_new_case(email, decision, now)
+            case = self._create_new_case(email, decision, batch)
+            return IngestionResult(email.message_id, "created", case.id)
 
         elif decision.action == "ask_user":
-            self._enqueue_pending(email, decision, now)
+            self._enqueue_pending(email, decision, batch)
+            return IngestionResult(email.message_id, "pending")
 
         else:
             raise RuntimeError(f"Decisão desconhecida: {decision.action}")
@@ -105,12 +251,16 @@ class EmailIngestionService:
     # Caminhos
     # ------------------------------------------------------------------
 
-    def _create_personal_case(self, email: NormalizedEmail) -> None:
+    def _create_personal_case(
+        self,
+        email: NormalizedEmail,
+        batch: IngestionBatch,
+    ) -> Case:
         """
         Cria um Caso pessoal fora do fluxo económico.
         """
 
-        now = self.clock.now()
+        now = batch.now
 
         case = Case(
             id=str(uuid4()),
@@ -124,41 +274,56 @@ class EmailIngestionService:
         )
 
         self.store.add_case(case)
+        self._remember_case(case, batch)
+
+        # O e-mail fica registado (re-sync → duplicado), sem timeline
+        if email.message_id:
+            self.store.add_message(email.message_id, case.id)
 
         # ❗ NOTA: casos pessoais não disparam rules_engine
+        return case
 
-    def _attach_to_case_by_id(
+    def _queue_inbound(
         self,
         email: NormalizedEmail,
-        case_id: str,
-        now: datetime,
+        case: Case,
+        batch: IngestionBatch,
+        **extra_context,
     ) -> None:
-        case = self.store.get_case(case_id)
-        if not case:
-            return
+        """
+        Acumula o EMAIL_INBOUND do e-mail para o Caso.
+        """
 
-        self.rules_engine.handle_event(
-            case=case,
-            event_type=CaseEventType.EMAIL_INBOUND,
-            event_context={
-                "message_id": email.message_id,
-                "thread_id": email.thread_id,
-                "from": email.from_address,
-                "subject": email.subject,
-            },
-            now=now,
+        batch.events.setdefault(case.id, []).append(
+            (
+                CaseEventType.EMAIL_INBOUND,
+                {
+                    "message_id": email.message_id,
+                    "thread_id": email.thread_id,
+                    "from": email.from_address,
+                    "subject": email.subject,
+                    **extra_context,
+                },
+                batch.now,
+            )
         )
 
+        # A thread fica deste Caso já dentro do lote
+        if email.thread_id:
+            batch.threads.setdefault(email.thread_id, case.id)
+
     def _create_new_case(
         self,
         email: NormalizedEmail,
         decision: ClassificationDecision,
-        now: datetime,
-    ) -> None:
+        batch: IngestionBatch,
+    ) -> Case:
         """
         Cria um novo Caso a partir de um e-mail.
         """
 
+        now = batch.now
+
         case = Case(
             id=str(uuid4()),
             title=email.subject or "Novo assunto",
@@ -171,25 +336,22 @@ class EmailIngestionService:
         )
 
         self.store.add_case(case)
+        self._remember_case(case, batch)
 
-        self.rules_engine.handle_event(
-            case=case,
-            event_type=CaseEventType.EMAIL_INBOUND,
-            event_context={
-                "message_id": email.message_id,
-                "thread_id": email.thread_id,
-                "from": email.from_address,
-                "subject": email.subject,
-                "confidence": decision.confidence,
-            },
-            now=now,
+        self._queue_inbound(
+            email,
+            case,
+            batch,
+            confidence=decision.confidence,
         )
 
+        return case
+
     def _enqueue_pending(
         self,
         email: NormalizedEmail,
         decision: ClassificationDecision,
-        now: datetime,
+        batch: IngestionBatch,
     ) -> None:
         suggested_case = (
             self.store.get_case(decision.case_id)
@@ -197,14 +359,40 @@ class EmailIngestionService:
             else None
         )
 
-        self.pending_classifications.append(
-            {
-                "email": email,
-                "decision": decision,
-                "suggested_case": suggested_case,
-                "created_at": now,
-            }
-        )
+        pending = {
+            "email": email,
+            "decision": decision,
+            "suggested_case": suggested_case,
+            "created_at": batch.now,
+        }
+
+        self.pending_classifications.append(pending)
+        batch.pending.append(pending)
+
+    def publish_pending(self, pending: List[Dict]) -> None:
+        """
+        Publica no ChangeFeed as classificações pendentes de um lote.
+        Só depois do commit do lote.
+        """
+        if self.change_feed is None:
+            return
+
+        for item in pending:
+            email = item["email"]
+            decision = item["decision"]
+            case = item["suggested_case"]
+
+            self.change_feed.publish(
+                "classification.add",
+                {
+                    "message_id": email.message_id,
+                    "subject": email.subject,
+                    "suggested_case_id": case.id if case else None,
+                    "suggested_case_title": case.title if case else None,
+                    "confidence": decision.confidence,
+                    "reason": decision.reason,
+                },
+            )
 
     # ------------------------------------------------------------------
     # Heurísticas locais
@@ -223,7 +411,7 @@ class EmailIngestionService:
     def _find_continuation_case(
         self,
         email: NormalizedEmail,
-        now: datetime,
+        batch: IngestionBatch,
     ) -> Optional[Case]:
         """
         Tenta encontrar um Caso existente plausível para continuação.
@@ -232,20 +420,57 @@ class EmailIngestionService:
 
         # 1️⃣ thread_id é critério forte
         if email.thread_id:
-            for case in self.store.list_cases():
-                for item in self.store.list_case_items(case.id):
-                    if item.metadata.get("thread_id") == email.thread_id:
-                        return case
+            case_id = (
+                self.store.find_case_id_by_thread(email.thread_id)
+                or batch.threads.get(email.thread_id)
+            )
+            if case_id:
+                case = self._load_case(case_id, batch)
+                if case:
+                    return case
 
         # 2️⃣ Mesmo remetente + mesmo assunto + recente
-        for case in self.store.list_cases():
-            if case.client_id != email.from_address:
-                continue
+        key = (email.from_address, (email.subject or "").strip().lower())
+        for case in self._cases_by_sender_subject(batch).get(key, []):
+            if (batch.now - case.created_at).days <= 7:
+                return batch.cases.setdefault(case.id, case)
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Casos do lote
+    # ------------------------------------------------------------------
 
-            if case.title.strip().lower() != (email.subject or "").strip().lower():
-                continue
+    def _load_case(
+        self,
+        case_id: Optional[str],
+        batch: IngestionBatch,
+    ) -> Optional[Case]:
+        if case_id in batch.cases:
+            return batch.cases[case_id]
 
-            if (now - case.created_at).days <= 7:
-                return case
+        case = self.store.get_case(case_id) if case_id else None
+        if case:
+            batch.cases[case.id] = case
+        return case
 
-        return None
+    def _cases_by_sender_subject(
+        self,
+        batch: IngestionBatch,
+    ) -> Dict[Tuple[str, str], List[Case]]:
+        # Uma leitura de list_cases por lote, não por e-mail
+        if batch.by_sender_subject is None:
+            batch.by_sender_subject = {}
+            for case in self.store.list_cases():
+                self._index_sender_subject(case, batch)
+
+        return batch.by_sender_subject
+
+    def _remember_case(self, case: Case, batch: IngestionBatch) -> None:
+        batch.cases[case.id] = case
+        if batch.by_sender_subject is not None:
+            self._index_sender_subject(case, batch)
+
+    def _index_sender_subject(self, case: Case, batch: IngestionBatch) -> None:
+        key = (case.client_id, case.title.strip().lower())
+        batch.by_sender_subject.setdefault(key, []).append(case)
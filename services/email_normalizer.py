@@ -16,6 +16,9 @@ from dataclasses import dataclass
 from typing import Optional
 import re
 
+from services.body_preprocessor import BodyPreprocessor
+from services.keyword_matcher import KeywordMatcher
+
 
 @dataclass
 class NormalizedEmail:
@@ -62,13 +65,22 @@ class EmailNormalizer:
         "domingo",
     }
 
+    def __init__(self, preprocessor: Optional[BodyPreprocessor] = None):
+        # Só o texto novo do corpo conta para o contexto
+        self.preprocessor = preprocessor or BodyPreprocessor()
+
+        # Todas as palavras-chave numa só passagem pelo texto
+        self._keywords = KeywordMatcher(
+            self.PROFESSIONAL_KEYWORDS | self.PERSONAL_KEYWORDS
+        )
+
     def normalize(self, raw_email: dict) -> NormalizedEmail:
         """
         Recebe um e-mail cru (mock ou real) e devolve NormalizedEmail.
         """
 
         subject = (raw_email.get("subject") or "").lower()
-        body = (raw_email.get("body") or "").lower()
+        body = self.preprocessor.clean(raw_email.get("body") or "").lower()
         from_addr = raw_email.get("from", "")
 
         context, confidence = self._infer_context(subject, body, from_addr)
@@ -79,7 +91,7 @@ class EmailNormalizer:
             from_address=from_addr,
             to_addresses=raw_email.get("to", []),
             subject=raw_email.get("subject", ""),
-            body=raw_email.get("body", ""),
+            body=raw_email.get("body", ""),  # original, intacto
             context=context,
             confidence=confidence,
         )
@@ -93,15 +105,15 @@ class EmailNormalizer:
 
         score = 0.0
 
+        found = self._keywords.find(subject, body)
+
         # Palavras-chave profissionais
-        for kw in self.PROFESSIONAL_KEYWORDS:
-            if kw in subject or kw in body:
-                score += 0.3
+        for _ in found & self.PROFESSIONAL_KEYWORDS:
+            score += 0.3
 
         # Palavras-chave pessoais
-        for kw in self.PERSONAL_KEYWORDS:
-            if kw in subject or kw in body:
-                score -= 0.2
+        for _ in found & self.PERSONAL_KEYWORDS:
+            score -= 0.2
 
         # Domínio de email
         if re.search(r"@(gmail|hotmail|outlook)\.", from_addr):
@@ -0,0 +1,92 @@
+"""
+Keyword Matcher
+
+Procura de muitas palavras-chave num texto, numa só passagem.
+
+As palavras são compiladas numa única expressão regular em forma de
+trie (prefixos comuns partilhados), dentro de um lookahead:
+em cada posição do texto só são seguidos os ramos que ainda
+coincidem, e fica a palavra mais longa que começa ali.
+As palavras contidas nessa (prefixos, sufixos, meio) são
+acrescentadas por um fecho pré-calculado.
+
+Resultado: o mesmo que `kw in text` para cada palavra,
+com custo independente do número de palavras.
+
+Este módulo é puro: não lê nem escreve no store.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable
+
+
+class KeywordMatcher:
+    """
+    Conjunto de palavras-chave compilado para procura numa passagem.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: FrozenSet[str] = frozenset(kw for kw in keywords if kw)
+
+        # Palavra → palavras que contém (incluindo ela própria)
+        self._contained: Dict[str, FrozenSet[str]] = {
+            kw: frozenset(other for other in self.keywords if other in kw)
+            for kw in self.keywords
+        }
+
+        self._pattern = (
+            re.compile(f"(?=({_trie_pattern(self.keywords)}))")
+            if self.keywords
+            else None
+        )
+
+    def find(self, *texts: str) -> FrozenSet[str]:
+        """
+        Palavras-chave presentes em pelo menos um dos textos.
+        """
+
+        if self._pattern is None:
+            return frozenset()
+
+        longest = set()
+        for text in texts:
+            if text:
+                longest.update(m.group(1) for m in self._pattern.finditer(text))
+
+        found = set()
+        for kw in longest:
+            found |= self._contained[kw]
+
+        return frozenset(found)
+
+
+# ----------------------------------------------------------------------
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    trie: dict = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # fim de palavra
+
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: dict) -> str:
+    branches = [
+        re.escape(ch) + _node_pattern(child)
+        for ch, child in sorted(node.items())
+        if ch
+    ]
+
+    if not branches:
+        return ""
+
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    # Fim de palavra aqui: o ramo mais longo é opcional (greedy → mais longa primeiro)
+    if "" in node:
+        pattern = "(?:" + pattern + ")?"
+
+    return pattern
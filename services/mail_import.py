@@ -0,0 +1,241 @@
+"""
+Mail Import
+
+Leitura de arquivos de e-mail reais para o fluxo de ingestão:
+- ficheiros mbox (um ficheiro, muitas mensagens)
+- árvores Maildir (cur/ + new/)
+- directórios de ficheiros .eml (ou um único .eml)
+
+Tudo é lido de forma preguiçosa (geradores): só uma mensagem
+está em memória de cada vez, independentemente do tamanho do arquivo.
+Os ficheiros mbox são percorridos via mmap.
+
+Cada mensagem é convertida no e-mail cru (dict) que
+EmailNormalizer.normalize espera.
+
+Este módulo:
+- NÃO cria Casos
+- NÃO classifica
+- NÃO escreve no store (import_mail delega no EmailIngestionService)
+"""
+
+import hashlib
+import mmap
+import os
+import re
+from collections import Counter
+from email import policy
+from email.parser import BytesParser
+from email.utils import getaddresses, parseaddr
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+_PARSER = BytesParser(policy=policy.default)
+
+_MSG_ID = re.compile(r"<([^<>]+)>")
+
+# mboxrd: linhas ">From ", ">>From ", ... perdem um ">" ao ler
+_MBOX_ESCAPED_FROM = re.compile(rb"^>(>*From )", re.MULTILINE)
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+
+# ----------------------------------------------------------------------
+# Mensagem → e-mail cru
+# ----------------------------------------------------------------------
+
+def parse_message(data: bytes) -> dict:
+    """
+    Converte os bytes de uma mensagem RFC 5322 num e-mail cru.
+    """
+
+    msg = _PARSER.parsebytes(data)
+
+    message_id = _first_message_id(msg.get("Message-ID"))
+    if not message_id:
+        # Sem Message-ID: identificador estável derivado do conteúdo
+        message_id = "sha1-" + hashlib.sha1(data).hexdigest()
+
+    return {
+        "message_id": message_id,
+        "thread_id": _thread_id(msg, message_id),
+        "from": parseaddr(str(msg.get("From", "")))[1].lower(),
+        "to": [
+            addr.lower()
+            for _, addr in getaddresses(
+                [str(v) for v in msg.get_all("To", []) + msg.get_all("Cc", [])]
+            )
+            if addr
+        ],
+        "subject": str(msg.get("Subject", "") or ""),
+        "body": _text_body(msg),
+        "direction": "inbound",
+    }
+
+
+def _first_message_id(value) -> Optional[str]:
+    match = _MSG_ID.search(str(value or ""))
+    if match:
+        return match.group(1).strip()
+
+    value = str(value or "").strip()
+    return value or None
+
+
+def _thread_id(msg, message_id: str) -> str:
+    """
+    Identificador da conversa:
+    - 1.º id de References (raiz da thread)
+    - senão In-Reply-To (mensagem respondida)
+    - senão o próprio Message-ID (início de conversa)
+    """
+
+    references = _MSG_ID.findall(str(msg.get("References", "") or ""))
+    if references:
+        return references[0].strip()
+
+    in_reply_to = _first_message_id(msg.get("In-Reply-To"))
+    if in_reply_to:
+        return in_reply_to
+
+    return message_id
+
+
+def _text_body(msg) -> str:
+    """
+    Corpo em texto: text/plain preferido, text/html sem tags como recurso.
+    """
+
+    part = msg.get_body(preferencelist=("plain", "html"))
+    if part is None:
+        return ""
+
+    try:
+        content = part.get_content()
+    except (LookupError, UnicodeError):
+        payload = part.get_payload(decode=True) or b""
+        content = payload.decode("utf-8", errors="replace")
+
+    if part.get_content_subtype() == "html":
+        content = _HTML_TAG.sub(" ", content)
+
+    return content
+
+
+# ----------------------------------------------------------------------
+# Leitores (geradores)
+# ----------------------------------------------------------------------
+
+def iter_mbox(path: str) -> Iterator[dict]:
+    """
+    Mensagens de um ficheiro mbox, uma a uma, via mmap.
+    """
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0 if mm[:5] == b"From " else mm.find(b"\nFrom ")
+
+            while start != -1:
+                if mm[start:start + 1] == b"\n":
+                    start += 1
+
+                # Saltar a linha separadora "From ..."
+                body_start = mm.find(b"\n", start)
+                if body_start == -1:
+                    return
+                body_start += 1
+
+                end = mm.find(b"\nFrom ", body_start)
+                chunk = mm[body_start:end + 1 if end != -1 else len(mm)]
+
+                # A linha em branco antes do próximo "From " é separador
+                if chunk.endswith(b"\n\n"):
+                    chunk = chunk[:-1]
+
+                yield parse_message(_MBOX_ESCAPED_FROM.sub(rb"\1", chunk))
+
+                start = end
+
+
+def iter_maildir(path: str) -> Iterator[dict]:
+    """
+    Mensagens de uma árvore Maildir (new/ e cur/).
+    Os nomes Maildir começam pelo instante de entrega: ordem de nome ≈ ordem de chegada.
+    """
+
+    for sub in ("cur", "new"):
+        folder = os.path.join(path, sub)
+        if not os.path.isdir(folder):
+            continue
+
+        for name in sorted(os.listdir(folder)):
+            if name.startswith("."):
+                continue
+            yield _read_file(os.path.join(folder, name))
+
+
+def iter_eml(path: str) -> Iterator[dict]:
+    """
+    Um ficheiro .eml, ou todos os .eml de um directório (recursivo, por nome).
+    """
+
+    if os.path.isfile(path):
+        yield _read_file(path)
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".eml"):
+                yield _read_file(os.path.join(root, name))
+
+
+def iter_mail(path: str) -> Iterator[dict]:
+    """
+    Escolhe o leitor pelo formato do caminho.
+    """
+
+    if os.path.isdir(path):
+        if os.path.isdir(os.path.join(path, "cur")) or os.path.isdir(os.path.join(path, "new")):
+            return iter_maildir(path)
+        return iter_eml(path)
+
+    if path.lower().endswith(".eml"):
+        return iter_eml(path)
+
+    return iter_mbox(path)
+
+
+def _read_file(path: str) -> dict:
+    with open(path, "rb") as f:
+        return parse_message(f.read())
+
+
+# ----------------------------------------------------------------------
+# Importação
+# ----------------------------------------------------------------------
+
+def import_mail(ingestion, path: str, batch_size: int = 100) -> Dict[str, int]:
+    """
+    Envia um arquivo para o EmailIngestionService em lotes de `batch_size`.
+    Devolve o nº de e-mails por acção ("created", "continued", ...).
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size tem de ser >= 1")
+
+    messages = iter_mail(path)
+    actions: Counter = Counter()
+
+    while True:
+        batch: List[dict] = list(islice(messages, batch_size))
+        if not batch:
+            break
+
+        for result in ingestion.ingest_many(batch):
+            actions[result.action] += 1
+
+    return dict(actions)
@@ -0,0 +1,174 @@
+"""
+Similarity Engines
+
+Motores de similaridade entre assuntos de e-mail e títulos de Casos,
+com score em [0.0 - 1.0].
+
+Cada motor separa:
+- prepare(texto) → representação pré-calculada (uma vez por Caso / e-mail)
+- compare(a, b)  → score entre duas representações preparadas
+
+Assim a normalização ("Re:", "Fwd:", maiúsculas, espaços) nunca é
+repetida por comparação.
+"""
+
+from abc import ABC, abstractmethod
+from difflib import SequenceMatcher
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional
+
+from model.subject_text import normalize_subject, subject_tokens
+
+
+class SimilarityEngine(ABC):
+    """
+    Interface base de um motor de similaridade.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def prepare(self, text: Optional[str]) -> Any: ...
+
+    @abstractmethod
+    def compare(self, a: Any, b: Any) -> float: ...
+
+    def similarity(self, a: Optional[str], b: Optional[str]) -> float:
+        """
+        Atalho sem pré-cálculo (testes, uso pontual).
+        """
+        return self.compare(self.prepare(a), self.prepare(b))
+
+
+class SequenceSimilarity(SimilarityEngine):
+    """
+    difflib.SequenceMatcher sobre o assunto normalizado.
+    Comportamento histórico; quadrático no pior caso.
+    """
+
+    name = "sequence"
+
+    def prepare(self, text: Optional[str]) -> str:
+        return normalize_subject(text)
+
+    def compare(self, a: str, b: str) -> float:
+        return SequenceMatcher(None, a, b).ratio()
+
+
+class TokenSubject(NamedTuple):
+    tokens: FrozenSet[str]
+    text: str
+
+
+class TokenSetSimilarity(SimilarityEngine):
+    """
+    Jaccard entre conjuntos de palavras relevantes.
+    Linear no nº de palavras; insensível à ordem.
+
+    Assuntos sem palavras relevantes ("Oi", "Ok", só stopwords) não
+    têm conjunto a comparar: aí decide o SequenceMatcher sobre o texto
+    normalizado (assuntos curtos, custo desprezável).
+    """
+
+    name = "jaccard"
+
+    def prepare(self, text: Optional[str]) -> TokenSubject:
+        return TokenSubject(subject_tokens(text), normalize_subject(text))
+
+    def compare(self, a: TokenSubject, b: TokenSubject) -> float:
+        if not a.tokens or not b.tokens:
+            return SequenceMatcher(None, a.text, b.text).ratio()
+
+        return len(a.tokens & b.tokens) / len(a.tokens | b.tokens)
+
+
+class BoundedEditSimilarity(SimilarityEngine):
+    """
+    Distância de edição (Levenshtein) limitada a `max_distance`.
+
+    Só calcula a faixa diagonal de largura 2·max_distance + 1 e desiste
+    logo que a distância excede o limite: O(n · max_distance).
+    Acima do limite o score é 0.0.
+    """
+
+    name = "edit"
+
+    def __init__(self, max_distance: int = 8):
+        self.max_distance = max_distance
+
+    def prepare(self, text: Optional[str]) -> str:
+        return normalize_subject(text)
+
+    def compare(self, a: str, b: str) -> float:
+        longest = max(len(a), len(b))
+        if longest == 0:
+            return 1.0
+
+        distance = self.distance(a, b)
+        if distance is None:
+            return 0.0
+
+        return 1.0 - distance / longest
+
+    def distance(self, a: str, b: str) -> Optional[int]:
+        """
+        Distância de edição se <= max_distance, senão None.
+        """
+
+        limit = self.max_distance
+
+        if len(a) > len(b):
+            a, b = b, a
+
+        if len(b) - len(a) > limit:
+            return None
+
+        beyond = limit + 1
+        previous = list(range(len(b) + 1))
+
+        for i in range(1, len(a) + 1):
+            lo = max(1, i - limit)
+            hi = min(len(b), i + limit)
+
+            current = [beyond] * (len(b) + 1)
+            current[0] = i if i <= limit else beyond
+            row_min = current[0]
+
+            ca = a[i - 1]
+            for j in range(lo, hi + 1):
+                cost = 0 if ca == b[j - 1] else 1
+                value = min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + cost,
+                )
+                current[j] = value
+                if value < row_min:
+                    row_min = value
+
+            if row_min > limit:
+                return None  # corte antecipado
+
+            previous = current
+
+        distance = previous[len(b)]
+        return distance if distance <= limit else None
+
+
+SIMILARITY_ENGINES: Dict[str, type] = {
+    SequenceSimilarity.name: SequenceSimilarity,
+    TokenSetSimilarity.name: TokenSetSimilarity,
+    BoundedEditSimilarity.name: BoundedEditSimilarity,
+}
+
+
+def get_similarity_engine(name: str, **options) -> SimilarityEngine:
+    """
+    Cria um motor pelo nome ("sequence", "jaccard", "edit").
+    """
+
+    try:
+        engine_cls = SIMILARITY_ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Motor de similaridade desconhecido: {name}") from None
+
+    return engine_cls(**options)
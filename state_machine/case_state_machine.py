@@ -10,6 +10,8 @@ Princípios fundamentais:
 - Regras são explícitas e localizadas
 """
 
+from typing import Dict, List, Sequence, Tuple, Union
+
 from model.enums import WorkStatus, CaseEventType
 from model.entities import Case
 
@@ -22,6 +24,69 @@ class InvalidStateTransition(Exception):
     pass
 
 
+# ----------------------------------------------------------------------
+# Tabela de transições
+# ----------------------------------------------------------------------
+# (estado, evento) → novo estado.
+# Pares ausentes: o evento é irrelevante naquele estado (estado mantém-se).
+# ARCHIVED é terminal: não tem entradas.
+
+TRANSITIONS: Dict[Tuple[WorkStatus, CaseEventType], WorkStatus] = {
+    # NEW
+    (WorkStatus.NEW, CaseEventType.SYSTEM_ACTION): WorkStatus.ARCHIVED,
+
+    # IN_PROGRESS
+    (WorkStatus.IN_PROGRESS, CaseEventType.EMAIL_OUTBOUND): WorkStatus.WAITING_REPLY,
+    (WorkStatus.IN_PROGRESS, CaseEventType.SYSTEM_ACTION): WorkStatus.ARCHIVED,
+
+    # WAITING_REPLY
+    (WorkStatus.WAITING_REPLY, CaseEventType.EMAIL_INBOUND): WorkStatus.IN_PROGRESS,
+    (WorkStatus.WAITING_REPLY, CaseEventType.TIME_PASSED): WorkStatus.IN_PROGRESS,
+
+    # DONE: trabalho concluído, mas ainda vivo
+    (WorkStatus.DONE, CaseEventType.EMAIL_INBOUND): WorkStatus.IN_PROGRESS,   # novo contacto reabre
+    (WorkStatus.DONE, CaseEventType.SYSTEM_ACTION): WorkStatus.ARCHIVED,      # arquivo automático
+}
+
+# Códigos inteiros de estados e eventos (posição na enumeração)
+STATUSES: Tuple[WorkStatus, ...] = tuple(WorkStatus)
+EVENTS: Tuple[CaseEventType, ...] = tuple(CaseEventType)
+
+STATUS_CODES: Dict[WorkStatus, int] = {s: i for i, s in enumerate(STATUSES)}
+EVENT_CODES: Dict[CaseEventType, int] = {e: i for i, e in enumerate(EVENTS)}
+
+# Matriz completa: MATRIX[evento][estado] → novo estado (códigos)
+MATRIX: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(STATUS_CODES[TRANSITIONS.get((s, e), s)] for s in STATUSES)
+    for e in EVENTS
+)
+
+# A mesma tabela, por objectos (caminho de um só Caso)
+_NEXT: Dict[WorkStatus, Dict[CaseEventType, WorkStatus]] = {
+    s: {e: TRANSITIONS.get((s, e), s) for e in EVENTS}
+    for s in STATUSES
+}
+
+
+def transition_codes(
+    status_codes: Sequence[int],
+    event_codes: Union[int, Sequence[int]],
+) -> List[int]:
+    """
+    Transições em massa sobre códigos.
+    `event_codes` é um código (o mesmo evento para todos) ou um por estado.
+    """
+
+    if isinstance(event_codes, int):
+        column = MATRIX[event_codes]
+        return [column[s] for s in status_codes]
+
+    if len(event_codes) != len(status_codes):
+        raise ValueError("status_codes e event_codes com tamanhos diferentes")
+
+    return [MATRIX[e][s] for s, e in zip(status_codes, event_codes)]
+
+
 class CaseStateMachine:
     """
     Máquina de estados finita para Casos.
@@ -33,7 +98,7 @@ class CaseStateMachine:
 
     Esta classe APENAS:
     - recebe um Caso + um Evento
-    - decide se e como o estado muda
+    - decide se e como o estado muda (ver TRANSITIONS)
     """
 
     def apply(self, case: Case, event: CaseEventType) -> None:
@@ -46,75 +111,48 @@ class CaseStateMachine:
         - lançar erro se a transição for inválida
         """
 
-        if case.status == WorkStatus.NEW:
-            self._from_new(case, event)
-
-        elif case.status == WorkStatus.IN_PROGRESS:
-            self._from_in_progress(case, event)
-
-        elif case.status == WorkStatus.WAITING_REPLY:
-            self._from_waiting_reply(case, event)
-
-        elif case.status == WorkStatus.DONE:
-            self._from_done(case, event)
-
-        elif case.status == WorkStatus.ARCHIVED:
-            # Estado terminal: ignora tudo
-            return
-
-        else:
-            raise InvalidStateTransition(
-                f"Estado desconhecido: {case.status}"
-            )
-
-    # ------------------------------------------------------------------
-    # Estados individuais
-    # Cada método representa TODAS as transições possíveis a partir
-    # desse estado. Nada fora daqui pode alterar isto.
-    # ------------------------------------------------------------------
-
-    def _from_new(self, case: Case, event: CaseEventType) -> None:
-        if event == CaseEventType.SYSTEM_ACTION:
-            case.status = WorkStatus.ARCHIVED
-        else:
-            return
-
-
-    def _from_in_progress(self, case: Case, event: CaseEventType) -> None:
-        if event == CaseEventType.EMAIL_OUTBOUND:
-            case.status = WorkStatus.WAITING_REPLY
-
-        elif event == CaseEventType.SYSTEM_ACTION:
-            case.status = WorkStatus.ARCHIVED
-
-        else:
-            return
-
-
-    def _from_waiting_reply(self, case: Case, event: CaseEventType) -> None:
-        if event == CaseEventType.EMAIL_INBOUND:
-            case.status = WorkStatus.IN_PROGRESS
-
-        elif event == CaseEventType.TIME_PASSED:
-            case.status = WorkStatus.IN_PROGRESS
-
-        else:
-            return
-
-
-    def _from_done(self, case: Case, event: CaseEventType) -> None:
-        """
-        Estado DONE:
-        Trabalho concluído, mas ainda vivo.
+        try:
+            transitions = _NEXT[case.status]
+        except (KeyError, TypeError):
+            raise InvalidStateTransition(f"Estado desconhecido: {case.status}") from None
+
+        try:
+            case.status = transitions[event]
+        except (KeyError, TypeError):
+            raise InvalidStateTransition(f"Evento desconhecido: {event}") from None
+
+    def apply_many(
+        self,
+        cases: Sequence[Case],
+        events: Union[CaseEventType, Sequence[CaseEventType]],
+    ) -> List[Case]:
         """
+        Aplica eventos a vários Casos de uma vez (sweeps, replays).
 
-        if event == CaseEventType.EMAIL_INBOUND:
-            # Novo contacto reabre o caso
-            case.status = WorkStatus.IN_PROGRESS
-
-        elif event == CaseEventType.SYSTEM_ACTION:
-            # Arquivo automático após tempo
-            case.status = WorkStatus.ARCHIVED
+        `events` é um evento (o mesmo para todos) ou um por Caso.
+        Devolve os Casos cujo estado mudou.
+        """
 
-        else:
-            return
+        try:
+            status_codes = [STATUS_CODES[case.status] for case in cases]
+        except (KeyError, TypeError):
+            bad = next(c.status for c in cases if c.status not in STATUS_CODES)
+            raise InvalidStateTransition(f"Estado desconhecido: {bad}") from None
+
+        try:
+            if isinstance(events, CaseEventType):
+                event_codes = EVENT_CODES[events]
+            else:
+                event_codes = [EVENT_CODES[e] for e in events]
+        except (KeyError, TypeError):
+            raise InvalidStateTransition(f"Evento desconhecido: {events}") from None
+
+        changed: List[Case] = []
+        for case, old, new in zip(
+            cases, status_codes, transition_codes(status_codes, event_codes)
+        ):
+            if new != old:
+                case.status = STATUSES[new]
+                changed.append(case)
+
+        return changed
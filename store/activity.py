@@ -0,0 +1,71 @@
+"""
+Contadores de actividade
+
+Regras de contagem partilhadas pelos stores:
+- como um CaseItem conta para um ActivitySummary
+- em que bucket diário (UTC) um item cai
+
+Os stores mantêm contadores por (Caso, dia) à medida que os itens
+são registados, para responder a janelas de N dias sem reler a timeline.
+"""
+
+from datetime import date, datetime, time, timezone
+from typing import Sequence, Tuple
+
+from model.entities import ActivitySummary
+from model.enums import CaseItemKind
+
+# Ordem dos contadores num bucket
+COUNTERS = ("inbound_emails", "outbound_emails", "notes", "tasks_completed")
+
+ActivityCounts = Tuple[int, int, int, int]
+
+
+def activity_counts(kind: CaseItemKind, metadata: dict) -> ActivityCounts:
+    """
+    Contribuição de um item para os contadores de actividade.
+    """
+
+    if kind == CaseItemKind.EMAIL:
+        direction = metadata.get("direction")
+        if direction == "inbound":
+            return (1, 0, 0, 0)
+        if direction == "outbound":
+            return (0, 1, 0, 0)
+
+    elif kind == CaseItemKind.NOTE:
+        return (0, 0, 1, 0)
+
+    elif kind == CaseItemKind.TASK:
+        if metadata.get("completed"):
+            return (0, 0, 0, 1)
+
+    return (0, 0, 0, 0)
+
+
+def add_counts(summary: ActivitySummary, counts: Sequence[int]) -> None:
+    summary.inbound_emails += counts[0]
+    summary.outbound_emails += counts[1]
+    summary.notes += counts[2]
+    summary.tasks_completed += counts[3]
+
+
+def day_bucket(moment: datetime) -> date:
+    """
+    Dia (UTC) a que um instante pertence.
+    Instantes sem fuso são usados tal como estão.
+    """
+
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def day_start(day: date, like: datetime) -> datetime:
+    """
+    Início de um dia, com ou sem fuso conforme `like`.
+    """
+
+    if like.tzinfo is not None:
+        return datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return datetime.combine(day, time.min)
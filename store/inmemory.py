@@ -12,8 +12,23 @@ Regra de ouro:
 Este módulo NÃO contém lógica de negócio.
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from dataclasses import fields, replace
+from functools import wraps
+from datetime import date, datetime, timedelta
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 from uuid import uuid4
 from services.clock import Clock
 
@@ -29,6 +44,52 @@ from model.enums import (
     BillingDecision,
     AttentionFlag,
 )
+from store.protocol import DuplicateMessage
+from store.activity import activity_counts, add_counts, day_bucket, day_start
+from model.subject_text import case_tokens
+
+
+def _created_at(item: CaseItem) -> datetime:
+    return item.created_at
+
+
+def _snapshot(case: Case) -> Case:
+    return replace(case, attention_flags=set(case.attention_flags))
+
+
+def _changed_fields(case: Case, saved: Case) -> Set[str]:
+    return {
+        f.name for f in fields(Case)
+        if getattr(case, f.name) != getattr(saved, f.name)
+    }
+
+
+def _restore(case: Case, saved: Case, names: Iterable[str]) -> None:
+    for name in names:
+        value = getattr(saved, name)
+        setattr(case, name, set(value) if isinstance(value, set) else value)
+
+
+def _locked(method):
+    # Estruturas partilhadas: uma thread de cada vez (ex.: workers do dispatcher)
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _Transaction(threading.local):
+    """
+    Transacção aberta na thread actual (ver InMemoryStore.transaction()).
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.undo: List[Callable[[], None]] = []
+        # case_id → (objecto anterior, estado gravado, campos escritos)
+        self.touched: Dict[str, Tuple[Optional[Case], Optional[Case], Set[str]]] = {}
+        self.after: List[Callable[[bool], None]] = []
 
 
 class InMemoryStore:
@@ -44,28 +105,195 @@ class InMemoryStore:
         # Casos por ID
         self._cases: Dict[str, Case] = {}
 
-        # Itens de caso (linha do tempo)
-        self._case_items: List[CaseItem] = []
+        # Ordem de registo dos Casos (ordenar resultados de índices)
+        self._case_seq: Dict[str, int] = {}
+
+        # Itens de caso (linha do tempo), por Caso e ordenados por created_at
+        self._case_items: Dict[str, List[CaseItem]] = {}
 
         # Registos de billing
         self._billing_records: List[BillingRecord] = []
 
+        # Índice thread_id → case_id (continuidade)
+        self._thread_index: Dict[str, str] = {}
+
+        # Índice message_id → case_id (idempotência da ingestão)
+        self._message_index: Dict[str, str] = {}
+
+        # Índice invertido token do título/cliente → case_ids
+        # (+ título/cliente e tokens indexados por Caso)
+        self._token_index: Dict[str, Set[str]] = {}
+        self._indexed_tokens: Dict[str, Tuple[str, str, FrozenSet[str]]] = {}
+
+        # Índice flag de atenção → case_ids (+ flags indexados por Caso)
+        self._flag_index: Dict[AttentionFlag, Set[str]] = {}
+        self._indexed_flags: Dict[str, FrozenSet[AttentionFlag]] = {}
+
+        # Contadores de actividade por Caso e dia (janelas de N dias)
+        self._activity_buckets: Dict[str, Dict[date, List[int]]] = {}
+        self._activity_days: Dict[str, List[date]] = {}
+
+        # Versão do store: +1 a cada escrita (ETag do dashboard)
+        self._version = 0
+
+        # Último estado gravado de cada Caso: os Casos são mutados
+        # antes de update_case, o rollback precisa do estado anterior
+        self._saved: Dict[str, Case] = {}
+
+        # Transacção aberta, por thread (ver transaction())
+        self._tx = _Transaction()
+
+        # Cada método público corre inteiro sob o lock;
+        # uma transacção NÃO o segura entre escritas
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # TRANSACÇÕES
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def transaction(self) -> Iterator["InMemoryStore"]:
+        """
+        Unidade de trabalho.
+
+        Pode ser aninhada; só a transacção exterior conta.
+        Se falhar, as escritas do bloco são desfeitas: Casos (campos
+        incluídos), índices, timelines, contadores e billing.
+
+        A transacção é da thread que a abre; outras threads continuam
+        a ler e a escrever enquanto ela está aberta.
+        """
+        tx = self._tx
+        outermost = tx.depth == 0
+        if outermost:
+            tx.undo = []
+            tx.touched = {}
+            tx.after = []
+
+        tx.depth += 1
+        try:
+            yield self
+        except BaseException:
+            tx.depth -= 1
+            if outermost:
+                with self._lock:
+                    self._rollback()
+                self._end_transaction(False)
+            raise
+        else:
+            tx.depth -= 1
+            if outermost:
+                with self._lock:
+                    for case_id in tx.touched:
+                        if case_id in self._cases:
+                            self._saved[case_id] = _snapshot(self._cases[case_id])
+                tx.undo = []
+                tx.touched = {}
+                self._end_transaction(True)
+
+    def after_transaction(self, callback: Callable[[bool], None]) -> None:
+        """
+        callback(committed) no fim da transacção exterior desta thread
+        (fora do lock). Fora de transacção corre já, com True.
+        """
+        if self._tx.depth:
+            self._tx.after.append(callback)
+        else:
+            callback(True)
+
+    def _end_transaction(self, committed: bool) -> None:
+        callbacks, self._tx.after = self._tx.after, []
+        for callback in callbacks:
+            callback(committed)
+
+    def _on_rollback(self, undo: Callable[[], None]) -> None:
+        if self._tx.depth:
+            self._tx.undo.append(undo)
+
+    def _touch_case(self, case: Case) -> None:
+        # Antes de gravar: guarda o objecto anterior e os campos que esta
+        # transacção escreve (ou o estado, fora de transacção)
+        if not self._tx.depth:
+            self._saved[case.id] = _snapshot(case)
+            return
+
+        previous, base, changed = self._tx.touched.setdefault(
+            case.id, (self._cases.get(case.id), self._saved.get(case.id), set())
+        )
+        if base is not None:
+            changed |= _changed_fields(case, base)
+
+    def _rollback(self) -> None:
+        tx = self._tx
+        for undo in reversed(tx.undo):
+            undo()
+
+        for case_id, (previous, base, changed) in tx.touched.items():
+            if previous is None or base is None:
+                # Registado dentro da transacção
+                self._cases.pop(case_id, None)
+                self._case_seq.pop(case_id, None)
+                self._drop_indexes(case_id)
+                continue
+
+            # Só os campos que esta transacção escreveu: o resto pode
+            # ter sido gravado entretanto por outra thread
+            _restore(previous, base, changed)
+            self._cases[case_id] = previous
+            self._saved[case_id] = _snapshot(previous)
+            self._index_tokens(previous)
+            self._index_flags(previous)
+
+        tx.undo = []
+        tx.touched = {}
+
+        # Leitores viram as escritas desfeitas: nova versão, nunca uma antiga
+        self._version += 1
+
+    @_locked
+    def get_version(self) -> int:
+        return self._version
+
     # ------------------------------------------------------------------
     # CASES
     # ------------------------------------------------------------------
 
+    @_locked
     def add_case(self, case: Case) -> None:
         """
         Regista um novo Caso.
         """
+        self._touch_case(case)
         self._cases[case.id] = case
+        self._case_seq.setdefault(case.id, len(self._case_seq))
+        self._index_tokens(case)
+        self._index_flags(case)
+        self._version += 1
 
+    @_locked
+    def update_case(self, case: Case) -> None:
+        """
+        Persiste as mutações de um Caso.
+        Em memória o objecto já é o guardado; só garante o registo
+        e actualiza os índices de tokens e de flags.
+
+        As mutações já aconteceram no objecto: a versão conta sempre.
+        """
+        self._touch_case(case)
+        self._case_seq.setdefault(case.id, len(self._case_seq))
+        self._cases[case.id] = case
+        self._index_tokens(case)
+        self._index_flags(case)
+        self._version += 1
+
+    @_locked
     def get_case(self, case_id: str) -> Optional[Case]:
         """
         Obtém um Caso por ID.
         """
         return self._cases.get(case_id)
 
+    @_locked
     def list_cases(self) -> List[Case]:
         """
         Lista todos os Casos.
@@ -73,10 +301,74 @@ class InMemoryStore:
         """
         return list(self._cases.values())
 
+    @_locked
+    def match_case_tokens(self, tokens) -> Dict[str, int]:
+        """
+        Casos que partilham tokens (título / cliente) com a pesquisa.
+        Devolve case_id → número de tokens em comum.
+        """
+        hits: Dict[str, int] = {}
+        for token in tokens:
+            for case_id in self._token_index.get(token, ()):
+                hits[case_id] = hits.get(case_id, 0) + 1
+        return hits
+
+    def _index_tokens(self, case: Case) -> None:
+        indexed = self._indexed_tokens.get(case.id)
+        if indexed and indexed[:2] == (case.title, case.client_id):
+            return
+
+        previous = indexed[2] if indexed else frozenset()
+        current = case_tokens(case.title, case.client_id)
+
+        for token in previous - current:
+            self._token_index[token].discard(case.id)
+        for token in current - previous:
+            self._token_index.setdefault(token, set()).add(case.id)
+
+        self._indexed_tokens[case.id] = (case.title, case.client_id, current)
+
+    @_locked
+    def list_flagged_cases(self, flags: Iterable[AttentionFlag]) -> List[Case]:
+        """
+        Casos com pelo menos um dos flags, pela ordem de registo.
+        Custa O(Casos marcados), não O(todos os Casos).
+        """
+        case_ids: Set[str] = set()
+        for flag in flags:
+            case_ids |= self._flag_index.get(flag, set())
+
+        return [
+            self._cases[case_id]
+            for case_id in sorted(case_ids, key=self._case_seq.__getitem__)
+        ]
+
+    def _index_flags(self, case: Case) -> None:
+        previous = self._indexed_flags.get(case.id, frozenset())
+        current = frozenset(case.attention_flags)
+        if current == previous:
+            return
+
+        for flag in previous - current:
+            self._flag_index[flag].discard(case.id)
+        for flag in current - previous:
+            self._flag_index.setdefault(flag, set()).add(case.id)
+
+        self._indexed_flags[case.id] = current
+
+    def _drop_indexes(self, case_id: str) -> None:
+        indexed = self._indexed_tokens.pop(case_id, None)
+        for token in indexed[2] if indexed else ():
+            self._token_index[token].discard(case_id)
+
+        for flag in self._indexed_flags.pop(case_id, frozenset()):
+            self._flag_index[flag].discard(case_id)
+
     # ------------------------------------------------------------------
     # CASE ITEMS (eventos, emails, notas, billing, etc.)
     # ------------------------------------------------------------------
 
+    @_locked
     def add_case_item(
         self,
         case_id: str,
@@ -89,8 +381,13 @@ class InMemoryStore:
         """
         Regista um item associado a um Caso.
         Usado por emails, notas, tarefas, billing, etc.
+
+        E-mail com message_id já registado → DuplicateMessage.
         """
 
+        if kind == CaseItemKind.EMAIL and metadata:
+            self._check_message(metadata.get("message_id"))
+
         item = CaseItem(
             id=str(uuid4()),
             case_id=case_id,
@@ -100,28 +397,154 @@ class InMemoryStore:
             metadata=metadata or {},
         )
 
+        insort(
+            self._case_items.setdefault(case_id, []),
+            item,
+            key=_created_at,
+        )
+        indexed = self._index_thread(item)
+        self._count_activity(item)
+        self._version += 1
 
-        self._case_items.append(item)
+        self._on_rollback(lambda: self._remove_item(item, indexed))
         return item
 
+    @_locked
     def list_case_items(self, case_id: str) -> List[CaseItem]:
         """
         Devolve a linha temporal completa de um Caso.
+        Ordenada por created_at (empates por ordem de registo).
+        """
+        return list(self._case_items.get(case_id, ()))
+
+    @_locked
+    def get_last_activity_at(self, case_id: str) -> Optional[datetime]:
+        """
+        Última actividade registada num Caso.
+        A timeline está ordenada: é o último item.
+        """
+        items = self._case_items.get(case_id)
+        return items[-1].created_at if items else None
+
+    @_locked
+    def find_case_id_by_thread(self, thread_id: str) -> Optional[str]:
+        """
+        Devolve o Caso que primeiro registou um e-mail com este thread_id.
         """
-        return [i for i in self._case_items if i.case_id == case_id]
+        return self._thread_index.get(thread_id)
+
+    @_locked
+    def find_case_id_by_message(self, message_id: str) -> Optional[str]:
+        """
+        Devolve o Caso onde um e-mail com este message_id já foi registado.
+        """
+        return self._message_index.get(message_id)
+
+    @_locked
+    def add_message(self, message_id: str, case_id: str) -> None:
+        """
+        Regista um message_id sem item na timeline (Casos pessoais).
+        """
+        self._check_message(message_id)
+        self._message_index[message_id] = case_id
+        self._version += 1
+
+        self._on_rollback(lambda: self._message_index.pop(message_id, None))
+
+    def _check_message(self, message_id: Optional[str]) -> None:
+        if message_id and message_id in self._message_index:
+            raise DuplicateMessage(
+                f"message_id {message_id} já registado no Caso "
+                f"{self._message_index[message_id]}"
+            )
+
+    def _index_thread(self, item: CaseItem) -> List[Tuple[Dict[str, str], str]]:
+        """
+        Devolve as entradas criadas (índice, chave), para o rollback.
+        """
+        if item.kind != CaseItemKind.EMAIL:
+            return []
+
+        created = []
+
+        # O primeiro Caso a usar o thread / message_id fica com ele
+        for index, key in (
+            (self._thread_index, item.metadata.get("thread_id")),
+            (self._message_index, item.metadata.get("message_id")),
+        ):
+            if key and key not in index:
+                index[key] = item.case_id
+                created.append((index, key))
+
+        return created
+
+    def _count_activity(self, item: CaseItem) -> None:
+        counts = activity_counts(item.kind, item.metadata)
+        if not any(counts):
+            return
+
+        day = day_bucket(item.created_at)
+        buckets = self._activity_buckets.setdefault(item.case_id, {})
+
+        bucket = buckets.get(day)
+        if bucket is None:
+            bucket = buckets[day] = [0, 0, 0, 0]
+            insort(self._activity_days.setdefault(item.case_id, []), day)
+
+        for i, n in enumerate(counts):
+            bucket[i] += n
+
+    def _remove_item(
+        self,
+        item: CaseItem,
+        indexed: List[Tuple[Dict[str, str], str]],
+    ) -> None:
+        """
+        Desfaz add_case_item (rollback).
+        Tudo pela identidade do item: outras threads podem ter
+        registado itens (e contado o mesmo dia) entretanto.
+        """
+        items = self._case_items[item.case_id]
+        items.remove(item)
+        if not items:
+            del self._case_items[item.case_id]
+
+        for index, key in indexed:
+            del index[key]
+
+        counts = activity_counts(item.kind, item.metadata)
+        if not any(counts):
+            return
+
+        day = day_bucket(item.created_at)
+        buckets = self._activity_buckets[item.case_id]
+
+        for i, n in enumerate(counts):
+            buckets[day][i] -= n
+
+        # Só sai quando já ninguém conta nesse dia
+        if not any(buckets[day]):
+            del buckets[day]
+            self._activity_days[item.case_id].remove(day)
 
     # ------------------------------------------------------------------
     # BILLING
     # ------------------------------------------------------------------
 
+    @_locked
     def add_billing_record(self, record: BillingRecord) -> None:
         """
         Guarda um registo de faturação.
         Não cria decisões, não aplica regras.
         """
         self._billing_records.append(record)
+        self._version += 1
+
+        # Pela identidade: outras threads podem ter acrescentado depois
+        self._on_rollback(lambda: self._billing_records.remove(record))
 
 
+    @_locked
     def list_billing_records(self, case_id: Optional[str] = None) -> List[BillingRecord]:
         """
         Lista registos de billing.
@@ -135,6 +558,7 @@ class InMemoryStore:
     # ACTIVITY / AGREGADOS
     # ------------------------------------------------------------------
 
+    @_locked
     def get_activity_summary(
         self,
         case_id: str,
@@ -147,18 +571,61 @@ class InMemoryStore:
 
         summary = ActivitySummary(case_id=case_id, since=since)
 
-        for item in self.list_case_items(case_id):
-            if item.created_at < since:
-                continue
+        since_day = day_bucket(since)
+        next_day = day_start(since_day + timedelta(days=1), since)
+
+        # Dia de `since` (parcial): contagem exacta a partir da timeline
+        items = self._case_items.get(case_id, [])
+        start = bisect_left(items, since, key=_created_at)
+        end = bisect_left(items, next_day, key=_created_at)
 
-            if item.kind == CaseItemKind.EMAIL:
-                direction = item.metadata.get("direction")
-                if direction == "inbound":
-                    summary.inbound_emails += 1
-                elif direction == "outbound":
-                    summary.outbound_emails += 1
+        for item in items[start:end]:
+            add_counts(summary, activity_counts(item.kind, item.metadata))
 
-            elif item.kind == CaseItemKind.NOTE:
-                summary.notes += 1
+        # Dias completos seguintes: contadores diários
+        days = self._activity_days.get(case_id, [])
+        buckets = self._activity_buckets.get(case_id, {})
+
+        for day in days[bisect_right(days, since_day):]:
+            add_counts(summary, buckets[day])
 
         return summary
+
+    @_locked
+    def list_last_activity_at(
+        self,
+        case_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, datetime]:
+        """
+        Última actividade de cada Caso com timeline
+        (ou só dos case_ids pedidos: O(pedidos), não O(todos)).
+        """
+        if case_ids is None:
+            case_ids = self._case_items
+
+        last = {}
+        for case_id in case_ids:
+            items = self._case_items.get(case_id)
+            if items:
+                last[case_id] = items[-1].created_at
+        return last
+
+    @_locked
+    def list_billed_case_ids(self) -> Set[str]:
+        """
+        Casos com pelo menos um registo de billing.
+        """
+        return {b.case_id for b in self._billing_records}
+
+    @_locked
+    def get_activity_summaries(
+        self,
+        since: datetime,
+    ) -> Dict[str, ActivitySummary]:
+        """
+        Agregados de actividade de todos os Casos com timeline.
+        """
+        return {
+            case_id: self.get_activity_summary(case_id, since)
+            for case_id in self._case_items
+        }
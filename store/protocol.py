@@ -1,10 +1,16 @@
 # store/protocol.py
 
-from typing import Protocol, List, Optional
+from typing import Callable, ContextManager, Dict, Iterable, Protocol, List, Optional, Set
 from datetime import datetime
 
 from model.entities import Case, CaseItem, BillingRecord, ActivitySummary
-from model.enums import CaseItemKind, BillingDecision
+from model.enums import AttentionFlag, CaseItemKind, BillingDecision
+
+
+class DuplicateMessage(ValueError):
+    """
+    message_id já registado noutro item / Caso.
+    """
 
 
 class StoreProtocol(Protocol):
@@ -15,14 +21,35 @@ class StoreProtocol(Protocol):
     não COMO os dados são guardados.
     """
 
+    # -------------------------
+    # TRANSACÇÕES
+    # -------------------------
+
+    # Agrupa as escritas do bloco num único commit; reverte se falhar
+    def transaction(self) -> ContextManager["StoreProtocol"]: ...
+
+    # callback(committed) no fim da transacção exterior da thread,
+    # depois do commit/rollback; fora de transacção corre já (True)
+    def after_transaction(self, callback: Callable[[bool], None]) -> None: ...
+
+    # Cresce a cada escrita (add_*/update_*); igual ⇒ nada mudou (ETag, caches)
+    def get_version(self) -> int: ...
+
     # -------------------------
     # CASES
     # -------------------------
 
     def add_case(self, case: Case) -> None: ...
+    def update_case(self, case: Case) -> None: ...
     def get_case(self, case_id: str) -> Optional[Case]: ...
     def list_cases(self) -> List[Case]: ...
 
+    # Índice invertido de títulos/clientes: case_id → tokens em comum
+    def match_case_tokens(self, tokens: Iterable[str]) -> Dict[str, int]: ...
+
+    # Índice de flags (mantido em add_case / update_case): Casos com algum dos flags
+    def list_flagged_cases(self, flags: Iterable[AttentionFlag]) -> List[Case]: ...
+
     # -------------------------
     # CASE ITEMS (timeline)
     # -------------------------
@@ -38,6 +65,19 @@ class StoreProtocol(Protocol):
 
     def list_case_items(self, case_id: str) -> List[CaseItem]: ...
 
+    # Mantido a cada add_case_item (O(1), sem carregar a timeline)
+    def get_last_activity_at(self, case_id: str) -> Optional[datetime]: ...
+
+    def find_case_id_by_thread(self, thread_id: str) -> Optional[str]: ...
+
+    # E-mails já registados (idempotência da ingestão)
+    def find_case_id_by_message(self, message_id: str) -> Optional[str]: ...
+
+    # Regista um message_id sem item na timeline (Casos pessoais).
+    # Um message_id só entra uma vez: aqui ou num item EMAIL
+    # (add_case_item) um repetido lança DuplicateMessage.
+    def add_message(self, message_id: str, case_id: str) -> None: ...
+
     # -------------------------
     # BILLING
     # -------------------------
@@ -61,3 +101,16 @@ class StoreProtocol(Protocol):
         case_id: str,
         since: datetime,
     ) -> ActivitySummary: ...
+
+    # Queries agregadas (todos os Casos de uma vez), usadas em varrimentos.
+    # case_ids limita a esses Casos (ex.: candidatos de uma página)
+    def list_last_activity_at(
+        self,
+        case_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, datetime]: ...
+    def list_billed_case_ids(self) -> Set[str]: ...
+
+    def get_activity_summaries(
+        self,
+        since: datetime,
+    ) -> Dict[str, ActivitySummary]: ...
@@ -2,19 +2,369 @@
 
 import sqlite3
 import json
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Iterator
 from uuid import uuid4
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from model.entities import Case, CaseItem, BillingRecord, ActivitySummary
 from model.enums import CaseItemKind, BillingDecision
+from model.subject_text import case_tokens
+from store.protocol import DuplicateMessage
+from store.activity import (
+    COUNTERS,
+    activity_counts,
+    add_counts,
+    day_bucket,
+    day_start,
+)
+
+
+# --------------------------------------------------
+# Migrações de schema
+# --------------------------------------------------
+# Cada migração leva a base da versão N para N + 1.
+# A versão aplicada fica em PRAGMA user_version.
+# Migrações são idempotentes: bases antigas (user_version = 0)
+# já podem ter parte das tabelas.
+
+
+def _migrate_base_tables(cur: sqlite3.Cursor) -> None:
+    cur.executescript("""
+    CREATE TABLE IF NOT EXISTS cases (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        client_id TEXT,
+        status TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        attention_flags TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        due_at TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS case_items (
+        id TEXT PRIMARY KEY,
+        case_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        metadata TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS billing_records (
+        id TEXT PRIMARY KEY,
+        case_id TEXT NOT NULL,
+        decision TEXT NOT NULL,
+        decided_at TEXT NOT NULL,
+        context TEXT NOT NULL
+    );
+    """)
+
+
+def _migrate_thread_index(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS case_threads (
+        thread_id TEXT PRIMARY KEY,
+        case_id TEXT NOT NULL
+    )
+    """)
+
+    # Reconstruir o índice a partir da timeline existente
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO case_threads (thread_id, case_id)
+        SELECT json_extract(metadata, '$.thread_id'), case_id
+        FROM case_items
+        WHERE kind = ?
+        AND json_extract(metadata, '$.thread_id') IS NOT NULL
+        ORDER BY created_at
+        """,
+        (CaseItemKind.EMAIL.value,),
+    )
+
+
+def _migrate_timeline_indexes(cur: sqlite3.Cursor) -> None:
+    cur.executescript("""
+    CREATE INDEX IF NOT EXISTS idx_case_items_case_created
+        ON case_items (case_id, created_at);
+
+    CREATE INDEX IF NOT EXISTS idx_case_items_case_kind
+        ON case_items (case_id, kind);
+
+    CREATE INDEX IF NOT EXISTS idx_billing_records_case
+        ON billing_records (case_id, decided_at);
+    """)
+
+
+def _migrate_activity_window_index(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_case_items_created
+        ON case_items (created_at)
+    """)
+
+
+def _migrate_last_activity(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS case_activity (
+        case_id TEXT PRIMARY KEY,
+        last_activity_at TEXT NOT NULL
+    )
+    """)
+
+    cur.execute("""
+    INSERT OR REPLACE INTO case_activity (case_id, last_activity_at)
+    SELECT case_id, MAX(created_at)
+    FROM case_items
+    GROUP BY case_id
+    """)
+
+
+def _migrate_activity_buckets(cur: sqlite3.Cursor) -> None:
+    cur.executescript("""
+    CREATE TABLE IF NOT EXISTS case_activity_days (
+        case_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        inbound_emails INTEGER NOT NULL DEFAULT 0,
+        outbound_emails INTEGER NOT NULL DEFAULT 0,
+        notes INTEGER NOT NULL DEFAULT 0,
+        tasks_completed INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (case_id, day)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_case_activity_days_day
+        ON case_activity_days (day);
+
+    DELETE FROM case_activity_days;
+    """)
+
+    # Reconstruir os contadores a partir da timeline existente
+    buckets: dict[tuple[str, str], list[int]] = {}
+    for r in cur.execute("SELECT case_id, kind, metadata, created_at FROM case_items"):
+        counts = activity_counts(CaseItemKind(r[1]), json.loads(r[2]) if r[2] else {})
+        if not any(counts):
+            continue
+
+        day = day_bucket(datetime.fromisoformat(r[3])).isoformat()
+        bucket = buckets.setdefault((r[0], day), [0, 0, 0, 0])
+        for i, n in enumerate(counts):
+            bucket[i] += n
+
+    cur.executemany(
+        "INSERT INTO case_activity_days VALUES (?, ?, ?, ?, ?, ?)",
+        [(case_id, day, *counts) for (case_id, day), counts in buckets.items()],
+    )
+
+
+def _migrate_case_tokens(cur: sqlite3.Cursor) -> None:
+    cur.executescript("""
+    CREATE TABLE IF NOT EXISTS case_tokens (
+        token TEXT NOT NULL,
+        case_id TEXT NOT NULL,
+        PRIMARY KEY (token, case_id)
+    ) WITHOUT ROWID;
+
+    DELETE FROM case_tokens;
+    """)
+
+    # Indexar os títulos dos Casos existentes
+    cur.executemany(
+        "INSERT OR IGNORE INTO case_tokens VALUES (?, ?)",
+        [
+            (token, r[0])
+            for r in cur.execute("SELECT id, title, client_id FROM cases").fetchall()
+            for token in case_tokens(r[1], r[2])
+        ],
+    )
+
+
+def _migrate_message_index(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS case_messages (
+        message_id TEXT PRIMARY KEY,
+        case_id TEXT NOT NULL
+    ) WITHOUT ROWID
+    """)
+
+    # Reconstruir o índice a partir da timeline existente
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO case_messages (message_id, case_id)
+        SELECT json_extract(metadata, '$.message_id'), case_id
+        FROM case_items
+        WHERE kind = ?
+        AND json_extract(metadata, '$.message_id') IS NOT NULL
+        ORDER BY created_at
+        """,
+        (CaseItemKind.EMAIL.value,),
+    )
+
+
+def _migrate_flag_index(cur: sqlite3.Cursor) -> None:
+    cur.executescript("""
+    CREATE TABLE IF NOT EXISTS case_flags (
+        flag TEXT NOT NULL,
+        case_id TEXT NOT NULL,
+        PRIMARY KEY (flag, case_id)
+    ) WITHOUT ROWID;
+
+    DELETE FROM case_flags;
+
+    INSERT INTO case_flags (flag, case_id)
+    SELECT DISTINCT flags.value, cases.id
+    FROM cases, json_each(cases.attention_flags) AS flags;
+    """)
+
+
+def _migrate_store_version(cur: sqlite3.Cursor) -> None:
+    cur.executescript("""
+    CREATE TABLE IF NOT EXISTS store_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+
+    INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0);
+    """)
+
+
+MIGRATIONS = [
+    _migrate_base_tables,
+    _migrate_thread_index,
+    _migrate_timeline_indexes,
+    _migrate_activity_window_index,
+    _migrate_last_activity,
+    _migrate_activity_buckets,
+    _migrate_case_tokens,
+    _migrate_message_index,
+    _migrate_flag_index,
+    _migrate_store_version,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+_SUM_COUNTERS = ", ".join(f"COALESCE(SUM({c}), 0) AS {c}" for c in COUNTERS)
+
+
+def _locked(method):
+    # ":memory:": uma thread de cada vez na ligação partilhada
+    # (em ficheiro _lock não bloqueia: cada thread tem a sua ligação)
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class SQLiteStore:
-    def __init__(self, db_path: str = "workflow.db"):
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+    BUSY_TIMEOUT_MS = 5000
+
+    # Parâmetros por query (o mínimo garantido por versões antigas: 999)
+    MAX_PARAMS = 500
+
+    def __init__(
+        self,
+        db_path: str = "workflow.db",
+        journal_mode: str | None = None,
+        synchronous: str | None = None,
+    ):
+        """
+        journal_mode / synchronous:
+            Pragmas opcionais de durabilidade.
+            Ex: journal_mode="WAL", synchronous="NORMAL" em produção.
+            Por omissão ficam os valores do SQLite (e os já gravados
+            na base: journal_mode=WAL é permanente).
+
+        Concorrência:
+            Em ficheiro cada thread tem a sua ligação: leituras e
+            transacções de threads diferentes não se bloqueiam no
+            processo. Escritores continuam serializados pelo próprio
+            SQLite (um de cada vez por base; os outros esperam até
+            BUSY_TIMEOUT_MS).
+
+            Ligações por thread funcionam melhor com journal_mode="WAL":
+            leitores nunca esperam pelo escritor. Sem WAL, um leitor
+            espera enquanto outra thread faz commit.
+
+            ":memory:" é uma base por ligação: fica uma ligação
+            partilhada e o acesso (transacções incluídas) é serializado.
+        """
+        if journal_mode is not None and journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"journal_mode inválido: {journal_mode}")
+        if synchronous is not None and synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous inválido: {synchronous}")
+
+        self.db_path = db_path
+        self._synchronous = synchronous
+
+        # Ligação e profundidade de transacções (ver transaction()) por thread
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self._shared = db_path == ":memory:"
+        if self._shared:
+            self._shared_conn = self._connect(check_same_thread=False)
+            self._lock = threading.RLock()
+        else:
+            self._lock = nullcontext()
+
+        # Última versão gravada de cada Caso (dirty tracking de update_case)
+        self._persisted: dict[str, dict] = {}
+
+        if journal_mode is not None:
+            self.conn.execute(f"PRAGMA journal_mode = {journal_mode.upper()}")
         self._init_schema()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        Ligação da thread actual (aberta na primeira utilização).
+        """
+        if self._shared:
+            return self._shared_conn
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=check_same_thread,
+        )
+        conn.row_factory = sqlite3.Row
+
+        # synchronous é por ligação; journal_mode fica gravado na base
+        if self._synchronous is not None:
+            conn.execute(f"PRAGMA synchronous = {self._synchronous.upper()}")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """
+        Fecha as ligações de todas as threads.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    @property
+    def _tx_depth(self) -> int:
+        return getattr(self._local, "tx_depth", 0)
+
+    @_tx_depth.setter
+    def _tx_depth(self, value: int) -> None:
+        self._local.tx_depth = value
+
     # --------------------------------------------------
     # Schema
     # --------------------------------------------------
@@ -22,65 +372,221 @@ class SQLiteStore:
     def _init_schema(self):
         cur = self.conn.cursor()
 
-        cur.executescript("""
-        CREATE TABLE IF NOT EXISTS cases (
-            id TEXT PRIMARY KEY,
-            title TEXT NOT NULL,
-            client_id TEXT,
-            status TEXT NOT NULL,
-            priority TEXT NOT NULL,
-            attention_flags TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL,
-            due_at TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS case_items (
-            id TEXT PRIMARY KEY,
-            case_id TEXT NOT NULL,
-            kind TEXT NOT NULL,
-            metadata TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS billing_records (
-            id TEXT PRIMARY KEY,
-            case_id TEXT NOT NULL,
-            decision TEXT NOT NULL,
-            decided_at TEXT NOT NULL,
-            context TEXT NOT NULL
-        );
-        """)
-
-        self.conn.commit()
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+
+        for target, migrate in enumerate(MIGRATIONS[version:], start=version + 1):
+            migrate(cur)
+            cur.execute(f"PRAGMA user_version = {target}")
+            self.conn.commit()
+
+    # --------------------------------------------------
+    # Transacções
+    # --------------------------------------------------
+
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteStore"]:
+        """
+        Unidade de trabalho: agrupa todas as escritas num único commit.
+
+        Pode ser aninhada; só a transacção exterior faz commit.
+        Se alguma fase lançar excepção, tudo é revertido.
+
+        Em ficheiro, a transacção é da ligação da thread: o lock de
+        escrita da base é tomado na primeira escrita e largado no
+        commit/rollback. Em ":memory:" outras threads esperam.
+        """
+        outermost = self._tx_depth == 0
+        if outermost:
+            self._local.after = []
+
+        try:
+            with self._lock:
+                self._tx_depth += 1
+                try:
+                    yield self
+                except BaseException:
+                    self._tx_depth -= 1
+                    if self._tx_depth == 0:
+                        self.conn.rollback()
+                        # O que estava em memória deixou de corresponder à base
+                        self._persisted.clear()
+                    raise
+                else:
+                    self._tx_depth -= 1
+                    if self._tx_depth == 0:
+                        self.conn.commit()
+
+        except BaseException:
+            if outermost:
+                self._end_transaction(False)
+            raise
+        else:
+            if outermost:
+                self._end_transaction(True)
+
+    def after_transaction(self, callback) -> None:
+        """
+        callback(committed) no fim da transacção exterior desta thread,
+        já fora de _lock. Fora de transacção corre já, com True.
+        """
+        if self._tx_depth:
+            self._local.after.append(callback)
+        else:
+            callback(True)
+
+    def _end_transaction(self, committed: bool) -> None:
+        callbacks, self._local.after = self._local.after, []
+        for callback in callbacks:
+            callback(committed)
+
+    def _bump_version(self) -> None:
+        # Cada escrita conta uma versão; fica no mesmo commit que ela
+        self.conn.execute(
+            "UPDATE store_meta SET value = value + 1 WHERE key = 'version'"
+        )
+
+    def _commit(self) -> None:
+        # Dentro de transaction() o commit fica para o fim do bloco
+        if self._tx_depth == 0:
+            self.conn.commit()
+
+    @_locked
+    def get_version(self) -> int:
+        """
+        Lida da base (não de memória): outros processos também escrevem.
+        """
+        row = self.conn.execute(
+            "SELECT value FROM store_meta WHERE key = 'version'"
+        ).fetchone()
+        return row["value"]
 
     # --------------------------------------------------
     # Cases
     # --------------------------------------------------
 
+    CASE_COLUMNS = (
+        "id",
+        "title",
+        "client_id",
+        "status",
+        "priority",
+        "attention_flags",
+        "created_at",
+        "updated_at",
+        "due_at",
+    )
+
+    @_locked
     def add_case(self, case: Case):
+        row = self._case_to_row(case)
+
         self.conn.execute(
             """
             INSERT INTO cases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                case.id,
-                case.title,
-                case.client_id,
-                case.status.value,
-                case.priority.value,
-                json.dumps([f.value for f in case.attention_flags]),
-                case.created_at.isoformat(),
-                case.updated_at.isoformat(),
-                case.due_at.isoformat() if case.due_at else None,
-            ),
+            tuple(row[c] for c in self.CASE_COLUMNS),
+        )
+        self._index_tokens(case)
+        self._index_flags(case)
+        self._persisted[case.id] = row
+        self._bump_version()
+        self._commit()
+
+    @_locked
+    def update_case(self, case: Case):
+        """
+        Persiste as mutações de um Caso (status, due_at, flags, ...).
+
+        Compara com a última versão lida/escrita e grava apenas
+        as colunas alteradas, num único UPSERT.
+        """
+        row = self._case_to_row(case)
+        previous = self._persisted.get(case.id)
+
+        changed = [
+            c for c in self.CASE_COLUMNS[1:]
+            if previous is None or row[c] != previous[c]
+        ]
+        if not changed:
+            return
+
+        columns = ", ".join(self.CASE_COLUMNS)
+        placeholders = ", ".join("?" for _ in self.CASE_COLUMNS)
+        assignments = ", ".join(f"{c} = excluded.{c}" for c in changed)
+
+        self.conn.execute(
+            f"""
+            INSERT INTO cases ({columns}) VALUES ({placeholders})
+            ON CONFLICT (id) DO UPDATE SET {assignments}
+            """,
+            tuple(row[c] for c in self.CASE_COLUMNS),
+        )
+        if "title" in changed or "client_id" in changed:
+            self._index_tokens(case)
+        if "attention_flags" in changed:
+            self._index_flags(case)
+        self._persisted[case.id] = row
+        self._bump_version()
+        self._commit()
+
+    def _index_tokens(self, case: Case):
+        self.conn.execute("DELETE FROM case_tokens WHERE case_id = ?", (case.id,))
+        self.conn.executemany(
+            "INSERT INTO case_tokens VALUES (?, ?)",
+            [(token, case.id) for token in case_tokens(case.title, case.client_id)],
         )
-        self.conn.commit()
 
+    def _index_flags(self, case: Case):
+        self.conn.execute("DELETE FROM case_flags WHERE case_id = ?", (case.id,))
+        self.conn.executemany(
+            "INSERT INTO case_flags VALUES (?, ?)",
+            [(flag.value, case.id) for flag in case.attention_flags],
+        )
+
+    @_locked
+    def list_flagged_cases(self, flags):
+        flags = [flag.value for flag in flags]
+        if not flags:
+            return []
+
+        placeholders = ", ".join("?" for _ in flags)
+        rows = self.conn.execute(
+            f"""
+            SELECT * FROM cases
+            WHERE id IN (
+                SELECT case_id FROM case_flags WHERE flag IN ({placeholders})
+            )
+            ORDER BY rowid
+            """,
+            flags,
+        ).fetchall()
+        return [self._row_to_case(r) for r in rows]
+
+    @_locked
+    def match_case_tokens(self, tokens) -> dict[str, int]:
+        tokens = list(tokens)
+        if not tokens:
+            return {}
+
+        placeholders = ", ".join("?" for _ in tokens)
+        rows = self.conn.execute(
+            f"""
+            SELECT case_id, COUNT(*) AS hits
+            FROM case_tokens
+            WHERE token IN ({placeholders})
+            GROUP BY case_id
+            """,
+            tokens,
+        ).fetchall()
+
+        return {r["case_id"]: r["hits"] for r in rows}
+
+    @_locked
     def list_cases(self):
         rows = self.conn.execute("SELECT * FROM cases").fetchall()
         return [self._row_to_case(r) for r in rows]
 
+    @_locked
     def get_case(self, case_id: str):
         row = self.conn.execute(
             "SELECT * FROM cases WHERE id = ?",
@@ -88,6 +594,21 @@ class SQLiteStore:
         ).fetchone()
         return self._row_to_case(row) if row else None
 
+    def _case_to_row(self, case: Case) -> dict:
+        return {
+            "id": case.id,
+            "title": case.title,
+            "client_id": case.client_id,
+            "status": case.status.value,
+            "priority": case.priority.value,
+            "attention_flags": json.dumps(
+                sorted(f.value for f in case.attention_flags)
+            ),
+            "created_at": case.created_at.isoformat(),
+            "updated_at": case.updated_at.isoformat(),
+            "due_at": case.due_at.isoformat() if case.due_at else None,
+        }
+
     def _row_to_case(self, r):
         from model.enums import WorkStatus, Priority, AttentionFlag
 
@@ -104,12 +625,14 @@ class SQLiteStore:
         case.attention_flags = {
             AttentionFlag(f) for f in json.loads(r["attention_flags"])
         }
+        self._persisted[case.id] = {c: r[c] for c in self.CASE_COLUMNS}
         return case
 
     # --------------------------------------------------
     # Case Items (Timeline)
     # --------------------------------------------------
 
+    @_locked
     def add_case_item(
         self,
         case_id: str,
@@ -118,6 +641,14 @@ class SQLiteStore:
         metadata: dict | None = None,
         created_at: datetime | None = None,
     ):
+        metadata = metadata or {}
+        created_at = (created_at or datetime.now(timezone.utc)).isoformat()
+
+        # Primeiro o índice: um message_id repetido não escreve nada
+        message_id = metadata.get("message_id")
+        if kind == CaseItemKind.EMAIL and message_id:
+            self._insert_message(message_id, case_id)
+
         self.conn.execute(
             """
             INSERT INTO case_items VALUES (?, ?, ?, ?, ?)
@@ -126,13 +657,51 @@ class SQLiteStore:
                 str(uuid4()),
                 case_id,
                 kind.value,
-                json.dumps(metadata or {}),
-                (created_at or datetime.now(timezone.utc)).isoformat(),
+                json.dumps(metadata),
+                created_at,
             ),
         )
-        self.conn.commit()
 
+        self.conn.execute(
+            """
+            INSERT INTO case_activity (case_id, last_activity_at) VALUES (?, ?)
+            ON CONFLICT (case_id) DO UPDATE
+            SET last_activity_at = MAX(last_activity_at, excluded.last_activity_at)
+            """,
+            (case_id, created_at),
+        )
 
+        counts = activity_counts(kind, metadata)
+        if any(counts):
+            self.conn.execute(
+                """
+                INSERT INTO case_activity_days VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (case_id, day) DO UPDATE SET
+                    inbound_emails = inbound_emails + excluded.inbound_emails,
+                    outbound_emails = outbound_emails + excluded.outbound_emails,
+                    notes = notes + excluded.notes,
+                    tasks_completed = tasks_completed + excluded.tasks_completed
+                """,
+                (
+                    case_id,
+                    day_bucket(datetime.fromisoformat(created_at)).isoformat(),
+                    *counts,
+                ),
+            )
+
+        thread_id = metadata.get("thread_id")
+        if kind == CaseItemKind.EMAIL and thread_id:
+            # O primeiro Caso a usar o thread fica com ele
+            self.conn.execute(
+                "INSERT OR IGNORE INTO case_threads VALUES (?, ?)",
+                (thread_id, case_id),
+            )
+
+        self._bump_version()
+        self._commit()
+
+
+    @_locked
     def list_case_items(self, case_id):
         rows = self.conn.execute(
             "SELECT * FROM case_items WHERE case_id = ? ORDER BY created_at",
@@ -150,10 +719,57 @@ class SQLiteStore:
             for r in rows
         ]
 
+    @_locked
+    def get_last_activity_at(self, case_id: str):
+        row = self.conn.execute(
+            "SELECT last_activity_at FROM case_activity WHERE case_id = ?",
+            (case_id,),
+        ).fetchone()
+        return datetime.fromisoformat(row["last_activity_at"]) if row else None
+
+    @_locked
+    def find_case_id_by_thread(self, thread_id: str):
+        row = self.conn.execute(
+            "SELECT case_id FROM case_threads WHERE thread_id = ?",
+            (thread_id,),
+        ).fetchone()
+        return row["case_id"] if row else None
+
+    @_locked
+    def add_message(self, message_id: str, case_id: str):
+        """
+        Regista um message_id sem item na timeline (Casos pessoais).
+        """
+        self._insert_message(message_id, case_id)
+        self._bump_version()
+        self._commit()
+
+    def _insert_message(self, message_id: str, case_id: str):
+        # PRIMARY KEY (message_id): a unicidade é garantida pela base
+        try:
+            self.conn.execute(
+                "INSERT INTO case_messages VALUES (?, ?)",
+                (message_id, case_id),
+            )
+        except sqlite3.IntegrityError:
+            raise DuplicateMessage(
+                f"message_id {message_id} já registado no Caso "
+                f"{self.find_case_id_by_message(message_id)}"
+            ) from None
+
+    @_locked
+    def find_case_id_by_message(self, message_id: str):
+        row = self.conn.execute(
+            "SELECT case_id FROM case_messages WHERE message_id = ?",
+            (message_id,),
+        ).fetchone()
+        return row["case_id"] if row else None
+
     # --------------------------------------------------
     # Billing
     # --------------------------------------------------
 
+    @_locked
     def add_billing_record(self, record: BillingRecord):
         self.conn.execute(
             """
@@ -167,8 +783,10 @@ class SQLiteStore:
                 json.dumps(record.context),
             ),
         )
-        self.conn.commit()
+        self._bump_version()
+        self._commit()
 
+    @_locked
     def list_billing_records(self, case_id):
         rows = self.conn.execute(
             "SELECT * FROM billing_records WHERE case_id = ?",
@@ -192,35 +810,121 @@ class SQLiteStore:
 
     
 
+    @_locked
     def get_activity_summary(self, case_id: str, since: datetime) -> ActivitySummary:
+        """
+        Agregado de actividade desde `since`.
+
+        Dias completos vêm dos contadores diários; só o dia (parcial)
+        de `since` é contado item a item.
+        """
         summary = ActivitySummary(case_id=case_id, since=since)
+        since_day, next_day = self._window_bounds(since)
+
+        row = self.conn.execute(
+            f"""
+            SELECT {_SUM_COUNTERS}
+            FROM case_activity_days
+            WHERE case_id = ?
+            AND day > ?
+            """,
+            (case_id, since_day),
+        ).fetchone()
+        add_counts(summary, [row[c] for c in COUNTERS])
 
         rows = self.conn.execute(
             """
-            SELECT kind, metadata, created_at
+            SELECT kind, metadata
             FROM case_items
             WHERE case_id = ?
             AND created_at >= ?
+            AND created_at < ?
             """,
-            (case_id, since.isoformat()),
+            (case_id, since.isoformat(), next_day),
         ).fetchall()
 
         for r in rows:
-            kind = CaseItemKind(r["kind"])
-            metadata = json.loads(r["metadata"]) if r["metadata"] else {}
+            add_counts(summary, self._row_activity_counts(r))
 
-            if kind == CaseItemKind.EMAIL:
-                direction = metadata.get("direction")
-                if direction == "inbound":
-                    summary.inbound_emails += 1
-                elif direction == "outbound":
-                    summary.outbound_emails += 1
+        return summary
 
-            elif kind == CaseItemKind.NOTE:
-                summary.notes += 1
+    def _window_bounds(self, since: datetime) -> tuple[str, str]:
+        since_day = day_bucket(since)
+        next_day = day_start(since_day + timedelta(days=1), since)
+        return since_day.isoformat(), next_day.isoformat()
+
+    def _row_activity_counts(self, r):
+        metadata = json.loads(r["metadata"]) if r["metadata"] else {}
+        return activity_counts(CaseItemKind(r["kind"]), metadata)
+
+    @_locked
+    def list_last_activity_at(self, case_ids=None) -> dict[str, datetime]:
+        if case_ids is None:
+            rows = self.conn.execute(
+                "SELECT case_id, last_activity_at FROM case_activity"
+            ).fetchall()
+        else:
+            rows = []
+            case_ids = list(case_ids)
+
+            # Em blocos: limite de parâmetros por query do SQLite
+            for start in range(0, len(case_ids), self.MAX_PARAMS):
+                chunk = case_ids[start:start + self.MAX_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows += self.conn.execute(
+                    f"""
+                    SELECT case_id, last_activity_at FROM case_activity
+                    WHERE case_id IN ({placeholders})
+                    """,
+                    chunk,
+                ).fetchall()
+
+        return {
+            r["case_id"]: datetime.fromisoformat(r["last_activity_at"])
+            for r in rows
+        }
 
-            elif kind == CaseItemKind.TASK:
-                if metadata.get("completed"):
-                    summary.tasks_completed += 1
+    @_locked
+    def list_billed_case_ids(self) -> set[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT case_id FROM billing_records"
+        ).fetchall()
+        return {r["case_id"] for r in rows}
 
-        return summary
+    @_locked
+    def get_activity_summaries(self, since: datetime) -> dict[str, ActivitySummary]:
+        since_day, next_day = self._window_bounds(since)
+        summaries: dict[str, ActivitySummary] = {}
+
+        def summary_for(case_id):
+            if case_id not in summaries:
+                summaries[case_id] = ActivitySummary(case_id=case_id, since=since)
+            return summaries[case_id]
+
+        rows = self.conn.execute(
+            f"""
+            SELECT case_id, {_SUM_COUNTERS}
+            FROM case_activity_days
+            WHERE day > ?
+            GROUP BY case_id
+            """,
+            (since_day,),
+        ).fetchall()
+
+        for r in rows:
+            add_counts(summary_for(r["case_id"]), [r[c] for c in COUNTERS])
+
+        rows = self.conn.execute(
+            """
+            SELECT case_id, kind, metadata
+            FROM case_items
+            WHERE created_at >= ?
+            AND created_at < ?
+            """,
+            (since.isoformat(), next_day),
+        ).fetchall()
+
+        for r in rows:
+            add_counts(summary_for(r["case_id"]), self._row_activity_counts(r))
+
+        return summaries
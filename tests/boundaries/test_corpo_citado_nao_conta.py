@@ -0,0 +1,66 @@
+"""
+TESTE — HISTÓRICO CITADO NÃO CONTA PARA O CONTEXTO
+
+Fronteira:
+- linhas "> ..." e tudo depois de "Em ... escreveu:" / assinatura
+  não entram na pontuação
+- o corpo lido tem tamanho limitado, mesmo com megabytes de histórico
+- NormalizedEmail.body continua a ser o corpo original
+"""
+
+from services.body_preprocessor import BodyPreprocessor
+from services.email_normalizer import EmailNormalizer
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def test_citacoes_e_assinatura_cortadas():
+    banner("RESPOSTA PESSOAL SOBRE HISTÓRICO PROFISSIONAL")
+
+    body = (
+        "Jantar no sábado?\n"
+        "\n"
+        "-- \n"
+        "Enviado do telemóvel (contrato de dados)\n"
+        "\n"
+        "Em 3 de março, Cliente <cliente@empresa.com> escreveu:\n"
+        "> Segue o contrato, a fatura e a proposta.\n"
+        "> O pagamento fica para o projeto.\n"
+    )
+
+    cleaned = BodyPreprocessor().clean(body)
+    print(f"🧠 texto novo: {cleaned!r}")
+    assert cleaned.strip() == "Jantar no sábado?"
+
+    email = EmailNormalizer().normalize({
+        "message_id": "cit-001",
+        "from": "amigo@gmail.com",
+        "subject": "Re: sábado",
+        "body": body,
+    })
+
+    print(f"🧠 contexto: {email.context}")
+    assert email.context == "personal"
+    assert email.body is body
+
+    banner("✔️ SÓ O TEXTO NOVO CONTA")
+
+
+def test_corpo_lido_limitado():
+    banner("MEGABYTES DE HISTÓRICO")
+
+    preprocessor = BodyPreprocessor(max_raw_chars=10_000, max_scan_chars=500)
+
+    huge = ("linha sem citação nenhuma\n" * 200_000)
+    cleaned = preprocessor.clean(huge)
+    print(f"🧠 {len(huge)} → {len(cleaned)} caracteres")
+    assert len(cleaned) <= 500
+
+    quoted = "> citação\n" * 200_000 + "contrato no fim"
+    assert preprocessor.clean(quoted) == ""
+
+    banner("✔️ CUSTO LIMITADO POR MENSAGEM")
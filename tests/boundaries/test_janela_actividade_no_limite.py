@@ -0,0 +1,64 @@
+"""
+TESTE — JANELA DE ACTIVIDADE NO LIMITE
+
+Objectivo:
+- item criado exactamente em `since` conta para o agregado
+- itens registados fora de ordem ficam na timeline por created_at
+- a timeline de um Caso não mistura itens de outros Casos
+"""
+
+from datetime import timedelta
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from model.enums import CaseItemKind
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def test_janela_actividade_no_limite():
+    banner("INICIALIZAÇÃO")
+
+    now = Clock().now()
+    since = now - timedelta(days=7)
+
+    store = InMemoryStore()
+
+    # Registados fora de ordem temporal
+    store.add_case_item(
+        "case-a", CaseItemKind.EMAIL,
+        metadata={"direction": "inbound"}, created_at=now,
+    )
+    store.add_case_item(
+        "case-a", CaseItemKind.EMAIL,
+        metadata={"direction": "outbound"}, created_at=since,
+    )
+    store.add_case_item(
+        "case-a", CaseItemKind.NOTE,
+        created_at=since - timedelta(seconds=1),
+    )
+    store.add_case_item(
+        "case-b", CaseItemKind.EMAIL,
+        metadata={"direction": "inbound"}, created_at=now,
+    )
+
+    # --------------------------------------------------
+    banner("TIMELINE ORDENADA POR CASO")
+
+    items = store.list_case_items("case-a")
+    assert [i.created_at for i in items] == sorted(i.created_at for i in items)
+    assert all(i.case_id == "case-a" for i in items)
+    assert len(items) == 3
+
+    # --------------------------------------------------
+    banner("AGREGADO — LIMITE INCLUSIVO")
+
+    summary = store.get_activity_summary("case-a", since)
+    assert summary.inbound_emails == 1
+    assert summary.outbound_emails == 1
+    assert summary.notes == 0
+
+    banner("✔️ JANELA DE ACTIVIDADE DEFINIDA")
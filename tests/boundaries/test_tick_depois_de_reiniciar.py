@@ -0,0 +1,92 @@
+"""
+TESTE — TICK DEPOIS DE REINICIAR (SQLITE PERSISTENTE)
+
+Objectivo:
+- um RulesEngine novo sobre um store com Casos já existentes
+  conhece os prazos deles (due_at e janela de estagnação)
+- prazos ultrapassados enquanto o processo estava parado
+  disparam no primeiro tick
+- flags que já estavam postos não voltam a disparar
+"""
+
+from datetime import timedelta
+
+from services.clock import Clock
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, AttentionFlag
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _case(case_id, now, due_at=None):
+    return Case(
+        id=case_id,
+        title=case_id,
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.LOW,
+        created_at=now,
+        updated_at=now,
+        due_at=due_at,
+    )
+
+
+def test_tick_depois_de_reiniciar(tmp_path):
+    banner("PRIMEIRO PROCESSO")
+
+    now = Clock().now()
+    path = str(tmp_path / "casos.db")
+
+    store = SQLiteStore(path)
+    rules = RulesEngine(store, CaseStateMachine())
+
+    com_prazo = _case("com-prazo", now, due_at=now + timedelta(days=2))
+    respondido = _case("respondido", now)
+    atrasado = _case("atrasado", now, due_at=now - timedelta(days=1))
+
+    for case in (com_prazo, respondido, atrasado):
+        store.add_case(case)
+
+    rules.handle_event(com_prazo, CaseEventType.USER_ACTION, {}, now=now)
+    rules.handle_event(respondido, CaseEventType.EMAIL_OUTBOUND, {}, now=now)
+    rules.handle_event(atrasado, CaseEventType.USER_ACTION, {}, now=now)
+    assert AttentionFlag.OVERDUE in atrasado.attention_flags
+
+    store.close()
+
+    # --------------------------------------------------
+    banner("REINÍCIO → PRAZOS VÊM DO STORE")
+
+    store = SQLiteStore(path)
+    rules = RulesEngine(store, CaseStateMachine())
+    print(f"   • prazos na fila: {len(rules.deadlines)}")
+
+    assert rules.tick(now) == []
+
+    # --------------------------------------------------
+    banner("TICK +3 DIAS → SÓ O CASO COM PRAZO")
+
+    touched = rules.tick(now + timedelta(days=3))
+    assert [c.id for c in touched] == ["com-prazo"]
+    assert AttentionFlag.OVERDUE in store.get_case("com-prazo").attention_flags
+
+    # --------------------------------------------------
+    banner("TICK +7 DIAS +1s → FOLLOW-UP E ESTAGNAÇÃO")
+
+    touched = rules.tick(now + timedelta(days=7, seconds=1))
+    assert {c.id for c in touched} == {"com-prazo", "respondido", "atrasado"}
+    assert AttentionFlag.STALE in store.get_case("respondido").attention_flags
+
+    # O OVERDUE de "atrasado" já estava posto: só a estagnação o trouxe
+    assert rules.tick(now + timedelta(days=7, seconds=1)) == []
+
+    store.close()
+
+    banner("✔️ PRAZOS SOBREVIVEM AO REINÍCIO")
@@ -0,0 +1,82 @@
+"""
+TESTE — TICK SÓ REAVALIA PRAZOS EXPIRADOS
+
+Objectivo:
+- um avanço de relógio só toca nos Casos cujo prazo passou
+- cada prazo dispara uma única vez
+- o limite é estrito (igual ao de OVERDUE / STALE)
+"""
+
+from datetime import timedelta
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, AttentionFlag
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _case(case_id, now, due_at=None):
+    return Case(
+        id=case_id,
+        title=case_id,
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.LOW,
+        created_at=now,
+        updated_at=now,
+        due_at=due_at,
+    )
+
+
+def test_tick_so_reavalia_prazos_expirados():
+    banner("INICIALIZAÇÃO")
+
+    now = Clock().now()
+
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    com_prazo = _case("com-prazo", now, due_at=now + timedelta(days=2))
+    respondido = _case("respondido", now)
+    parado = _case("parado", now)
+
+    for case in (com_prazo, respondido, parado):
+        store.add_case(case)
+
+    rules.handle_event(com_prazo, CaseEventType.USER_ACTION, {}, now=now)
+    rules.handle_event(respondido, CaseEventType.EMAIL_OUTBOUND, {}, now=now)
+    rules.handle_event(parado, CaseEventType.TIME_PASSED, now=now)
+
+    # --------------------------------------------------
+    banner("TICK NO LIMITE EXACTO → NADA EXPIRA")
+
+    assert rules.tick(now + timedelta(days=2)) == []
+
+    # --------------------------------------------------
+    banner("TICK +3 DIAS → SÓ O CASO COM PRAZO")
+
+    touched = rules.tick(now + timedelta(days=3))
+    assert [c.id for c in touched] == ["com-prazo"]
+    assert AttentionFlag.OVERDUE in com_prazo.attention_flags
+
+    assert rules.tick(now + timedelta(days=3)) == []
+    print("🧠 Prazo disparou uma única vez")
+
+    # --------------------------------------------------
+    banner("TICK +7 DIAS +1s → FOLLOW-UP E ESTAGNAÇÃO")
+
+    touched = rules.tick(now + timedelta(days=7, seconds=1))
+    assert {c.id for c in touched} == {"com-prazo", "respondido"}
+    assert AttentionFlag.OVERDUE in respondido.attention_flags
+    assert AttentionFlag.STALE in respondido.attention_flags
+    assert AttentionFlag.STALE in com_prazo.attention_flags
+    assert not parado.attention_flags
+
+    banner("✔️ TICK PROPORCIONAL AOS PRAZOS EXPIRADOS")
@@ -0,0 +1,99 @@
+"""
+TESTE — DISPATCHER POR SHARDS PRESERVA A ORDEM DE CADA CASO
+
+Invariante:
+- eventos de um Caso são aplicados pela ordem de envio,
+  mesmo com vários workers em paralelo
+- o resultado final é o mesmo do modo determinístico (workers=0),
+  que equivale a chamar handle_event em sequência
+"""
+
+from datetime import timedelta
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from rules.dispatcher import ShardedEventDispatcher, shard_for
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+CASES = 12
+ROUNDS = 5
+
+
+def _run(store, workers):
+    now = Clock().now()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    cases = []
+    for n in range(CASES):
+        case = Case(
+            id=f"case-shard-{n}",
+            title=f"Contrato {n}",
+            client_id=f"cliente{n}@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+        )
+        store.add_case(case)
+        cases.append(case)
+
+    with ShardedEventDispatcher(rules, workers=workers) as dispatcher:
+        for r in range(ROUNDS):
+            for case in cases:
+                t = now + timedelta(minutes=r)
+                dispatcher.dispatch(
+                    case, CaseEventType.EMAIL_INBOUND, {"seq": 2 * r}, now=t
+                )
+                dispatcher.dispatch(
+                    case, CaseEventType.EMAIL_OUTBOUND, {"seq": 2 * r + 1}, now=t
+                )
+
+        # Semana de silêncio depois da última resposta
+        for case in cases:
+            dispatcher.dispatch(
+                case, CaseEventType.TIME_PASSED, now=now + timedelta(days=8)
+            )
+
+    return sorted(
+        (
+            case.id,
+            store.get_case(case.id).status.value,
+            tuple(sorted(f.value for f in store.get_case(case.id).attention_flags)),
+            tuple(i.metadata["seq"] for i in store.list_case_items(case.id)),
+        )
+        for case in cases
+    )
+
+
+def test_dispatcher_preserva_ordem_por_caso(tmp_path):
+    assert len({shard_for(f"case-shard-{n}", 4) for n in range(CASES)}) > 1
+
+    for name, make_store in (
+        ("InMemoryStore", lambda tag: InMemoryStore()),
+        ("SQLiteStore", lambda tag: SQLiteStore(str(tmp_path / f"{tag}.db"))),
+    ):
+        banner(f"DETERMINÍSTICO vs 4 WORKERS — {name}")
+
+        expected = _run(make_store("sequencial"), workers=0)
+        sharded = _run(make_store("shards"), workers=4)
+
+        for row in sharded[:3]:
+            print(f"   • {row}")
+
+        assert sharded == expected
+
+        for _, _, _, seqs in sharded:
+            assert list(seqs) == list(range(2 * ROUNDS))
+
+    banner("✔️ ORDEM POR CASO PRESERVADA")
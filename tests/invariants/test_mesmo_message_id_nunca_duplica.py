@@ -0,0 +1,109 @@
+"""
+TESTE — O MESMO MESSAGE_ID NUNCA É REGISTADO DUAS VEZES
+
+Invariante:
+- re-sync / retry do mesmo e-mail não cria itens nem Casos
+- vale entre chamadas (índice do store) e dentro do mesmo lote
+- o duplicado é reportado com o Caso onde o original está
+- e-mails pessoais também (sem timeline, sem rules_engine)
+- o próprio store recusa um segundo item EMAIL com o mesmo message_id
+"""
+
+import pytest
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from services.email_ingestion_service import EmailIngestionService
+from store.protocol import DuplicateMessage
+from model.enums import CaseItemKind
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+RAW = {
+    "message_id": "dup-001",
+    "thread_id": "thread-dup",
+    "from": "cliente@empresa.com",
+    "to": ["tu@escritorio.pt"],
+    "subject": "Contrato de prestação",
+    "body": "Segue contrato.",
+}
+
+
+def test_mesmo_message_id_nunca_duplica():
+    for store in (InMemoryStore(), SQLiteStore(":memory:")):
+        banner(f"INGESTÃO REPETIDA — {type(store).__name__}")
+
+        brain = RulesEngine(store, CaseStateMachine())
+        ingestion = EmailIngestionService(store, brain, Clock())
+
+        ingestion.ingest(RAW)
+        case_id = store.find_case_id_by_message("dup-001")
+        assert case_id is not None
+
+        # Retry isolado
+        ingestion.ingest(dict(RAW))
+
+        # Re-sync: o mesmo e-mail repetido dentro do lote
+        results = ingestion.ingest_many([dict(RAW), dict(RAW)])
+
+        for r in results:
+            print(f"   • {r.message_id}: {r.action} → {r.case_id}")
+
+        assert [r.action for r in results] == ["duplicate", "duplicate"]
+        assert {r.case_id for r in results} == {case_id}
+
+        assert len(store.list_cases()) == 1
+        assert len(store.list_case_items(case_id)) == 1
+
+        # --------------------------------------------------
+        banner("DUPLICADO DENTRO DE UM LOTE NOVO")
+
+        fresh = dict(RAW, message_id="dup-002")
+        results = ingestion.ingest_many([fresh, dict(fresh)])
+
+        assert [r.action for r in results] == ["continued", "duplicate"]
+        assert len(store.list_case_items(case_id)) == 2
+
+        # --------------------------------------------------
+        banner("E-MAIL PESSOAL REPETIDO")
+
+        personal = {
+            "message_id": "dup-pessoal",
+            "thread_id": "thread-pessoal",
+            "from": "amigo@gmail.com",
+            "to": ["tu@escritorio.pt"],
+            "subject": "Jantar sábado",
+            "body": "café depois?",
+        }
+        first = ingestion.ingest_many([personal])
+        again = ingestion.ingest_many([dict(personal)])
+
+        assert [r.action for r in first] == ["personal"]
+        assert [r.action for r in again] == ["duplicate"]
+        assert again[0].case_id == first[0].case_id
+        assert store.list_case_items(first[0].case_id) == []
+
+        # --------------------------------------------------
+        banner("O STORE RECUSA O MESMO MESSAGE_ID")
+
+        with pytest.raises(DuplicateMessage):
+            store.add_case_item(
+                case_id,
+                CaseItemKind.EMAIL,
+                metadata={"direction": "inbound", "message_id": "dup-001"},
+            )
+
+        with pytest.raises(DuplicateMessage):
+            store.add_message("dup-pessoal", case_id)
+
+        assert len(store.list_case_items(case_id)) == 2
+
+    banner("✔️ MESSAGE_ID IDEMPOTENTE")
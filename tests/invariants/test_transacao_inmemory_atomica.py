@@ -0,0 +1,217 @@
+"""
+TESTE — TRANSACÇÃO INMEMORY ATÓMICA
+
+Objectivo:
+- se alguma fase falhar, nada fica no store em memória:
+  Casos (e os seus campos), índices, timelines, contadores, billing
+- o que foi gravado antes (fora ou numa transacção bem sucedida) fica
+- a versão nunca volta atrás
+- com duas threads, o rollback de uma só desfaz o que ELA escreveu:
+  billing, itens, contadores do dia e campos de Casos gravados pela
+  outra ficam
+"""
+
+import threading
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case, BillingRecord
+from model.enums import (
+    WorkStatus,
+    Priority,
+    CaseEventType,
+    CaseItemKind,
+    AttentionFlag,
+    BillingDecision,
+)
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _case(case_id, now, title="Caso transaccional"):
+    return Case(
+        id=case_id,
+        title=title,
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _state(store, now):
+    return (
+        sorted(
+            (c.id, c.title, c.status.value, tuple(sorted(f.value for f in c.attention_flags)))
+            for c in store.list_cases()
+        ),
+        {c.id: len(store.list_case_items(c.id)) for c in store.list_cases()},
+        [c.id for c in store.list_flagged_cases(AttentionFlag)],
+        store.match_case_tokens(["transaccional", "renomeado"]),
+        store.find_case_id_by_thread("t-falha"),
+        store.find_case_id_by_message("m-falha"),
+        store.get_activity_summary("case-base", now - timedelta(days=1)),
+        len(store.list_billing_records()),
+    )
+
+
+def test_transacao_inmemory_reverte_se_falhar():
+    banner("ESTADO GRAVADO")
+
+    now = Clock().now()
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    base = _case("case-base", now)
+    store.add_case(base)
+    rules.handle_event(base, CaseEventType.EMAIL_INBOUND, {"thread_id": "t-base"}, now=now)
+
+    # Uma transacção bem sucedida também conta como estado gravado
+    with store.transaction():
+        rules.handle_event(
+            base, CaseEventType.TIME_PASSED, now=now + timedelta(days=8)
+        )
+
+    assert AttentionFlag.STALE in base.attention_flags
+
+    before = _state(store, now)
+    version = store.get_version()
+
+    # --------------------------------------------------
+    banner("FALHA A MEIO → ROLLBACK")
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.add_case(_case("case-falha", now))
+            store.add_case_item(
+                "case-falha",
+                CaseItemKind.EMAIL,
+                metadata={
+                    "direction": "inbound",
+                    "thread_id": "t-falha",
+                    "message_id": "m-falha",
+                },
+                created_at=now,
+            )
+
+            # Caso existente: mutado pelo cérebro e renomeado
+            rules.handle_event(
+                base,
+                CaseEventType.EMAIL_OUTBOUND,
+                {"thread_id": "t-base"},
+                now=now + timedelta(days=8),
+            )
+            base.title = "Caso renomeado"
+            store.update_case(base)
+
+            store.add_billing_record(BillingRecord(
+                id=str(uuid4()),
+                case_id=base.id,
+                client_id=base.client_id,
+                decision=BillingDecision.TO_BILL,
+                decided_at=now,
+            ))
+
+            assert _state(store, now) != before
+            raise RuntimeError("falha simulada")
+
+    after = _state(store, now)
+    print(f"   • {after[0]}")
+
+    assert after == before
+    assert store.get_case("case-falha") is None
+    assert store.get_case("case-base") is base
+    assert base.title == "Caso transaccional"
+    assert AttentionFlag.STALE in base.attention_flags
+    assert store.get_version() > version
+
+    banner("✔️ NADA FICOU GRAVADO")
+
+
+def test_rollback_nao_desfaz_escritas_de_outra_thread():
+    banner("A ABRE TRANSACÇÃO, B GRAVA, A FALHA")
+
+    now = Clock().now()
+    store = InMemoryStore()
+    case = _case("case-partilhado", now)
+    store.add_case(case)
+
+    def record(name):
+        return BillingRecord(
+            id=name,
+            case_id=case.id,
+            client_id=case.client_id,
+            decision=BillingDecision.TO_BILL,
+            decided_at=now,
+        )
+
+    def email(message_id):
+        return {"direction": "inbound", "message_id": message_id}
+
+    a_wrote = threading.Event()
+    b_committed = threading.Event()
+    failures = []
+
+    def thread_a():
+        try:
+            with store.transaction():
+                store.add_billing_record(record("A"))
+                store.add_case_item(
+                    case.id, CaseItemKind.EMAIL, metadata=email("m-a"), created_at=now
+                )
+                case.title = "Caso renomeado"
+                store.update_case(case)
+
+                a_wrote.set()
+                b_committed.wait()
+                raise RuntimeError("falha simulada")
+        except RuntimeError as exc:
+            failures.append(exc)
+
+    def thread_b():
+        a_wrote.wait()
+        with store.transaction():
+            store.add_billing_record(record("B"))
+            store.add_case_item(
+                case.id, CaseItemKind.EMAIL, metadata=email("m-b"), created_at=now
+            )
+            case.priority = Priority.HIGH
+            store.update_case(case)
+        b_committed.set()
+
+    threads = [threading.Thread(target=thread_a), threading.Thread(target=thread_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(failures) == 1
+
+    summary = store.get_activity_summary(case.id, now - timedelta(days=1))
+    print(f"   • billing: {[b.id for b in store.list_billing_records()]}")
+    print(f"   • e-mails recebidos: {summary.inbound_emails}")
+
+    assert [b.id for b in store.list_billing_records()] == ["B"]
+    assert [i.metadata["message_id"] for i in store.list_case_items(case.id)] == ["m-b"]
+    assert summary.inbound_emails == 1
+    assert store.find_case_id_by_message("m-a") is None
+    assert store.find_case_id_by_message("m-b") == case.id
+
+    # Campo de A desfeito, campo de B fica
+    assert case.title == "Caso transaccional"
+    assert case.priority == Priority.HIGH
+    assert store.match_case_tokens(["renomeado"]) == {}
+
+    banner("✔️ SÓ O QUE A ESCREVEU FOI DESFEITO")
@@ -0,0 +1,97 @@
+"""
+TESTE — TRANSACÇÃO SQLITE ATÓMICA
+
+Objectivo:
+- escritas dentro de store.transaction() só ficam visíveis no fim
+- se alguma fase falhar, nada fica gravado
+"""
+
+import sqlite3
+from datetime import timedelta
+
+import pytest
+
+from services.clock import Clock
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, CaseItemKind
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _case(case_id, now):
+    return Case(
+        id=case_id,
+        title="Caso transaccional",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_transacao_agrupa_escritas(tmp_path):
+    banner("LOTE DE ESCRITAS NUM ÚNICO COMMIT")
+
+    db_path = str(tmp_path / "workflow.db")
+    now = Clock().now()
+
+    store = SQLiteStore(db_path)
+    rules = RulesEngine(store, CaseStateMachine())
+
+    with store.transaction():
+        case = _case("case-tx", now)
+        store.add_case(case)
+        rules.handle_event(case, CaseEventType.EMAIL_OUTBOUND, {}, now=now)
+        rules.handle_event(
+            case,
+            CaseEventType.TIME_PASSED,
+            now=now + timedelta(days=1),
+        )
+
+        # Outra ligação ainda não vê nada
+        assert _count(db_path, "cases") == 0
+
+    assert _count(db_path, "cases") == 1
+    assert _count(db_path, "case_items") == 1
+
+    banner("✔️ COMMIT ÚNICO NO FIM DO BLOCO")
+
+
+def test_transacao_reverte_se_falhar():
+    banner("FALHA A MEIO → ROLLBACK")
+
+    now = Clock().now()
+    store = SQLiteStore(":memory:")
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.add_case(_case("case-falha", now))
+            store.add_case_item(
+                "case-falha",
+                CaseItemKind.EMAIL,
+                metadata={"direction": "inbound", "thread_id": "t-falha"},
+                created_at=now,
+            )
+            raise RuntimeError("falha simulada")
+
+    assert store.get_case("case-falha") is None
+    assert store.list_case_items("case-falha") == []
+    assert store.find_case_id_by_thread("t-falha") is None
+
+    banner("✔️ NADA FICOU GRAVADO")
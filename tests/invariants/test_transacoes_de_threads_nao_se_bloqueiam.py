@@ -0,0 +1,109 @@
+"""
+TESTE — TRANSACÇÕES DE THREADS DIFERENTES NÃO SE BLOQUEIAM
+
+Invariante (InMemoryStore e SQLiteStore em ficheiro, com WAL):
+- uma transacção aberta numa thread não bloqueia leituras de outra
+- duas transacções em threads diferentes avançam ao mesmo tempo
+  (no SQLite as escritas em si continuam uma de cada vez)
+
+Medido com tempos: cada transacção "trabalha" PAUSE segundos.
+Serializadas demorariam 2 × PAUSE.
+"""
+
+import threading
+import time
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from model.entities import Case
+from model.enums import WorkStatus, Priority
+
+
+PAUSE = 0.3
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _case(case_id):
+    now = Clock().now()
+    return Case(
+        id=case_id,
+        title=f"Contrato {case_id}",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _stores(tmp_path):
+    return (
+        ("InMemoryStore", InMemoryStore()),
+        (
+            "SQLiteStore (WAL)",
+            SQLiteStore(str(tmp_path / "concorrencia.db"), journal_mode="wal"),
+        ),
+    )
+
+
+def test_leitura_nao_espera_por_transacao_aberta(tmp_path):
+    for name, store in _stores(tmp_path):
+        banner(f"LEITURA DURANTE TRANSACÇÃO — {name}")
+
+        store.add_case(_case("case-lido"))
+        opened = threading.Event()
+
+        def writer():
+            with store.transaction():
+                store.add_case(_case("case-em-curso"))
+                opened.set()
+                time.sleep(PAUSE)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        opened.wait()
+
+        start = time.perf_counter()
+        assert store.get_case("case-lido") is not None
+        store.list_cases()
+        elapsed = time.perf_counter() - start
+
+        still_open = thread.is_alive()
+        thread.join()
+
+        print(f"   • leitura: {elapsed * 1000:.1f} ms")
+        assert still_open
+        assert elapsed < PAUSE / 2
+
+    banner("✔️ LEITORES NÃO ESPERAM")
+
+
+def test_transacoes_de_threads_diferentes_intercalam(tmp_path):
+    for name, store in _stores(tmp_path):
+        banner(f"DUAS TRANSACÇÕES — {name}")
+
+        def worker(n):
+            with store.transaction():
+                time.sleep(PAUSE)
+                store.add_case(_case(f"case-worker-{n}"))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(2)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        print(f"   • total: {elapsed * 1000:.1f} ms (serializado: ≥ {2 * PAUSE * 1000:.0f} ms)")
+        assert elapsed < 1.5 * PAUSE
+        assert {c.id for c in store.list_cases()} == {"case-worker-0", "case-worker-1"}
+
+    banner("✔️ TRANSACÇÕES EM PARALELO")
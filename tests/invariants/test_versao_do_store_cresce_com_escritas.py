@@ -0,0 +1,127 @@
+"""
+TESTE — VERSÃO DO STORE CRESCE A CADA ESCRITA
+
+Invariante:
+- cada escrita (add_case, update_case, add_case_item, add_billing_record)
+  aumenta a versão
+- leituras (e um update_case sem mudanças, no SQLite) não mexem na versão
+- uma transacção revertida não deixa a versão avançada
+- no SQLite a versão sobrevive a reabrir a base
+"""
+
+from uuid import uuid4
+
+import pytest
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case, BillingRecord
+from model.enums import (
+    WorkStatus,
+    Priority,
+    CaseEventType,
+    CaseItemKind,
+    BillingDecision,
+)
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _case(now, n):
+    return Case(
+        id=f"case-version-{n}",
+        title=f"Contrato {n}",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _check_writes(store):
+    now = Clock().now()
+    case = _case(now, 1)
+
+    for write in (
+        lambda: store.add_case(case),
+        lambda: store.add_case_item(case.id, CaseItemKind.NOTE, created_at=now),
+    ):
+        before = store.get_version()
+        write()
+        assert store.get_version() > before
+
+    case.status = WorkStatus.WAITING_REPLY
+    before = store.get_version()
+    store.update_case(case)
+    assert store.get_version() > before
+
+    # Leituras
+    before = store.get_version()
+    store.list_cases()
+    store.get_case(case.id)
+    store.list_case_items(case.id)
+    store.list_flagged_cases([])
+    assert store.get_version() == before
+
+    # Um evento completo do RulesEngine
+    rules = RulesEngine(store, CaseStateMachine())
+    rules.handle_event(case, CaseEventType.EMAIL_INBOUND, {}, now=now)
+    assert store.get_version() > before
+
+    before = store.get_version()
+    store.add_billing_record(BillingRecord(
+        id=str(uuid4()),
+        case_id=case.id,
+        client_id=case.client_id,
+        decision=BillingDecision.TO_BILL,
+        decided_at=now,
+    ))
+    assert store.get_version() > before
+
+    return case
+
+
+def test_versao_cresce_com_escritas(tmp_path):
+    for name, store in (
+        ("InMemoryStore", InMemoryStore()),
+        ("SQLiteStore", SQLiteStore(str(tmp_path / "workflow.db"))),
+    ):
+        banner(f"ESCRITAS — {name}")
+
+        case = _check_writes(store)
+        print(f"🧠 versão: {store.get_version()}")
+
+    # --------------------------------------------------
+    banner("SQLITE — UPDATE SEM MUDANÇAS")
+
+    before = store.get_version()
+    store.update_case(store.get_case(case.id))
+    assert store.get_version() == before
+
+    # --------------------------------------------------
+    banner("SQLITE — ROLLBACK")
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.add_case(_case(Clock().now(), 2))
+            assert store.get_version() > before
+            raise RuntimeError("falha a meio")
+
+    assert store.get_version() == before
+
+    # --------------------------------------------------
+    banner("SQLITE — REABRIR")
+
+    store.conn.close()
+    reopened = SQLiteStore(str(tmp_path / "workflow.db"))
+    assert reopened.get_version() == before
+
+    banner("✔️ VERSÃO MONÓTONA")
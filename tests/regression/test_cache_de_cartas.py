@@ -0,0 +1,135 @@
+"""
+TESTE — CACHE DE CARTAS DE DECISÃO
+
+Objectivo:
+- o cache devolve as mesmas cartas que portal.collect
+- cartas de Casos inalterados não são reconstruídas
+- um evento num Caso só invalida as cartas desse Caso
+- outro `now` (janela de billing, generated_at) refaz as cartas
+- escritas sem o RulesEngine (update_case directo) também invalidam
+- DecisionPortal / CaseDecisionPortal são abstractos
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from portals.attention import AttentionPortal
+from portals.billing import BillingPortal
+from portals.base import DecisionPortal, CaseDecisionPortal
+from portals.cache import DecisionCardCache
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _cards(items):
+    return [(c.portal, c.case_id, c.title, c.description) for c in items]
+
+
+def _full(items):
+    return [(c.portal, c.case_id, c.title, c.description, c.metadata) for c in items]
+
+
+def test_cache_de_cartas():
+    banner("CASOS ESTAGNADOS")
+
+    now = Clock().now()
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    cache = DecisionCardCache(store)
+    rules.add_listener(cache.invalidate_cases)
+
+    for n in range(3):
+        case = Case(
+            id=f"case-cache-{n}",
+            title=f"Contrato {n}",
+            client_id="cliente@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+        )
+        store.add_case(case)
+        rules.handle_event(case, CaseEventType.EMAIL_INBOUND, {}, now=now)
+
+    later = now + timedelta(days=8)
+    rules.sweep_time(later)
+
+    attention, billing = AttentionPortal(), BillingPortal()
+
+    for portal in (attention, billing):
+        assert _cards(cache.collect(portal, later)) == _cards(portal.collect(store, later))
+
+    built = cache.misses
+    print(f"🧠 cartas construídas: {built}")
+    assert built == 3
+
+    # --------------------------------------------------
+    banner("SEGUNDO RENDER → NADA RECONSTRUÍDO")
+
+    cache.collect(attention, later)
+    cache.collect(billing, later)
+    assert cache.misses == built
+
+    # --------------------------------------------------
+    banner("RESPOSTA NUM CASO → SÓ ESSE É RECONSTRUÍDO")
+
+    rules.handle_event(
+        store.get_case("case-cache-1"), CaseEventType.EMAIL_OUTBOUND, {}, now=later
+    )
+
+    cards = cache.collect(attention, later)
+    print(f"🧠 atenção: {[c.case_id for c in cards]}")
+
+    assert cache.misses == built
+    assert "case-cache-1" not in [c.case_id for c in cards]
+    assert _cards(cards) == _cards(attention.collect(store, later))
+
+    # --------------------------------------------------
+    banner("OUTRO NOW → CARTAS REFEITAS")
+
+    next_day = later + timedelta(days=1)
+    for portal in (attention, billing):
+        assert _full(cache.collect(portal, next_day)) == _full(portal.collect(store, next_day))
+
+    billing_cards = cache.collect(billing, next_day)
+    assert billing_cards[0].metadata["now"] == next_day.isoformat()
+
+    # --------------------------------------------------
+    banner("ESCRITA SEM O RULES ENGINE → INVALIDA")
+
+    case = store.get_case("case-cache-0")
+    case.title = "Contrato renomeado"
+    store.update_case(case)
+
+    cards = cache.collect(attention, next_day)
+    print(f"🧠 atenção: {[c.title for c in cards]}")
+
+    assert "Atenção: Contrato renomeado" in [c.title for c in cards]
+    assert _full(cards) == _full(attention.collect(store, next_day))
+
+    banner("✔️ CARTAS SÓ RECONSTRUÍDAS QUANDO O CASO MUDA")
+
+
+def test_portais_base_sao_abstractos():
+    banner("INTERFACES")
+
+    for cls in (DecisionPortal, CaseDecisionPortal):
+        with pytest.raises(TypeError):
+            cls()
+
+    # Basta implementar candidate_cases / make_card
+    assert _cards(AttentionPortal().collect(InMemoryStore(), Clock().now())) == []
+
+    banner("✔️ SÓ PORTAIS CONCRETOS")
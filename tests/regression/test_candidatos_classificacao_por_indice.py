@@ -0,0 +1,121 @@
+"""
+TESTE — CANDIDATOS DE CLASSIFICAÇÃO PELO ÍNDICE DE TÍTULOS
+
+Objectivo:
+- só Casos com palavras em comum (ou o mesmo cliente) são avaliados
+- a lista é limitada a shortlist_size e ordenada por relevância
+- Casos arquivados e contexto pessoal continuam excluídos
+"""
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from services.classification_service import ClassificationService
+from services.email_normalizer import NormalizedEmail
+from model.entities import Case
+from model.enums import WorkStatus, Priority
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _email(subject, context="professional", sender="novo@cliente.pt"):
+    return NormalizedEmail(
+        message_id="m-1",
+        thread_id=None,
+        from_address=sender,
+        to_addresses=[],
+        subject=subject,
+        body="",
+        context=context,
+        confidence=0.5,
+    )
+
+
+def test_candidatos_classificacao_por_indice():
+    now = Clock().now()
+
+    for store in (InMemoryStore(), SQLiteStore(":memory:")):
+        banner(f"SHORTLIST — {type(store).__name__}")
+
+        for n in range(50):
+            store.add_case(Case(
+                id=f"case-{n}",
+                title=f"Processo {n} de cobrança",
+                client_id=f"cliente{n}@empresa.com",
+                status=WorkStatus.IN_PROGRESS,
+                priority=Priority.NORMAL,
+                created_at=now,
+                updated_at=now,
+            ))
+
+        store.add_case(Case(
+            id="case-arrendamento",
+            title="Contrato de arrendamento da loja",
+            client_id="senhorio@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+        ))
+        store.add_case(Case(
+            id="case-arquivado",
+            title="Contrato de arrendamento antigo",
+            client_id="senhorio@empresa.com",
+            status=WorkStatus.ARCHIVED,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+        ))
+
+        classifier = ClassificationService(store, shortlist_size=5)
+
+        candidates = classifier._candidate_cases(
+            _email("RE: Fwd: Contrato de arrendamento da loja")
+        )
+        assert [c.id for c in candidates] == ["case-arrendamento"]
+
+        candidates = classifier._candidate_cases(_email("Cobrança em atraso"))
+        assert len(candidates) == 5
+
+        candidates = classifier._candidate_cases(
+            _email("Sem relação", sender="cliente7@empresa.com")
+        )
+        assert [c.id for c in candidates] == ["case-7"]
+
+        assert classifier._candidate_cases(
+            _email("Contrato de arrendamento", context="personal")
+        ) == []
+
+    banner("✔️ CANDIDATOS LIMITADOS PELO ÍNDICE")
+
+
+def test_titulo_alterado_reindexa_nos_dois_stores():
+    now = Clock().now()
+
+    for store in (InMemoryStore(), SQLiteStore(":memory:")):
+        banner(f"TÍTULO ALTERADO — {type(store).__name__}")
+
+        case = Case(
+            id="case-renomeado",
+            title="Contrato de arrendamento",
+            client_id="cliente@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+        )
+        store.add_case(case)
+
+        case.title = "Escritura de compra"
+        store.update_case(case)
+
+        print(f"   • {store.match_case_tokens(['arrendamento', 'escritura'])}")
+
+        assert store.match_case_tokens(["arrendamento"]) == {}
+        assert store.match_case_tokens(["escritura", "compra"]) == {"case-renomeado": 2}
+
+    banner("✔️ ÍNDICE ACOMPANHA O TÍTULO")
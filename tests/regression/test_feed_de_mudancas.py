@@ -0,0 +1,302 @@
+"""
+TESTE — FEED DE MUDANÇAS PARA O DASHBOARD AO VIVO
+
+Objectivo:
+- o feed numera as mudanças e devolve só as que vieram depois
+- quem ficou para trás (ou vem de outro feed) recebe ChangeFeedGap
+- o RulesEngine produz deltas de cartas (add / update / remove)
+  e de Casos, só para os Casos reavaliados — e só se mudaram
+- as cartas levam estado e flags do Caso (filtros no browser)
+- um sweep_time sobre mais Casos do que cabem no feed não o esgota
+- numa transacção exterior os deltas saem uma vez, depois do commit;
+  se ela for revertida não sai nada
+- o EmailIngestionService publica classificações pendentes
+"""
+
+import threading
+from datetime import timedelta
+
+import pytest
+
+from services.clock import Clock
+from services.change_feed import ChangeFeed, ChangeFeedGap
+from services.email_ingestion_service import EmailIngestionService
+from store.inmemory import InMemoryStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from portals.attention import AttentionPortal
+from portals.billing import BillingPortal
+from portals.cache import DecisionCardCache
+from portals.classification_decision import ClassificationDecision
+from portals.deltas import CardDeltaTracker
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, AttentionFlag
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _types(changes):
+    return [(c.type, c.data.get("portal"), c.data.get("case_id", c.data.get("id")))
+            for c in changes]
+
+
+class AlwaysAskUser:
+    def decide(self, result):
+        return ClassificationDecision(
+            action="ask_user",
+            case_id=None,
+            confidence=0.5,
+            reason="Confiança intermédia, requer confirmação humana.",
+        )
+
+
+def test_feed_numera_e_detecta_atrasos():
+    banner("SEQUÊNCIA")
+
+    feed = ChangeFeed(maxlen=3)
+    for n in range(3):
+        feed.publish("case.update", {"id": f"case-{n}"})
+
+    assert [c.seq for c in feed.since(0)] == [1, 2, 3]
+    assert [c.seq for c in feed.since(2)] == [3]
+    assert feed.since(3) == []
+    assert feed.wait(3, timeout=0.01) == []
+
+    sse = feed.since(2)[0].to_sse()
+    print(sse)
+    assert sse == 'id: 3\nevent: case.update\ndata: {"id": "case-2"}\n\n'
+
+    # --------------------------------------------------
+    banner("ESPERA ACORDA COM PUBLICAÇÃO")
+
+    received = []
+    waiter = threading.Thread(target=lambda: received.extend(feed.wait(3, timeout=5)))
+    waiter.start()
+    feed.publish("card.remove", {"portal": "attention", "case_id": "case-0"})
+    waiter.join()
+
+    assert [c.seq for c in received] == [4]
+
+    # --------------------------------------------------
+    banner("ATRASADO / OUTRO FEED")
+
+    with pytest.raises(ChangeFeedGap):
+        feed.since(0)  # 1 já foi descartado
+
+    with pytest.raises(ChangeFeedGap):
+        feed.wait(99, timeout=0.01)
+
+    banner("✔️ FEED NUMERADO")
+
+
+def test_rules_engine_produz_deltas_de_cartas():
+    banner("CASO NOVO COM ACTIVIDADE")
+
+    now = Clock().now()
+    clock = {"now": now}
+
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+    feed = ChangeFeed()
+
+    cards = DecisionCardCache(store)
+    tracker = CardDeltaTracker(
+        feed, cards, [AttentionPortal(), BillingPortal()], lambda: clock["now"]
+    )
+    rules.add_listener(tracker.track)
+
+    case = Case(
+        id="case-live",
+        title="Contrato ao vivo",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+    store.add_case(case)
+    rules.handle_event(case, CaseEventType.EMAIL_INBOUND, {}, now=now)
+
+    changes = feed.since(0)
+    print(f"   • {_types(changes)}")
+
+    assert _types(changes)[-1] == ("case.update", None, "case-live")
+    assert "card.remove" not in [c.type for c in changes]
+
+    # --------------------------------------------------
+    banner("SILÊNCIO → CARTA DE ATENÇÃO")
+
+    seq = feed.last_seq
+    clock["now"] = now + timedelta(days=8)
+    rules.sweep_time(clock["now"])
+
+    changes = feed.since(seq)
+    print(f"   • {_types(changes)}")
+
+    assert ("card.add", "attention", "case-live") in _types(changes)
+    assert changes[-1].data["attention"] is True
+
+    # A carta leva o que o browser precisa para os filtros da página
+    added = next(c.data for c in changes if c.type == "card.add")
+    assert added["client_id"] == "cliente@empresa.com"
+    assert added["case"]["status"] == case.status.value
+    assert added["case"]["flags"] == sorted(f.value for f in case.attention_flags)
+    assert added["case"]["flags"]
+
+    # --------------------------------------------------
+    banner("MESMO ESTADO → SEM DELTAS")
+
+    seq = feed.last_seq
+    rules.sweep_time(clock["now"])
+
+    assert feed.since(seq) == []
+
+    # --------------------------------------------------
+    banner("RESPOSTA → CARTA DE ATENÇÃO SAI")
+
+    seq = feed.last_seq
+    rules.handle_event(
+        store.get_case("case-live"),
+        CaseEventType.EMAIL_OUTBOUND,
+        {},
+        now=clock["now"],
+    )
+
+    changes = feed.since(seq)
+    print(f"   • {_types(changes)}")
+
+    assert ("card.remove", "attention", "case-live") in _types(changes)
+    assert changes[-1].data["attention"] is False
+
+    banner("✔️ DELTAS SÓ DOS CASOS REAVALIADOS")
+
+
+def test_deltas_so_depois_do_commit():
+    banner("TRANSACÇÃO EXTERIOR COM DOIS EVENTOS")
+
+    now = Clock().now()
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+    feed = ChangeFeed()
+
+    cards = DecisionCardCache(store)
+    tracker = CardDeltaTracker(
+        feed, cards, [AttentionPortal(), BillingPortal()], lambda: now
+    )
+    rules.add_listener(tracker.track)
+
+    case = Case(
+        id="case-tx",
+        title="Contrato transaccional",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+    store.add_case(case)
+
+    with store.transaction():
+        rules.handle_event(case, CaseEventType.EMAIL_INBOUND, {}, now=now)
+        rules.handle_event(case, CaseEventType.EMAIL_OUTBOUND, {}, now=now)
+
+        # Ainda não há commit: nada publicado
+        assert feed.since(0) == []
+
+    changes = feed.since(0)
+    print(f"   • {_types(changes)}")
+
+    # Uma só reavaliação para os dois eventos
+    assert [c.type for c in changes].count("case.update") == 1
+    assert _types(changes)[-1] == ("case.update", None, "case-tx")
+
+    # --------------------------------------------------
+    banner("ROLLBACK → NADA PUBLICADO")
+
+    seq = feed.last_seq
+    published = dict(tracker._published)
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            rules.handle_event(
+                case, CaseEventType.TIME_PASSED, now=now + timedelta(days=8)
+            )
+            assert AttentionFlag.STALE in case.attention_flags
+            raise RuntimeError("falha a meio")
+
+    assert feed.since(seq) == []
+    assert tracker._published == published
+    assert AttentionFlag.STALE not in store.get_case("case-tx").attention_flags
+
+    # --------------------------------------------------
+    banner("A SEGUIR, TUDO NORMAL")
+
+    rules.sweep_time(now + timedelta(days=8))
+    assert ("card.add", "attention", "case-tx") in _types(feed.since(seq))
+
+    banner("✔️ SÓ O QUE FOI GRAVADO É PUBLICADO")
+
+
+def test_sweep_sem_mudancas_nao_esgota_o_feed():
+    banner("SWEEP SOBRE MAIS CASOS DO QUE CABEM NO FEED")
+
+    now = Clock().now()
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    for n in range(120):
+        store.add_case(Case(
+            id=f"case-sweep-{n}",
+            title=f"Contrato {n}",
+            client_id="cliente@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+        ))
+
+    feed = ChangeFeed(maxlen=50)
+    tracker = CardDeltaTracker(
+        feed, DecisionCardCache(store), [AttentionPortal(), BillingPortal()], lambda: now
+    )
+    rules.add_listener(tracker.track)
+
+    rules.sweep_time(now)
+
+    # Nada mudou nas linhas nem nas cartas: quem está ligado não recarrega
+    assert feed.since(0) == []
+
+    banner("✔️ FEED INTACTO")
+
+
+def test_ingestao_publica_classificacoes_pendentes():
+    banner("E-MAIL AMBÍGUO")
+
+    store = InMemoryStore()
+    feed = ChangeFeed()
+    service = EmailIngestionService(
+        store, RulesEngine(store, CaseStateMachine()), Clock(), change_feed=feed
+    )
+    service.classification_decider = AlwaysAskUser()
+
+    service.ingest({
+        "message_id": "live-1",
+        "thread_id": "thread-live-1",
+        "from": "cliente@empresa.com",
+        "to": ["tu@escritorio.pt"],
+        "subject": "Dúvida sobre contrato",
+        "body": "Pode ver isto?",
+    })
+
+    changes = feed.since(0)
+    print(f"   • {[(c.type, c.data) for c in changes]}")
+
+    assert [c.type for c in changes] == ["classification.add"]
+    assert changes[0].data["message_id"] == "live-1"
+    assert len(service.pending_classifications) == 1
+
+    banner("✔️ PENDÊNCIA PUBLICADA")
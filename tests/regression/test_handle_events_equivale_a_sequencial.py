@@ -0,0 +1,94 @@
+"""
+TESTE — HANDLE_EVENTS ≡ HANDLE_EVENT EVENTO A EVENTO
+
+Objectivo:
+- aplicar um lote de eventos de um Caso (handle_events) deixa o Caso
+  e o store exactamente como handle_event chamado para cada um
+- incluindo lotes que misturam actividade com acções do utilizador
+  (notas e decisões de billing)
+"""
+
+from datetime import timedelta
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, BillingDecision
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _batches(now):
+    later = now + timedelta(hours=1)
+    return {
+        "e-mail + nota": [
+            (CaseEventType.EMAIL_INBOUND, {}, now),
+            (CaseEventType.USER_ACTION, {"note": "Liguei ao cliente"}, later),
+        ],
+        "e-mail + decisão + e-mail": [
+            (CaseEventType.EMAIL_INBOUND, {}, now),
+            (CaseEventType.USER_ACTION, {"decision": BillingDecision.TO_BILL}, later),
+            (CaseEventType.EMAIL_INBOUND, {}, later + timedelta(hours=1)),
+        ],
+        "e-mail + decisão": [
+            (CaseEventType.EMAIL_INBOUND, {}, now),
+            (CaseEventType.USER_ACTION, {"decision": BillingDecision.TO_BILL}, later),
+        ],
+        "conversa + silêncio": [
+            (CaseEventType.EMAIL_INBOUND, {}, now),
+            (CaseEventType.EMAIL_OUTBOUND, {}, later),
+            (CaseEventType.TIME_PASSED, {}, now + timedelta(days=8)),
+        ],
+    }
+
+
+def _apply(events, now, batched):
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    case = Case(
+        id="case-lote",
+        title="Contrato em lote",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+    store.add_case(case)
+
+    if batched:
+        rules.handle_events(case, events)
+    else:
+        for event_type, context, at in events:
+            rules.handle_event(case, event_type, context, now=at)
+
+    return (
+        case.status.value,
+        tuple(sorted(f.value for f in case.attention_flags)),
+        case.due_at,
+        case.updated_at,
+        len(store.list_case_items(case.id)),
+        [r.decision.value for r in store.list_billing_records(case.id)],
+    )
+
+
+def test_handle_events_equivale_a_sequencial():
+    now = Clock().now()
+
+    for name, events in _batches(now).items():
+        banner(f"LOTE — {name}")
+
+        sequential = _apply(events, now, batched=False)
+        batched = _apply(events, now, batched=True)
+        print(f"   • {sequential}")
+
+        assert batched == sequential
+
+    banner("✔️ LOTE ≡ SEQUENCIAL")
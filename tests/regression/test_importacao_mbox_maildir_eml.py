@@ -0,0 +1,126 @@
+"""
+TESTE — IMPORTAÇÃO DE MBOX / MAILDIR / .EML
+
+Objectivo:
+- os três formatos produzem o mesmo e-mail cru
+- thread_id vem de References / In-Reply-To / Message-ID
+- linhas ">From " do mbox são restauradas
+- import_mail alimenta o EmailIngestionService em lotes
+"""
+
+import mailbox
+
+from services.clock import Clock
+from services.mail_import import iter_mail, import_mail
+from store.inmemory import InMemoryStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from services.email_ingestion_service import EmailIngestionService
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+MESSAGES = [
+    (
+        "From: Cliente <Cliente@Empresa.com>\n"
+        "To: tu@escritorio.pt\n"
+        "Subject: Contrato de arrendamento\n"
+        "Message-ID: <raiz@empresa.com>\n"
+        "Content-Type: text/plain; charset=utf-8\n"
+        "Content-Transfer-Encoding: 8bit\n"
+        "\n"
+        "Segue contrato para revisão.\n"
+        "From the desk of the client.\n"
+    ),
+    (
+        "From: cliente@empresa.com\n"
+        "To: tu@escritorio.pt\n"
+        "Subject: Re: Contrato de arrendamento\n"
+        "Message-ID: <resposta@empresa.com>\n"
+        "In-Reply-To: <raiz@empresa.com>\n"
+        "\n"
+        "Conseguiu ver?\n"
+    ),
+    (
+        "From: cliente@empresa.com\n"
+        "To: tu@escritorio.pt\n"
+        "Subject: Re: Re: Contrato de arrendamento\n"
+        "Message-ID: <terceira@empresa.com>\n"
+        "In-Reply-To: <resposta@empresa.com>\n"
+        "References: <raiz@empresa.com> <resposta@empresa.com>\n"
+        "\n"
+        "Mais um anexo.\n"
+    ),
+]
+
+
+def _write_formats(tmp_path):
+    mbox_path = tmp_path / "arquivo.mbox"
+    box = mailbox.mbox(str(mbox_path))
+    for text in MESSAGES:
+        box.add(text.encode("utf-8"))
+    box.flush()
+    box.close()
+
+    maildir = mailbox.Maildir(str(tmp_path / "maildir"))
+    for text in MESSAGES:
+        maildir.add(text.encode("utf-8"))
+
+    eml_dir = tmp_path / "eml"
+    eml_dir.mkdir()
+    for i, text in enumerate(MESSAGES):
+        (eml_dir / f"{i:03d}.eml").write_bytes(text.encode("utf-8"))
+
+    return str(mbox_path), str(tmp_path / "maildir"), str(eml_dir)
+
+
+def test_tres_formatos_mesmo_email_cru(tmp_path):
+    mbox_path, maildir_path, eml_path = _write_formats(tmp_path)
+
+    banner("MBOX")
+    from_mbox = list(iter_mail(mbox_path))
+    for raw in from_mbox:
+        print(f"   • {raw['message_id']} → thread {raw['thread_id']}")
+
+    assert [r["thread_id"] for r in from_mbox] == ["raiz@empresa.com"] * 3
+    assert from_mbox[0]["from"] == "cliente@empresa.com"
+    assert from_mbox[0]["to"] == ["tu@escritorio.pt"]
+    assert "From the desk" in from_mbox[0]["body"]
+    assert ">From" not in from_mbox[0]["body"]
+
+    # --------------------------------------------------
+    banner("MAILDIR + .EML")
+
+    from_maildir = list(iter_mail(maildir_path))
+    from_eml = list(iter_mail(eml_path))
+
+    key = lambda r: r["message_id"]
+    assert sorted(from_maildir, key=key) == sorted(from_mbox, key=key)
+    assert from_eml == from_mbox
+
+    banner("✔️ FORMATOS EQUIVALENTES")
+
+
+def test_import_mail_em_lotes(tmp_path):
+    mbox_path, _, _ = _write_formats(tmp_path)
+
+    banner("IMPORTAR MBOX EM LOTES DE 2")
+
+    store = InMemoryStore()
+    brain = RulesEngine(store, CaseStateMachine())
+    ingestion = EmailIngestionService(store, brain, Clock())
+
+    actions = import_mail(ingestion, mbox_path, batch_size=2)
+    print(f"🧠 acções: {actions}")
+
+    assert sum(actions.values()) == 3
+    assert actions.get("continued") == 2
+
+    case_id = store.find_case_id_by_thread("raiz@empresa.com")
+    assert len(store.list_case_items(case_id)) == 3
+
+    banner("✔️ ARQUIVO IMPORTADO")
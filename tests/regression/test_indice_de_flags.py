@@ -0,0 +1,112 @@
+"""
+TESTE — ÍNDICE FLAG DE ATENÇÃO → CASOS
+
+Objectivo:
+- list_flagged_cases devolve exactamente os Casos com esses flags
+- o índice acompanha flags adicionados e removidos pelo RulesEngine
+- bases SQLite anteriores ao índice são reconstruídas ao abrir
+"""
+
+import sqlite3
+from datetime import timedelta
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore, MIGRATIONS, _migrate_flag_index
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, AttentionFlag
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _by_scan(store, flags):
+    return [
+        c.id for c in store.list_cases()
+        if c.attention_flags & set(flags)
+    ]
+
+
+def _flagged(store, flags):
+    return [c.id for c in store.list_flagged_cases(flags)]
+
+
+def _populate(store):
+    now = Clock().now()
+    rules = RulesEngine(store, CaseStateMachine())
+
+    cases = []
+    for n in range(4):
+        case = Case(
+            id=f"case-flag-{n}",
+            title=f"Contrato {n}",
+            client_id="cliente@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=Priority.NORMAL,
+            created_at=now,
+            updated_at=now,
+            due_at=now + timedelta(days=1) if n % 2 else None,
+        )
+        store.add_case(case)
+        rules.handle_event(case, CaseEventType.EMAIL_INBOUND, {}, now=now)
+        cases.append(case)
+
+    later = now + timedelta(days=10)
+    rules.sweep_time(later)
+    return rules, cases, later
+
+
+def test_indice_de_flags_nos_dois_stores():
+    for store in (InMemoryStore(), SQLiteStore(":memory:")):
+        banner(f"FLAGS INDEXADOS — {type(store).__name__}")
+
+        rules, cases, later = _populate(store)
+
+        for flags in (
+            [AttentionFlag.OVERDUE],
+            [AttentionFlag.STALE],
+            [AttentionFlag.OVERDUE, AttentionFlag.STALE],
+            [AttentionFlag.BILLING_PENDING],
+        ):
+            print(f"   • {[f.value for f in flags]} → {_flagged(store, flags)}")
+            assert _flagged(store, flags) == _by_scan(store, flags)
+
+        assert _flagged(store, [AttentionFlag.OVERDUE]) == ["case-flag-1", "case-flag-3"]
+
+        # --------------------------------------------------
+        banner("RESPOSTA ENVIADA → OVERDUE/STALE SAEM DO ÍNDICE")
+
+        case = store.get_case("case-flag-1")
+        rules.handle_event(case, CaseEventType.EMAIL_OUTBOUND, {}, now=later)
+
+        assert "case-flag-1" not in _flagged(store, [AttentionFlag.OVERDUE])
+        assert _flagged(store, [AttentionFlag.STALE]) == _by_scan(store, [AttentionFlag.STALE])
+
+    banner("✔️ ÍNDICE DE FLAGS MANTIDO")
+
+
+def test_indice_de_flags_em_base_antiga(tmp_path):
+    banner("BASE SQLITE SEM ÍNDICE DE FLAGS")
+
+    db_path = str(tmp_path / "workflow.db")
+    store = SQLiteStore(db_path)
+    _populate(store)
+    expected = _by_scan(store, [AttentionFlag.STALE])
+    store.conn.close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE case_flags")
+    conn.execute(f"PRAGMA user_version = {MIGRATIONS.index(_migrate_flag_index)}")
+    conn.commit()
+    conn.close()
+
+    reopened = SQLiteStore(db_path)
+    assert expected
+    assert _flagged(reopened, [AttentionFlag.STALE]) == expected
+
+    banner("✔️ ÍNDICE RECONSTRUÍDO")
@@ -0,0 +1,111 @@
+"""
+TESTE — INGESTÃO EM LOTE ≡ INGESTÃO E-MAIL A E-MAIL
+
+Objectivo:
+- ingest_many produz os mesmos Casos e itens que ingest sequencial
+- e-mails da mesma thread no mesmo lote acabam no mesmo Caso
+- o relatório por e-mail diz o que aconteceu a cada um
+"""
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from services.email_ingestion_service import EmailIngestionService
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+EMAILS = [
+    {
+        "message_id": "lote-001",
+        "thread_id": "thread-lote",
+        "from": "cliente@empresa.com",
+        "to": ["tu@escritorio.pt"],
+        "subject": "Contrato de arrendamento",
+        "body": "Segue contrato para revisão.",
+    },
+    {
+        "message_id": "lote-002",
+        "thread_id": "thread-lote",
+        "from": "cliente@empresa.com",
+        "to": ["tu@escritorio.pt"],
+        "subject": "Re: Contrato de arrendamento",
+        "body": "Conseguiu ver?",
+    },
+    {
+        "message_id": "lote-003",
+        "thread_id": None,
+        "from": "cliente@empresa.com",
+        "to": ["tu@escritorio.pt"],
+        "subject": "Contrato de arrendamento",
+        "body": "Mais um anexo.",
+    },
+    {
+        "message_id": "lote-004",
+        "thread_id": "thread-jantar",
+        "from": "amigo@gmail.com",
+        "to": ["tu@escritorio.pt"],
+        "subject": "Jantar sábado",
+        "body": "Jantar com a família?",
+    },
+]
+
+
+def _service(store):
+    brain = RulesEngine(store, CaseStateMachine())
+    return EmailIngestionService(store, brain, Clock())
+
+
+def _snapshot(store):
+    return sorted(
+        (
+            case.title,
+            case.status.value,
+            len(store.list_case_items(case.id)),
+        )
+        for case in store.list_cases()
+    )
+
+
+def test_lote_equivale_a_sequencial():
+    for store_cls in (InMemoryStore, lambda: SQLiteStore(":memory:")):
+        sequential = store_cls()
+        batched = store_cls()
+
+        banner(f"SEQUENCIAL vs LOTE — {type(sequential).__name__}")
+
+        service = _service(sequential)
+        for raw in EMAILS:
+            service.ingest(raw)
+
+        results = _service(batched).ingest_many(EMAILS)
+
+        print(f"🧠 sequencial: {_snapshot(sequential)}")
+        print(f"🧠 lote:       {_snapshot(batched)}")
+        assert _snapshot(batched) == _snapshot(sequential)
+
+        # --------------------------------------------------
+        banner("RELATÓRIO POR E-MAIL")
+
+        for r in results:
+            print(f"   • {r.message_id}: {r.action} → {r.case_id}")
+
+        assert [r.message_id for r in results] == [
+            "lote-001", "lote-002", "lote-003", "lote-004",
+        ]
+        assert [r.action for r in results][1:] == [
+            "continued", "continued", "personal",
+        ]
+
+        thread_case = batched.find_case_id_by_thread("thread-lote")
+        assert thread_case is not None
+        assert {r.case_id for r in results[:3]} == {thread_case}
+        assert len(batched.list_case_items(thread_case)) == 3
+
+    banner("✔️ LOTE EQUIVALENTE A SEQUENCIAL")
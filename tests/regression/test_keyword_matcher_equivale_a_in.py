@@ -0,0 +1,73 @@
+"""
+TESTE — KEYWORD MATCHER ≡ `kw in texto`
+
+Objectivo:
+- a procura numa passagem encontra exactamente as palavras
+  que `kw in texto` encontraria, incluindo palavras sobrepostas
+  ou contidas noutras
+- a inferência de contexto do EmailNormalizer não muda
+"""
+
+import random
+
+from services.keyword_matcher import KeywordMatcher
+from services.email_normalizer import EmailNormalizer
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+KEYWORDS = {
+    "contrato", "contra", "trato", "rato", "a", "ab", "abc", "bc",
+    "orçamento", "ç", "x.y", "(", "café",
+}
+
+
+def _naive(keywords, *texts):
+    return {kw for kw in keywords if any(kw in t for t in texts)}
+
+
+def test_matcher_equivale_a_in():
+    banner("TEXTOS ALEATÓRIOS")
+
+    matcher = KeywordMatcher(KEYWORDS)
+    alphabet = "abcontraçmex.y( é"
+    rng = random.Random(42)
+
+    for _ in range(500):
+        texts = [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            for _ in range(2)
+        ]
+        assert matcher.find(*texts) == _naive(KEYWORDS, *texts)
+
+    found = matcher.find("o contrato", "")
+    print(f"🧠 'o contrato' → {sorted(found)}")
+    assert found == {"contrato", "contra", "trato", "rato", "a"}
+
+    assert KeywordMatcher([]).find("qualquer coisa") == frozenset()
+
+    banner("✔️ MESMAS PALAVRAS QUE `in`")
+
+
+def test_contexto_do_normalizer_inalterado():
+    banner("CONTEXTO INFERIDO")
+
+    normalizer = EmailNormalizer()
+    cases = [
+        ("Contrato e fatura", "segue o pagamento", "a@empresa.pt", "professional"),
+        ("Jantar sábado", "café depois?", "b@gmail.com", "personal"),
+        ("Olá", "tudo bem?", "c@gmail.com", "ambiguous"),
+    ]
+
+    for subject, body, sender, expected in cases:
+        context, confidence = normalizer._infer_context(
+            subject.lower(), body.lower(), sender
+        )
+        print(f"   • {subject!r}: {context} ({confidence:.2f})")
+        assert context == expected
+
+    banner("✔️ CONTEXTO INALTERADO")
@@ -0,0 +1,34 @@
+"""
+TESTE — MÁSCARAS DE SEMÂNTICA DOS EVENTOS
+
+Objectivo:
+- a máscara de cada CaseEventSpec diz o mesmo que o conjunto `semantics`
+- o catálogo por CaseEventType.value é o mesmo catálogo por nome
+"""
+
+from model.enums import CaseEventType
+from model.events import CASE_EVENTS, CASE_EVENTS_BY_TYPE, EventSemantic
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def test_mascara_equivale_ao_conjunto():
+    banner("MÁSCARA ≡ CONJUNTO DE SEMÂNTICAS")
+
+    bits = [semantic.bit for semantic in EventSemantic]
+    assert len(set(bits)) == len(bits)
+
+    for event_type in CaseEventType:
+        spec = CASE_EVENTS_BY_TYPE[event_type.value]
+        assert spec is CASE_EVENTS[event_type.name]
+
+        print(f"   • {spec.name:<15} mask={spec.mask:07b}")
+
+        for semantic in EventSemantic:
+            assert bool(spec.mask & semantic.bit) == (semantic in spec.semantics)
+
+    banner("✔️ MÁSCARAS COERENTES")
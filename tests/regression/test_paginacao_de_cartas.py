@@ -0,0 +1,216 @@
+"""
+TESTE — CARTAS ORDENADAS, FILTRADAS E PAGINADAS POR CURSOR
+
+Objectivo:
+- as páginas, concatenadas, são as cartas de collect pela ordem
+  prioridade → atraso → última actividade
+- filtros por client_id / status / flag
+- só as cartas da página são construídas
+- a cache devolve as mesmas páginas
+- páginas pedidas mais tarde (outro `now`) não saltam nem repetem Casos
+- cada página só lê a última actividade dos Casos candidatos
+- o marcador ⚠️ (needs_attention) segue o critério das cartas:
+  um Caso arquivado com flags não é marcado
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from portals.attention import AttentionPortal
+from portals.cache import DecisionCardCache
+from portals.pagination import InvalidCursor, PRIORITY_RANK
+from model.entities import Case
+from model.enums import WorkStatus, Priority, AttentionFlag, CaseEventType
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+class CountingAttentionPortal(AttentionPortal):
+    def __init__(self):
+        self.built = 0
+
+    def make_card(self, store, case, now):
+        self.built += 1
+        return super().make_card(store, case, now)
+
+
+PRIORITIES = list(Priority)
+
+
+def _seed(store, now):
+    for n in range(23):
+        flags = {AttentionFlag.STALE}
+        due_at = None
+
+        if n % 3 == 0:
+            flags.add(AttentionFlag.OVERDUE)
+            due_at = now - timedelta(days=n + 1)
+        elif n % 3 == 1:
+            # Ainda em dia; fica atrasado nas páginas pedidas mais tarde
+            due_at = now + timedelta(days=n)
+
+        store.add_case(Case(
+            id=f"case-page-{n:02d}",
+            title=f"Contrato {n}",
+            client_id=f"cliente{n % 2}@empresa.com",
+            status=WorkStatus.ARCHIVED if n == 8 else WorkStatus.IN_PROGRESS,
+            priority=PRIORITIES[n % len(PRIORITIES)],
+            created_at=now - timedelta(hours=n),
+            updated_at=now,
+            due_at=due_at,
+            attention_flags=flags,
+        ))
+
+
+def _pages(collect_page, **filters):
+    items, cursor, sizes = [], None, []
+
+    while True:
+        page = collect_page(limit=5, cursor=cursor, **filters)
+        items.extend(page.items)
+        sizes.append(len(page.items))
+
+        if page.next_cursor is None:
+            return items, sizes
+        cursor = page.next_cursor
+
+
+def test_paginacao_de_cartas():
+    for store in (InMemoryStore(), SQLiteStore(":memory:")):
+        banner(f"PÁGINAS — {type(store).__name__}")
+
+        now = Clock().now()
+        _seed(store, now)
+        portal = CountingAttentionPortal()
+
+        full = portal.collect(store, now)
+        cases = {c.id: c for c in store.list_cases()}
+
+        def expected_order(case_id):
+            case = cases[case_id]
+            overdue = (
+                (now - case.due_at).total_seconds()
+                if case.due_at and case.due_at < now
+                else 0
+            )
+            return (-PRIORITY_RANK[case.priority], -overdue, case.created_at.timestamp(), case_id)
+
+        expected = sorted((c.case_id for c in full), key=expected_order)
+
+        items, sizes = _pages(lambda **kw: portal.collect_page(store, now, **kw))
+        print(f"   • páginas: {sizes}")
+
+        assert [c.case_id for c in items] == expected
+        assert len(items) == 22  # o arquivado não tem carta
+
+        # --------------------------------------------------
+        banner("PÁGINAS PEDIDAS MAIS TARDE")
+
+        # Cada página seguinte 10 dias depois: prazos ultrapassados entretanto
+        clock = {"now": now}
+
+        def later_page(**kw):
+            page = portal.collect_page(store, clock["now"], **kw)
+            clock["now"] += timedelta(days=10)
+            return page
+
+        items, _ = _pages(later_page)
+        print(f"   • último now: +{(clock['now'] - now).days} dias")
+
+        assert [c.case_id for c in items] == expected
+
+        # --------------------------------------------------
+        banner("SÓ A PRIMEIRA PÁGINA É CONSTRUÍDA")
+
+        portal.built = 0
+        first = portal.collect_page(store, now, limit=5)
+
+        assert [c.case_id for c in first.items] == expected[:5]
+        assert portal.built == 5
+        assert first.next_cursor is not None
+
+        # --------------------------------------------------
+        banner("FILTROS")
+
+        items, _ = _pages(
+            lambda **kw: portal.collect_page(store, now, **kw),
+            client_id="cliente0@empresa.com",
+            flag="overdue",
+        )
+        assert [c.case_id for c in items] == [
+            case_id for case_id in expected
+            if cases[case_id].client_id == "cliente0@empresa.com"
+            and AttentionFlag.OVERDUE in cases[case_id].attention_flags
+        ]
+        assert items
+
+        # Última actividade só dos candidatos filtrados, não de todo o store
+        asked = []
+        list_last = store.list_last_activity_at
+        store.list_last_activity_at = lambda case_ids=None: (
+            asked.append(case_ids) or list_last(case_ids)
+        )
+        portal.collect_page(store, now, client_id="cliente0@empresa.com", flag="overdue")
+        del store.list_last_activity_at
+
+        assert asked[0] is not None
+        assert sorted(asked[0]) == sorted(c.case_id for c in items)
+
+        archived = portal.collect_page(store, now, status=WorkStatus.ARCHIVED)
+        assert archived.items == [] and archived.next_cursor is None
+
+        with pytest.raises(InvalidCursor):
+            portal.collect_page(store, now, cursor="nao-e-um-cursor")
+
+        # --------------------------------------------------
+        banner("CACHE")
+
+        cards = DecisionCardCache(store)
+        cached, _ = _pages(lambda **kw: cards.collect_page(portal, now, **kw))
+
+        assert [c.case_id for c in cached] == expected
+        assert cards.misses == 23  # cada candidato uma vez
+
+    banner("✔️ PAGINAÇÃO ESTÁVEL")
+
+
+def test_marcador_de_atencao_ignora_arquivados():
+    banner("CASO ARQUIVADO FICA ESTAGNADO")
+
+    now = Clock().now()
+    store = InMemoryStore()
+    rules = RulesEngine(store, CaseStateMachine())
+    portal = AttentionPortal()
+
+    case = Case(
+        id="case-arquivado",
+        title="Contrato arquivado",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+    store.add_case(case)
+    rules.handle_event(case, CaseEventType.SYSTEM_ACTION, {}, now=now)
+    rules.sweep_time(now + timedelta(days=10))
+
+    assert case.status == WorkStatus.ARCHIVED
+    assert AttentionFlag.STALE in case.attention_flags
+
+    # Candidato pelo índice de flags, mas sem carta nem ⚠️
+    assert [c.id for c in portal.candidate_cases(store, now)] == [case.id]
+    assert portal.collect(store, now) == []
+    assert not portal.needs_attention(case)
+
+    banner("✔️ ARQUIVADOS SEM ⚠️")
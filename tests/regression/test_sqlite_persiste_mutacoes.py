@@ -0,0 +1,84 @@
+"""
+TESTE — SQLITE PERSISTE AS MUTAÇÕES DO RULES ENGINE
+
+Objectivo:
+- status, due_at e flags calculados pelo cérebro sobrevivem a get_case
+- update_case só grava as colunas alteradas
+- sem alterações, não há escrita
+"""
+
+from datetime import timedelta
+
+from services.clock import Clock
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType, AttentionFlag
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def test_sqlite_persiste_mutacoes():
+    banner("INICIALIZAÇÃO")
+
+    now = Clock().now()
+
+    store = SQLiteStore(":memory:")
+    rules = RulesEngine(store, CaseStateMachine())
+
+    store.add_case(Case(
+        id="case-persist",
+        title="Persistência",
+        client_id="cliente@empresa.com",
+        status=WorkStatus.IN_PROGRESS,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    ))
+
+    # --------------------------------------------------
+    banner("EMAIL OUTBOUND → WAITING_REPLY + FOLLOW-UP")
+
+    rules.handle_event(
+        store.get_case("case-persist"),
+        CaseEventType.EMAIL_OUTBOUND,
+        {"subject": "Resposta"},
+        now=now,
+    )
+
+    case = store.get_case("case-persist")
+    assert case.status == WorkStatus.WAITING_REPLY
+    assert case.due_at == now + timedelta(days=7)
+
+    # --------------------------------------------------
+    banner("TIME_PASSED → FLAGS PERSISTIDOS")
+
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+
+    later = now + timedelta(days=10)
+    rules.handle_event(case, CaseEventType.TIME_PASSED, now=later)
+
+    case = store.get_case("case-persist")
+    assert AttentionFlag.OVERDUE in case.attention_flags
+    assert AttentionFlag.STALE in case.attention_flags
+    assert case.status == WorkStatus.IN_PROGRESS
+
+    upserts = [s for s in statements if "ON CONFLICT" in s]
+    assert len(upserts) == 1
+    assert "updated_at = excluded" not in upserts[0]
+    print("🧠 Só colunas alteradas foram gravadas")
+
+    # --------------------------------------------------
+    banner("REPETIR → NADA MUDA, NADA É ESCRITO")
+
+    statements.clear()
+    rules.handle_event(case, CaseEventType.TIME_PASSED, now=later)
+    assert not [s for s in statements if "ON CONFLICT" in s]
+
+    banner("✔️ MUTAÇÕES PERSISTIDAS")
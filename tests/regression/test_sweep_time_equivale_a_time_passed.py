@@ -0,0 +1,84 @@
+"""
+TESTE — SWEEP_TIME EQUIVALE A TIME_PASSED CASO A CASO
+
+Objectivo:
+- o varrimento agregado produz exactamente os mesmos estados e flags
+  que enviar TIME_PASSED a cada Caso
+- em ambos os stores
+"""
+
+from datetime import timedelta
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from state_machine.case_state_machine import CaseStateMachine
+from rules.rules_engine import RulesEngine
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def _build(store, now):
+    rules = RulesEngine(store, CaseStateMachine())
+
+    scenarios = [
+        # (id, prioridade, evento inicial, dias atrás, due_at)
+        ("sem-actividade", Priority.NORMAL, None, 0, None),
+        ("resposta-recente", Priority.NORMAL, CaseEventType.EMAIL_OUTBOUND, 2, None),
+        ("resposta-antiga", Priority.HIGH, CaseEventType.EMAIL_OUTBOUND, 20, None),
+        ("inbound-low", Priority.LOW, CaseEventType.EMAIL_INBOUND, 1, None),
+        ("nota-atrasada", Priority.NORMAL, CaseEventType.USER_ACTION, 3, -1),
+    ]
+
+    for case_id, priority, event, days_ago, due in scenarios:
+        t0 = now - timedelta(days=days_ago)
+        case = Case(
+            id=case_id,
+            title=case_id,
+            client_id="cliente@empresa.com",
+            status=WorkStatus.IN_PROGRESS,
+            priority=priority,
+            created_at=t0,
+            updated_at=t0,
+            due_at=now + timedelta(days=due) if due is not None else None,
+        )
+        store.add_case(case)
+        if event:
+            rules.handle_event(case, event, {"thread_id": case_id}, now=t0)
+
+    return rules
+
+
+def _snapshot(store):
+    return {
+        c.id: (c.status, frozenset(c.attention_flags), c.due_at)
+        for c in store.list_cases()
+    }
+
+
+def test_sweep_time_equivale_a_time_passed():
+    now = Clock().now()
+    later = now + timedelta(days=1)
+
+    for make_store in (InMemoryStore, lambda: SQLiteStore(":memory:")):
+        one_by_one = make_store()
+        rules = _build(one_by_one, now)
+        for case in one_by_one.list_cases():
+            rules.handle_event(case, CaseEventType.TIME_PASSED, now=later)
+
+        swept = make_store()
+        _build(swept, now).sweep_time(later)
+
+        banner(f"COMPARAR — {type(swept).__name__}")
+        for case_id, state in _snapshot(swept).items():
+            print(f"🧠 {case_id}: {state[0].value} {sorted(f.value for f in state[1])}")
+
+        assert _snapshot(swept) == _snapshot(one_by_one)
+
+    banner("✔️ VARRIMENTO AGREGADO EQUIVALENTE")
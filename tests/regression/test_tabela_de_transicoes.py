@@ -0,0 +1,95 @@
+"""
+TESTE — TABELA DE TRANSIÇÕES DA STATE MACHINE
+
+Objectivo:
+- a tabela reproduz as transições que existiam em if/elif
+- apply, apply_many (evento único) e apply_many (um evento por Caso)
+  dão exactamente o mesmo resultado
+- estado desconhecido continua a lançar InvalidStateTransition
+"""
+
+from datetime import datetime
+
+import pytest
+
+from model.entities import Case
+from model.enums import WorkStatus, Priority, CaseEventType
+from state_machine.case_state_machine import (
+    CaseStateMachine,
+    InvalidStateTransition,
+)
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+S, E = WorkStatus, CaseEventType
+
+# O que muda; tudo o resto mantém o estado
+EXPECTED_CHANGES = {
+    (S.NEW, E.SYSTEM_ACTION): S.ARCHIVED,
+    (S.IN_PROGRESS, E.EMAIL_OUTBOUND): S.WAITING_REPLY,
+    (S.IN_PROGRESS, E.SYSTEM_ACTION): S.ARCHIVED,
+    (S.WAITING_REPLY, E.EMAIL_INBOUND): S.IN_PROGRESS,
+    (S.WAITING_REPLY, E.TIME_PASSED): S.IN_PROGRESS,
+    (S.DONE, E.EMAIL_INBOUND): S.IN_PROGRESS,
+    (S.DONE, E.SYSTEM_ACTION): S.ARCHIVED,
+}
+
+
+def _case(status):
+    now = datetime(2025, 1, 1)
+    return Case(
+        id=f"case-{status}",
+        title="Transição",
+        client_id="cliente@empresa.com",
+        status=status,
+        priority=Priority.NORMAL,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_tabela_de_transicoes():
+    sm = CaseStateMachine()
+
+    for event in CaseEventType:
+        banner(f"EVENTO {event.name}")
+
+        singles = []
+        for status in WorkStatus:
+            case = _case(status)
+            sm.apply(case, event)
+            singles.append(case.status)
+
+            expected = EXPECTED_CHANGES.get((status, event), status)
+            print(f"   • {status.value:>14} → {case.status.value}")
+            assert case.status == expected
+
+        broadcast = [_case(s) for s in WorkStatus]
+        sm.apply_many(broadcast, event)
+        assert [c.status for c in broadcast] == singles
+
+        per_case = [_case(s) for s in WorkStatus]
+        changed = sm.apply_many(per_case, [event] * len(per_case))
+        assert [c.status for c in per_case] == singles
+        assert len(changed) == sum(
+            1 for s in WorkStatus if (s, event) in EXPECTED_CHANGES
+        )
+
+    # --------------------------------------------------
+    banner("ESTADO DESCONHECIDO")
+
+    broken = _case(WorkStatus.NEW)
+    broken.status = "perdido"
+
+    with pytest.raises(InvalidStateTransition):
+        sm.apply(broken, CaseEventType.TIME_PASSED)
+
+    with pytest.raises(InvalidStateTransition):
+        sm.apply_many([_case(WorkStatus.NEW), broken], CaseEventType.TIME_PASSED)
+
+    banner("✔️ TABELA EQUIVALENTE")
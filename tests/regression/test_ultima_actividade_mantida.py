@@ -0,0 +1,81 @@
+"""
+TESTE — ÚLTIMA ACTIVIDADE MANTIDA PELO STORE
+
+Objectivo:
+- get_last_activity_at é sempre o máximo da timeline
+- itens registados fora de ordem não recuam a última actividade
+- bases SQLite antigas ganham o valor ao abrir
+- list_last_activity_at(case_ids) devolve só os Casos pedidos
+"""
+
+import sqlite3
+from datetime import timedelta
+
+from services.clock import Clock
+from store.inmemory import InMemoryStore
+from store.sqlite_store import SQLiteStore
+from model.enums import CaseItemKind
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def test_ultima_actividade_nos_dois_stores():
+    now = Clock().now()
+
+    for store in (InMemoryStore(), SQLiteStore(":memory:")):
+        banner(f"ÚLTIMA ACTIVIDADE — {type(store).__name__}")
+
+        assert store.get_last_activity_at("case-a") is None
+
+        store.add_case_item("case-a", CaseItemKind.NOTE, created_at=now)
+        store.add_case_item(
+            "case-a", CaseItemKind.EMAIL,
+            metadata={"direction": "inbound"},
+            created_at=now - timedelta(days=3),
+        )
+        store.add_case_item(
+            "case-b", CaseItemKind.EMAIL,
+            metadata={"direction": "outbound"},
+            created_at=now + timedelta(days=1),
+        )
+
+        assert store.get_last_activity_at("case-a") == now
+        assert store.get_last_activity_at("case-b") == now + timedelta(days=1)
+        assert store.list_last_activity_at() == {
+            "case-a": now,
+            "case-b": now + timedelta(days=1),
+        }
+
+        # Só os pedidos (ex.: candidatos de uma página); sem timeline não aparece
+        assert store.list_last_activity_at(["case-b", "case-sem-itens"]) == {
+            "case-b": now + timedelta(days=1),
+        }
+        assert store.list_last_activity_at([]) == {}
+
+    banner("✔️ ÚLTIMA ACTIVIDADE MANTIDA")
+
+
+def test_ultima_actividade_em_base_antiga(tmp_path):
+    banner("BASE SQLITE SEM case_activity")
+
+    now = Clock().now()
+    db_path = str(tmp_path / "workflow.db")
+
+    store = SQLiteStore(db_path)
+    store.add_case_item("case-antigo", CaseItemKind.NOTE, created_at=now)
+    store.conn.close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE case_activity")
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStore(db_path)
+    assert store.get_last_activity_at("case-antigo") == now
+
+    banner("✔️ ÚLTIMA ACTIVIDADE RECONSTRUÍDA")
@@ -0,0 +1,62 @@
+"""
+TESTE — O QUE É UM ASSUNTO SEMELHANTE
+
+Objectivo:
+- prefixos de resposta/reencaminhamento não contam para a semelhança
+- maiúsculas e espaços não contam
+- cada motor de similaridade respeita os seus limites
+- assuntos sem palavras relevantes não são "iguais" por omissão
+"""
+
+import pytest
+
+from services.similarity import (
+    BoundedEditSimilarity,
+    SimilarityEngine,
+    TokenSetSimilarity,
+    get_similarity_engine,
+)
+
+
+def banner(title):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+
+
+def test_o_que_e_assunto_semelhante():
+    banner("PREFIXOS E FORMATAÇÃO NÃO CONTAM")
+
+    for name in ("sequence", "jaccard", "edit"):
+        engine = get_similarity_engine(name)
+        score = engine.similarity("Contrato X", "RE: Fwd:  contrato   x")
+        print(f"🧠 {name}: {score:.2f}")
+        assert score == 1.0
+
+    # --------------------------------------------------
+    banner("JACCARD — PALAVRAS EM COMUM")
+
+    jaccard = TokenSetSimilarity()
+    assert jaccard.similarity("Contrato de arrendamento", "Arrendamento contrato") == 1.0
+    assert jaccard.similarity("Contrato de arrendamento", "Contrato de compra") == 1 / 3
+    assert jaccard.similarity("Contrato", "Jantar sexta") == 0.0
+
+    # --------------------------------------------------
+    banner("JACCARD — ASSUNTOS SEM PALAVRAS RELEVANTES")
+
+    assert jaccard.similarity("Oi", "Ok") < 1.0
+    assert jaccard.similarity("Oi", "Re: oi") == 1.0
+    assert jaccard.similarity("", "Contrato de arrendamento") == 0.0
+
+    with pytest.raises(TypeError):
+        SimilarityEngine()
+
+    # --------------------------------------------------
+    banner("EDIÇÃO LIMITADA — CORTE ANTECIPADO")
+
+    edit = BoundedEditSimilarity(max_distance=2)
+    assert edit.distance("contrato", "contratos") == 1
+    assert edit.distance("contrato", "proposta") is None
+    assert edit.similarity("contrato", "proposta") == 0.0
+
+    banner("✔️ SEMELHANÇA DE ASSUNTOS DEFINIDA")
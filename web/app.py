@@ -1,17 +1,32 @@
-from flask import Flask, render_template, redirect, url_for, request
+import hashlib
+
+from flask import (
+    Flask,
+    Response,
+    abort,
+    make_response,
+    render_template,
+    redirect,
+    url_for,
+    request,
+)
 
 from store.inmemory import InMemoryStore
 from rules.rules_engine import RulesEngine
 from state_machine.case_state_machine import CaseStateMachine
 from services.clock import Clock
 from services.email_ingestion_service import EmailIngestionService
+from services.change_feed import ChangeFeed, ChangeFeedGap
 
 from portals.attention import AttentionPortal
 from portals.classification import ClassificationPortal
 from portals.billing import BillingPortal
+from portals.cache import DecisionCardCache
+from portals.deltas import CardDeltaTracker
+from portals.pagination import InvalidCursor
 
 from simulators.email_simulator import EmailSimulator
-from model.enums import CaseEventType
+from model.enums import AttentionFlag, CaseEventType, WorkStatus
 
 app = Flask(__name__)
 
@@ -22,45 +37,197 @@ app = Flask(__name__)
 clock = Clock()
 store = InMemoryStore()
 rules = RulesEngine(store, CaseStateMachine())
-ingestion = EmailIngestionService(store, rules, clock)
+
+# Mudanças para os navegadores ligados a /events
+change_feed = ChangeFeed()
+ingestion = EmailIngestionService(store, rules, clock, change_feed=change_feed)
 
 attention_portal = AttentionPortal()
 classification_portal = ClassificationPortal()
 billing_portal = BillingPortal()
 
+# Cartas guardadas por Caso; o cérebro avisa quando um Caso muda
+# e as cartas desses Casos são refeitas e publicadas como deltas
+decision_cards = DecisionCardCache(store)
+card_deltas = CardDeltaTracker(
+    change_feed, decision_cards, [attention_portal, billing_portal], clock.now
+)
+rules.add_listener(card_deltas.track)
+
 email_simulator = EmailSimulator(ingestion, clock)
 
 # ---------------------------------
 # DASHBOARD V2
 # ---------------------------------
 
+CARDS_PER_PAGE = 20
+
+
+def _card_filters():
+    """
+    Filtros das cartas vindos da query string (?client=&status=&flag=).
+    Valor desconhecido → 400.
+    """
+    status = request.args.get("status") or None
+    flag = request.args.get("flag") or None
+
+    try:
+        return {
+            "client_id": request.args.get("client") or None,
+            "status": WorkStatus(status) if status else None,
+            "flag": AttentionFlag(flag) if flag else None,
+        }
+    except ValueError as exc:
+        abort(400, description=str(exc))
+
+
+def _next_page_url(param, cursor):
+    if cursor is None:
+        return None
+
+    args = request.args.to_dict()
+    args[param] = cursor
+    return url_for("dashboard", **args)
+
+
+def _dashboard_etag(now, last_seq):
+    """
+    O dashboard só depende de:
+    - store (versão: cresce a cada escrita)
+    - classificações pendentes (fora do store; mudam sempre pelo feed)
+    - relógio simulado
+    - URL (caso seleccionado, filtros, cursores)
+    """
+    digest = hashlib.sha1(
+        f"{now.isoformat()}|{request.full_path}".encode("utf-8")
+    ).hexdigest()[:16]
+
+    return f"{store.get_version()}-{last_seq}-{digest}"
+
+
 @app.route("/")
 def dashboard():
     now = clock.now()
 
+    # Lido antes de tudo: mudanças durante o render chegam pelo feed
+    last_seq = change_feed.last_seq
+
+    # Nada mudou desde a última vista → 304 sem portais nem template
+    etag = _dashboard_etag(now, last_seq)
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+        response.set_etag(etag)
+        return response
+
     cases = store.list_cases()
 
     selected_case_id = request.args.get("case")
     selected_case = store.get_case(selected_case_id) if selected_case_id else None
 
-    attention = attention_portal.collect(store, now)
-    billing = billing_portal.collect(store, now)
+    # Só a página pedida de cada portal é construída
+    filters = _card_filters()
+    try:
+        attention = decision_cards.collect_page(
+            attention_portal,
+            now,
+            limit=CARDS_PER_PAGE,
+            cursor=request.args.get("attention_cursor"),
+            **filters,
+        )
+        billing = decision_cards.collect_page(
+            billing_portal,
+            now,
+            limit=CARDS_PER_PAGE,
+            cursor=request.args.get("billing_cursor"),
+            **filters,
+        )
+    except InvalidCursor as exc:
+        # Cursor adulterado ou de outra versão da ordem
+        abort(400, description=str(exc))
     classifications = classification_portal.collect(
         ingestion.pending_classifications, now
     )
 
-    attention_case_ids = {item.case_id for item in attention}
+    # Marcador ⚠️ a partir do índice de flags, sem construir cartas
+    # (mesmo critério das cartas: arquivados não contam)
+    attention_case_ids = {
+        case.id
+        for case in attention_portal.candidate_cases(store, now)
+        if attention_portal.needs_attention(case)
+    }
 
-    return render_template(
+    response = make_response(render_template(
         "dashboard_v2.html",
+        last_seq=last_seq,
         cases=cases,
         selected_case=selected_case,
-        attention=attention,
-        billing=billing,
+        attention=attention.items,
+        billing=billing.items,
+        attention_next_url=_next_page_url("attention_cursor", attention.next_cursor),
+        billing_next_url=_next_page_url("billing_cursor", billing.next_cursor),
         classifications=classifications,
         attention_case_ids=attention_case_ids,
+    ))
+
+    # Revalidar sempre: o ETag decide se o corpo volta a ser enviado
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+# ---------------------------------
+# DASHBOARD AO VIVO (SSE)
+# ---------------------------------
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@app.route("/events")
+def events():
+    """
+    Stream text/event-stream de mudanças a partir de um número de sequência.
+
+    O EventSource reenvia Last-Event-ID ao religar; a primeira ligação
+    usa ?since= (o last_seq com que o dashboard foi renderizado).
+    """
+
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+    try:
+        since = int(since)
+    except (TypeError, ValueError):
+        since = change_feed.last_seq
+
+    def stream(seq):
+        while True:
+            try:
+                changes = change_feed.wait(seq, timeout=SSE_KEEPALIVE_SECONDS)
+            except ChangeFeedGap:
+                yield "event: reset\ndata: {}\n\n"
+                return
+
+            if not changes:
+                yield ": keepalive\n\n"
+                continue
+
+            for change in changes:
+                yield change.to_sse()
+            seq = changes[-1].seq
+
+    return Response(
+        stream(since),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+
+def _done(**args):
+    """
+    Pedidos do dashboard ao vivo (X-Live) não precisam de redirect:
+    as mudanças chegam por /events.
+    """
+    if request.headers.get("X-Live"):
+        return "", 204
+    return redirect(url_for("dashboard", **args))
+
 # ---------------------------------
 # SIMULAÇÃO
 # ---------------------------------
@@ -72,22 +239,16 @@ def sim_email_inbound():
         subject="Pedido de esclarecimento contratual",
         body="Pode confirmar este ponto?",
     )
-    return redirect(url_for("dashboard"))
+    return _done()
 
 @app.route("/sim/time/<int:days>")
 def sim_time(days):
     email_simulator.advance_days(days)
     now = clock.now()
 
-    for case in store.list_cases():
-        rules.handle_event(
-            case=case,
-            event_type=CaseEventType.TIME_PASSED,
-            event_context={"days": days},
-            now=now,
-        )
+    rules.sweep_time(now)
 
-    return redirect(url_for("dashboard"))
+    return _done()
 
 @app.route("/sim/email/outbound/<case_id>")
 def sim_email_outbound(case_id):
@@ -97,7 +258,7 @@ def sim_email_outbound(case_id):
         subject="Re: esclarecimento",
         body="Segue resposta ao seu pedido.",
     )
-    return redirect(url_for("dashboard", case=case_id))
+    return _done(case=case_id)
 
 # ---------------------------------
 # DECISÕES
@@ -121,8 +282,9 @@ def decision():
 
     if portal == "classification":
         ingestion.pending_classifications.clear()
+        change_feed.publish("classification.clear")
 
-    return redirect(url_for("dashboard", case=case_id))
+    return _done(case=case_id)
 
 # ---------------------------------
 